@@ -1,28 +1,57 @@
 #!/usr/bin/env python3
 import argparse
-import itertools
-from collections import namedtuple
-from ODBPy.Components import *
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+from ODBPy.BOM import read_bom, bom_rows, default_bom_keys
 from XLSXUtils import *
 
-ComponentInfo = namedtuple("ComponentInfo", ["Name", "Value", "MPN"])
+def output_filename(pattern, directory, batch):
+    """
+    The output file for a job directory: {job} in the pattern
+    is replaced by the job name. In batch mode, patterns without
+    {job} get the job name as prefix.
+    """
+    job = os.path.basename(os.path.normpath(directory))
+    if "{job}" in pattern:
+        return pattern.format(job=job)
+    if batch:
+        head, tail = os.path.split(pattern)
+        return os.path.join(head, "{}-{}".format(job, tail))
+    return pattern
+
+def export_bom(directory, outfile, keys):
+    """Write the BOM of a job to outfile (XLSX or CSV). Returns (number of BOM lines, placements)"""
+    bom = read_bom(directory, keys)
+    write_rows(outfile, bom_rows(bom, keys))
+    return len(bom), sum(line.quantity for line in bom)
+
+def _export_task(args):
+    return export_bom(*args)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("directory", help="ODB++ directory to read")
-    parser.add_argument("-o","--outfile", default="BOM.xlsx", help="XLSX file to write")
+    parser.add_argument("directories", nargs="+", help="ODB++ directories or archives to read")
+    parser.add_argument("-o","--outfile", default="BOM.xlsx",
+                        help="XLSX or CSV file to write. {job} is replaced by the job name")
+    parser.add_argument("-k", "--keys", default=",".join(default_bom_keys),
+                        help="Comma-separated component properties to group by (@part_name: CMP part name)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of processes for multiple jobs")
     args = parser.parse_args()
-    # Parse components (top and bot)
-    components = read_components(args.directory)
-    # Remap by component name
-    all_components = [
-        ComponentInfo(
-            component.name,
-            component.properties.get("Value", ""),
-            component.properties.get("Name", "")
-        )
-        for component in itertools.chain(components.top.values(), components.bot.values())
-    ]
-    print(f'Found {len(all_components)} components')
-    namedtuples_to_xlsx(args.outfile, all_components)
-
+    keys = tuple(key.strip() for key in args.keys.split(","))
+    batch = len(args.directories) > 1
+    tasks = [(directory, output_filename(args.outfile, directory, batch), keys)
+             for directory in args.directories]
+    # Jobs with the same name (e.g. a/job and b/job) would overwrite each other's BOM
+    outfiles = [os.path.normpath(outfile) for _, outfile, _ in tasks]
+    duplicates = sorted({outfile for outfile in outfiles if outfiles.count(outfile) > 1})
+    if duplicates:
+        parser.error("Jobs with the same name would overwrite {}. "
+                     "Export them in separate runs".format(", ".join(duplicates)))
+    if not batch or args.workers == 1:
+        results = list(map(_export_task, tasks))
+    else:
+        with ProcessPoolExecutor(args.workers) as executor:
+            results = list(executor.map(_export_task, tasks))
+    for (directory, outfile, _), (nlines, nplacements) in zip(tasks, results):
+        print(f'{directory}: {nplacements} components in {nlines} BOM lines => {outfile}')
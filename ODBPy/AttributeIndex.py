@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sparse attribute storage for many features.
+
+The attributes of all features are stored in CSR form:
+The attributes of feature i are
+attribute_ids[indptr[i]:indptr[i+1]] and values[indptr[i]:indptr[i+1]].
+Flag attributes (i.e. without a value, parsed as True) are stored as flag_value.
+
+An inverted index (attribute ID and value => feature IDs)
+is built on the first query.
+"""
+import numpy as np
+from .Attributes import FrozenAttributes, intern_attributes
+
+__all__ = ["AttributeIndex", "flag_value"]
+
+# Value stored for flag attributes, i.e. attributes without "=value"
+flag_value = np.iinfo(np.int64).min
+
+def _encode_value(value):
+    return flag_value if value is True else value
+
+def _decode_value(value):
+    return True if value == flag_value else value
+
+class AttributeIndex(object):
+    """
+    CSR attribute storage for features 0..n-1 with an inverted index
+    """
+    def __init__(self, indptr, attribute_ids, values):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.attribute_ids = np.asarray(attribute_ids, dtype=np.int32)
+        self.values = np.asarray(values, dtype=np.int64)
+        self._inverted = None
+
+    @classmethod
+    def from_mappings(cls, mappings):
+        """
+        Build the index from an iterable of attribute dicts.
+        The position in the iterable is the feature ID.
+        """
+        indptr, attribute_ids, values = [0], [], []
+        for attributes in mappings:
+            for key, value in attributes.items():
+                attribute_ids.append(key)
+                values.append(_encode_value(value))
+            indptr.append(len(attribute_ids))
+        return cls(indptr, attribute_ids, values)
+
+    @classmethod
+    def from_feature_table(cls, table):
+        """
+        Build the index for the pads, lines and surfaces of a FeatureTable.
+        Feature IDs are the ODB++ feature indices (the "index" columns),
+        features that are not in the table have no attributes.
+        """
+        rows = [table.pads, table.lines, table.surfaces]
+        ids = np.concatenate([arr["index"] for arr in rows])
+        sets = np.concatenate([arr["attributes"] for arr in rows])
+        n = int(ids.max()) + 1 if len(ids) else 0
+        # Flatten all distinct attribute sets into one pool
+        parsed = [intern_attributes(s) for s in table.attributes]
+        set_sizes = np.array([len(attrs) for attrs in parsed] + [0], dtype=np.int64)
+        set_starts = np.concatenate([[0], np.cumsum(set_sizes)])
+        pool_ids = np.array([k for attrs in parsed for k in attrs.keys()], dtype=np.int32)
+        pool_values = np.array([_encode_value(v) for attrs in parsed for v in attrs.values()],
+                               dtype=np.int64)
+        # Rows without attributes refer to the empty set at the end (-1)
+        sets = np.where(sets < 0, len(parsed), sets)
+        order = np.argsort(ids, kind="stable")
+        ids, sets = ids[order], sets[order]
+        counts = set_sizes[sets]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(indptr, ids + 1, counts)
+        indptr = np.cumsum(indptr)
+        # Gather the pool entries of every row
+        row_starts = np.cumsum(counts) - counts
+        gather = np.repeat(set_starts[sets] - row_starts, counts) + np.arange(counts.sum())
+        return cls(indptr, pool_ids[gather], pool_values[gather])
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.attribute_ids.nbytes + self.values.nbytes
+
+    def attributes(self, feature_id):
+        """Get the attribute dict for a feature ID"""
+        start, end = self.indptr[feature_id], self.indptr[feature_id + 1]
+        return FrozenAttributes(
+            (int(k), _decode_value(int(v)))
+            for k, v in zip(self.attribute_ids[start:end], self.values[start:end]))
+
+    def _build_inverted(self):
+        feature_ids = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+        order = np.lexsort((feature_ids, self.values, self.attribute_ids))
+        self._inverted = (self.attribute_ids[order], self.values[order], feature_ids[order])
+
+    def features_with(self, attribute_id, value=None):
+        """
+        Get the sorted array of feature IDs that have the given attribute.
+        If value is not None, only features where the attribute has
+        the given value are returned. Use value=True for flag attributes.
+        """
+        if self._inverted is None:
+            self._build_inverted()
+        ids, values, feature_ids = self._inverted
+        start = np.searchsorted(ids, attribute_id, "left")
+        end = np.searchsorted(ids, attribute_id, "right")
+        if value is None:
+            return np.sort(feature_ids[start:end])
+        value = _encode_value(value)
+        offset = start
+        start = offset + np.searchsorted(values[offset:end], value, "left")
+        end = offset + np.searchsorted(values[offset:end], value, "right")
+        return feature_ids[start:end] # Already sorted by lexsort
+
+    def features_with_name(self, feature_info, name, value=None):
+        """
+        Like features_with(), but find the attribute by name (e.g. ".smd")
+        using the given FeatureInfo. String values are looked up
+        in the feature info's attribute text strings.
+        """
+        attribute_id = feature_info.attribute_id(name)
+        if isinstance(value, str):
+            value = feature_info.string_id(value)
+            if value is None:
+                return np.empty(0, dtype=np.int64)
+        if attribute_id is None:
+            return np.empty(0, dtype=np.int64)
+        return self.features_with(attribute_id, value)
+
+    def __repr__(self):
+        return "AttributeIndex({} features, {} attributes)".format(len(self), len(self.values))
@@ -3,9 +3,33 @@
 """
 ODB++ attribute parser
 """
+import functools
 
-__all__ = ["parse_attributes_from_line",
-           "parse_attributes"]
+__all__ = ["parse_attributes_from_line", "parse_attributes",
+           "FrozenAttributes", "empty_attributes", "intern_attributes"]
+
+class FrozenAttributes(dict):
+    """
+    Read-only, hashable attribute dictionary.
+    Instances are shared between all features with the same attribute string,
+    so they must not be modified.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenAttributes can't be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __repr__(self):
+        return "FrozenAttributes({})".format(dict.__repr__(self))
+
+    def __reduce__(self):
+        return (FrozenAttributes, (dict(self),))
+
+empty_attributes = FrozenAttributes()
 
 def parse_attributes_from_line(line):
     """
@@ -38,4 +62,15 @@ def parse_attributes(attribute_str):
     return {
         int(attr[0]): int(attr[2]) if not isinstance(attr[2], bool) else attr[2]
         for attr in part_attrs
-    }
\ No newline at end of file
+    }
+
+@functools.lru_cache(maxsize=1 << 16)
+def intern_attributes(attribute_str):
+    """
+    Like parse_attributes(), but returns a shared FrozenAttributes instance
+    for every distinct attribute string.
+
+    Example:
+        intern_attributes("0=0,2=0") is intern_attributes("0=0,2=0") => True
+    """
+    return FrozenAttributes(parse_attributes(attribute_str))
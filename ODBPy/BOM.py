@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bill of materials: Component placements grouped into BOM lines.
+
+Placements are grouped by the values of configurable component
+properties (e.g. the manufacturer part number "Name" and "Value")
+using a dict, so building the BOM is O(number of components).
+Every BOM line has the quantity and the sorted reference designators
+of its placements.
+"""
+import re
+from collections import namedtuple
+from .ComponentTable import ComponentTable, read_component_table
+
+__all__ = ["BOMLine", "build_bom", "bom_rows", "read_bom", "part_name_key",
+           "default_bom_keys", "natural_sort_key"]
+
+# Use the part name of the CMP record instead of a property value
+part_name_key = "@part_name"
+
+# Name: Manufacturer part number (as written by DipTrace)
+default_bom_keys = ("Name", "Value")
+
+class BOMLine(namedtuple("BOMLine", ["key", "quantity", "references"])):
+    """
+    A BOM line: key is the tuple of the grouping values,
+    references is the naturally sorted list of reference designators.
+    """
+    @property
+    def designators(self):
+        """Comma-separated reference designators"""
+        return ", ".join(map(str, self.references))
+
+_digits_re = re.compile(r"(\d+)")
+
+def natural_sort_key(reference):
+    """Sort key that orders e.g. R2 before R10"""
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in _digits_re.split(str(reference)) if part]
+
+def _placements(components, keys):
+    "Yield (reference, key tuple) for every component of a ComponentTable or Components tuple"
+    if isinstance(components, ComponentTable):
+        names, part_names, properties = components.names, components.part_names, components.properties
+    else:
+        placements = [component for side in components for component in side.values()]
+        names = [component.name for component in placements]
+        part_names = [component.part_name for component in placements]
+        properties = [component.properties for component in placements]
+    for name, part_name, props in zip(names, part_names, properties):
+        yield name, tuple(part_name if key == part_name_key else props.get(key, "")
+                          for key in keys)
+
+def build_bom(components, keys=default_bom_keys):
+    """
+    Group the placements of a ComponentTable or a read_components() result
+    by the given property keys (see also part_name_key).
+    Missing properties are treated as empty strings.
+    Returns a list of BOMLines in the order of the first placement of each line.
+    """
+    groups = {}
+    for reference, key in _placements(components, keys):
+        references = groups.get(key)
+        if references is None:
+            references = groups[key] = []
+        references.append(reference)
+    return [BOMLine(key, len(references), sorted(references, key=natural_sort_key))
+            for key, references in groups.items()]
+
+def bom_rows(lines, keys=default_bom_keys):
+    """
+    Lazily generate table rows from BOMLines, starting with a header row:
+    The key columns, Quantity and References
+    """
+    yield [("Part name" if key == part_name_key else key) for key in keys] + ["Quantity", "References"]
+    for line in lines:
+        yield list(line.key) + [line.quantity, line.designators]
+
+def read_bom(directory, keys=default_bom_keys):
+    """Build the BOM of an ODB++ directory, archive or JobSource"""
+    return build_bom(read_component_table(directory), keys)
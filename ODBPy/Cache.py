@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk cache for parsed ODB++ files.
+
+Results are keyed by the job path, the job files they were parsed from
+and the fingerprint (size and mtime) of those files, optionally
+also by a hash of their content.
+FeatureTables, SpatialIndexes and NetlistIndexes are stored as NumPy .npz files,
+everything else as versioned pickle.
+
+The cache directory is limited in size. When it grows too large,
+the least recently used entries are deleted.
+
+Usage:
+    cache = ParseCache("/tmp/odbcache")
+    job = ODBJob("myjob.tgz", cache=cache)
+"""
+import hashlib
+import os
+import os.path
+import pickle
+import tempfile
+import numpy as np
+from .FeatureTable import FeatureTable
+from .SpatialIndex import SpatialIndex
+from .NetlistIndex import NetlistIndex
+
+__all__ = ["ParseCache", "default_cache_directory"]
+
+# Increment whenever the format of any cached result changes
+_cache_version = 3
+
+# Types stored as .npz using their to_arrays() and from_arrays() methods
+_npz_types = {cls.__name__: cls for cls in [FeatureTable, SpatialIndex, NetlistIndex]}
+
+def default_cache_directory():
+    """$ODBPY_CACHE_DIR or ~/.cache/odbpy"""
+    return os.environ.get("ODBPY_CACHE_DIR") or \
+        os.path.join(os.path.expanduser("~"), ".cache", "odbpy")
+
+class ParseCache(object):
+    """
+    Size-capped cache directory for parsed ODB++ files.
+
+    max_size is the maximum total size of the cache files in bytes.
+    If hash_content is True, the content of the source files is hashed
+    and included in the key, so files that are modified without changing
+    their size and mtime are detected, at the cost of reading them.
+    """
+    def __init__(self, directory=None, max_size=1 << 30, hash_content=False):
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+        self.hash_content = hash_content
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source, paths, kind):
+        """Compute the cache key for the given job files in a JobSource"""
+        hasher = hashlib.sha256()
+        hasher.update(repr((_cache_version, kind, os.path.abspath(source.path))).encode("utf-8"))
+        for path in paths:
+            hasher.update(repr((path, source.fingerprint(path))).encode("utf-8"))
+            if self.hash_content and source.exists(path):
+                with source.open(path) as fin:
+                    for chunk in iter(lambda: fin.read(1 << 20), b""):
+                        hasher.update(chunk)
+        return "{}-{}".format(kind, hasher.hexdigest()[:32])
+
+    def _filename(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def load(self, key):
+        """Load a cached result. Raises KeyError if it is not cached."""
+        for extension, loader in [(".npz", _load_npz), (".pickle", _load_pickle)]:
+            filename = self._filename(key, extension)
+            try:
+                value = loader(filename)
+            except FileNotFoundError:
+                continue
+            except Exception: # Corrupt or incompatible entry
+                _remove(filename)
+                continue
+            os.utime(filename) # Mark as recently used
+            return value
+        raise KeyError(key)
+
+    def store(self, key, value):
+        """Store a result in the cache and evict old entries if required"""
+        if type(value).__name__ in _npz_types:
+            extension, writer = ".npz", _write_npz
+        else:
+            extension, writer = ".pickle", _write_pickle
+        fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fout:
+                writer(fout, value)
+            os.replace(tmpname, self._filename(key, extension))
+        except BaseException:
+            _remove(tmpname)
+            raise
+        self.evict()
+
+    def get(self, source, paths, kind, compute):
+        """
+        Return the cached result for the given job files or
+        compute it using compute() and store it.
+        """
+        key = self.key(source, paths, kind)
+        try:
+            return self.load(key)
+        except KeyError:
+            pass
+        value = compute()
+        self.store(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith((".npz", ".pickle")):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError: # Removed concurrently
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    @property
+    def size(self):
+        """Total size of all cache entries in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits into max_size"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_size:
+                break
+            _remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self):
+        """Delete all cache entries"""
+        for _, _, name in self._entries():
+            _remove(os.path.join(self.directory, name))
+
+    def __repr__(self):
+        return "ParseCache({!r})".format(self.directory)
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+def _write_pickle(fout, value):
+    pickle.dump((_cache_version, value), fout, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _load_pickle(filename):
+    with open(filename, "rb") as fin:
+        version, value = pickle.load(fin)
+    if version != _cache_version:
+        raise ValueError("Cache version mismatch")
+    return value
+
+def _write_npz(fout, value):
+    np.savez(fout, cache_version=np.array(_cache_version),
+             cache_type=np.array(type(value).__name__), **value.to_arrays())
+
+def _load_npz(filename):
+    with np.load(filename, allow_pickle=False) as data:
+        if int(data["cache_version"]) != _cache_version:
+            raise ValueError("Cache version mismatch")
+        cls = _npz_types[str(data["cache_type"])]
+        return cls.from_arrays({key: data[key] for key in data.files})
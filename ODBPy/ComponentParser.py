@@ -5,11 +5,13 @@ ODB++ surface parser components
 """
 import re
 from collections import namedtuple
-from .Decoder import DecoderOption, run_decoder
+from collections.abc import Mapping
+from .Decoder import DecoderOption, CompiledDecoder, run_decoder
 from .Structures import *
-from .Utils import try_parse_number
+from .Numeric import number_chars, parse_number
+from .Attributes import intern_attributes, empty_attributes
 
-__all__ = ["components_decoder_options", "parse_components",
+__all__ = ["components_decoder_options", "components_fast_paths", "parse_components",
            "consolidate_component_tags", "Component", "map_components_by_name"]
 
 _prp_re = re.compile(r"^PRP\s+(\S+)\s+'([^']+)'\s*$") # Property record
@@ -27,18 +29,20 @@ Component = namedtuple("Component", [
         "name", "part_name", "location", "rotation", "mirror", "attributes", "properties", "toeprints"])
 
 def consolidate_component_tags(tags):
+    """Build a Component from an iterable of the tags of one component section"""
     component = None # Expect only one
     properties = {}
     toeprints = []
     for tag in tags:
-        if isinstance(tag, ComponentRecordTag):
+        tag_type = type(tag)
+        if tag_type is ToeprintRecord:
+            toeprints.append(tag)
+        elif tag_type is PropertyRecordTag:
+            properties[tag.key] = tag.value
+        elif tag_type is ComponentRecordTag:
             if component is not None:
                 raise ValueError("Multiple CMP records in section. Last one: {}".format(tag))
             component = tag
-        if isinstance(tag, PropertyRecordTag):
-            properties[tag.key] = tag.value
-        if isinstance(tag, ToeprintRecord):
-            toeprints.append(tag)
     if component is None:
         raise ValueError("No CMP record in section")
     return Component(
@@ -61,29 +65,105 @@ def _parse_top(match):
         mirror_map[mirror],
         int(net_num),
         int(subnet_num),
-        try_parse_number(toeprint_name)
+        parse_number(toeprint_name)
     )
 
 def _parse_cmp(match):
     pkg_ref, x, y, rot, mirror, name, part_name, attributes = match.groups()
-    attributes = parse_attributes(attributes[1:]) \
-                 if attributes is not None else {}
+    attributes = intern_attributes(attributes[1:]) \
+                 if attributes is not None else empty_attributes
     return ComponentRecordTag(
         int(pkg_ref),
         Point(float(x), float(y)),
         float(rot),
         mirror_map[mirror],
-        try_parse_number(name.strip()),
-        try_parse_number(part_name.strip()),
+        parse_number(name.strip()),
+        parse_number(part_name.strip()),
         attributes
     )
 
+
+def _tokenize_top(line):
+    """
+    Split a toeprint record into its 8 fields without regex.
+    Returns None if the line is not a plain toeprint record.
+    """
+    tokens = line.split()
+    if len(tokens) != 9 or tokens[0] != "TOP":
+        return None
+    _, pin_num, x, y, rot, mirror, net_num, subnet_num, _ = tokens
+    if not (pin_num.isdigit() and net_num.isdigit() and subnet_num.isdigit()) or \
+       mirror not in mirror_map or not number_chars.issuperset(x + y + rot):
+        return None
+    return tokens[1:]
+
+def _tokenize_cmp(line):
+    """
+    Split a component record into its 7 fields without regex.
+    The attribute field is the raw attribute string (without ;) or None.
+    Returns None if the line is not a plain component record.
+    """
+    tokens = line.split(None, 8)
+    if len(tokens) < 8 or tokens[0] != "CMP":
+        return None
+    _, pkg_ref, x, y, rot, mirror, name, part_name = tokens[:8]
+    attributes = None
+    if len(tokens) == 9:
+        # The attribute string ";..." is separated from the part name by whitespace
+        attributes = tokens[8]
+        if not attributes.startswith(";") or len(attributes) < 2:
+            return None
+        attributes = attributes[1:]
+    if not pkg_ref.isdigit() or mirror not in mirror_map or \
+       not number_chars.issuperset(x + y + rot):
+        return None
+    return pkg_ref, x, y, rot, mirror, name, part_name, attributes
+
+def _fast_parse_top(line):
+    "Parse a toeprint record without regex. Returns None for unsupported lines."
+    tokens = _tokenize_top(line)
+    if tokens is None:
+        return None
+    pin_num, x, y, rot, mirror, net_num, subnet_num, toeprint_name = tokens
+    return ToeprintRecord(int(pin_num), Point(float(x), float(y)), float(rot),
+                          mirror_map[mirror], int(net_num), int(subnet_num),
+                          parse_number(toeprint_name))
+
+def _fast_parse_cmp(line):
+    "Parse a component record without regex. Returns None for unsupported lines."
+    tokens = _tokenize_cmp(line)
+    if tokens is None:
+        return None
+    pkg_ref, x, y, rot, mirror, name, part_name, attributes = tokens
+    return ComponentRecordTag(
+        int(pkg_ref), Point(float(x), float(y)), float(rot), mirror_map[mirror],
+        parse_number(name), parse_number(part_name),
+        intern_attributes(attributes) if attributes is not None else empty_attributes)
+
+def _fast_parse_prp(line):
+    "Parse a property record without regex. Returns None for unsupported lines."
+    tokens = line.split(None, 2)
+    if len(tokens) != 3 or tokens[0] != "PRP":
+        return None
+    value = tokens[2]
+    if len(value) < 3 or value[0] != "'" or value[-1] != "'" or "'" in value[1:-1]:
+        return None
+    return PropertyRecordTag(tokens[1], value[1:-1])
+
 components_decoder_options = [
     DecoderOption(_prp_re, _parse_prp),
     DecoderOption(_top_re, _parse_top),
     DecoderOption(_cmp_re, _parse_cmp)
 ]
 
+components_fast_paths = {
+    "PRP": _fast_parse_prp,
+    "TOP": _fast_parse_top,
+    "CMP": _fast_parse_cmp
+}
+
+_components_decoder = CompiledDecoder(components_decoder_options, components_fast_paths)
+
 def component_name_to_id(name):
     """
     Convert a section header name ("CMP 0" in DipTrace)
@@ -94,12 +174,17 @@ def component_name_to_id(name):
     return name
 
 def parse_components(components):
-    # Build rulesets
+    """
+    Parse the component sections ("CMP <n>") of a linerecord dict or of a
+    section stream from iter_linerecords() into a dict
+    component ID => Component. Other sections (e.g. attribute names) are skipped.
+    """
+    sections = components.items() if isinstance(components, Mapping) else components
     return {
         component_name_to_id(name): consolidate_component_tags(
-            list(run_decoder(component, components_decoder_options)))
-        for name, component in components.items()
-        if name is not None
+            run_decoder(component, _components_decoder))
+        for name, component in sections
+        if name is not None and name.startswith("CMP")
     }
 
 def map_components_by_name(components):
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar storage of the components of a job.
+
+All components (top and bottom) are stored in one NumPy structured array
+(see component_dtype), all toeprints in another one (see toeprint_dtype).
+The toeprints of component i are
+toeprints[components["toeprint_start"][i]:components["toeprint_end"][i]],
+and toeprints["component"] refers back to the component row.
+
+Component files are decoded line by line directly into the table
+without building per-component tag lists.
+In nanometers mode, the coordinates are stored as int64 nanometers.
+"""
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .ComponentParser import Component, ToeprintRecord, PropertyRecordTag, \
+     ComponentRecordTag, _components_decoder, _tokenize_top, _tokenize_cmp, \
+     _fast_parse_prp
+from .Attributes import intern_attributes, empty_attributes
+from .FeatureTable import _ColumnBuilder
+from .JobSource import job_source
+from .LineRecordParser import iter_raw_linerecords
+from .NetlistParser import NetSide
+from .Structures import Point, Mirror, mirror_map
+from .Numeric import parse_number, numeric_records
+from .Units import parse_unit_line, default_unit, nanometer_unit, records_to_nanometers
+
+__all__ = ["ComponentTable", "component_dtype", "toeprint_dtype",
+           "decode_component_table", "read_component_table", "component_paths"]
+
+# side: NetSide value (Top or Bottom), mirror: Mirror value
+component_dtype = np.dtype([
+    ("package_ref", np.int32), ("x", np.float64), ("y", np.float64), ("rotation", np.float64),
+    ("mirror", np.int8), ("side", np.int8), ("toeprint_start", np.int64), ("toeprint_end", np.int64)
+])
+
+# component: Row of the component in ComponentTable.components
+# mirror: Mirror value, side: NetSide value (Top or Bottom)
+toeprint_dtype = np.dtype([
+    ("component", np.int32), ("pin", np.int32), ("x", np.float64), ("y", np.float64),
+    ("rotation", np.float64), ("mirror", np.int8), ("net", np.int32), ("subnet", np.int32),
+    ("side", np.int8)
+])
+
+_mirror_codes = {code: mirror.value for code, mirror in mirror_map.items()}
+
+# Component files of the top and bottom side
+component_paths = {
+    NetSide.Top: "steps/pcb/layers/comp_+_top/components.Z",
+    NetSide.Bottom: "steps/pcb/layers/comp_+_bot/components.Z"
+}
+
+class ComponentTable(object):
+    """
+    The components and toeprints of a job as NumPy structured arrays.
+
+    names, part_names, attributes (dicts) and properties (dicts)
+    are lists with one entry per component row,
+    toeprint_names has one entry per toeprint row.
+    unit is the unit string of the coordinates (e.g. "MM"), "NM" for
+    tables decoded in nanometers mode or None if unknown.
+    """
+    def __init__(self, components, names, part_names, attributes, properties,
+                 toeprints, toeprint_names, unit=None):
+        self.components = components
+        self.names = names
+        self.part_names = part_names
+        self.attributes = attributes
+        self.properties = properties
+        self.toeprints = toeprints
+        self.toeprint_names = toeprint_names
+        self.unit = unit
+        self._rows = {name: row for row, name in enumerate(names)}
+
+    def __len__(self):
+        return len(self.components)
+
+    def row(self, name):
+        """Row of a component by name. Raises KeyError for unknown components"""
+        return self._rows[name]
+
+    def component_toeprints(self, name):
+        """Toeprint array of a component, given by name"""
+        component = self.components[self.row(name)]
+        return self.toeprints[component["toeprint_start"]:component["toeprint_end"]]
+
+    def side(self, side):
+        """Rows of the components on the given NetSide"""
+        return np.nonzero(self.components["side"] == side.value)[0]
+
+    def component(self, i):
+        """Build the Component object for the given component row"""
+        row = self.components[i]
+        start, end = int(row["toeprint_start"]), int(row["toeprint_end"])
+        toeprints = [
+            ToeprintRecord(pin, Point(x, y), rotation, Mirror(mirror), net, subnet, name)
+            for (pin, x, y, rotation, mirror, net, subnet), name in zip(
+                self.toeprints[["pin", "x", "y", "rotation", "mirror", "net", "subnet"]][start:end].tolist(),
+                self.toeprint_names[start:end])]
+        return Component(self.names[i], self.part_names[i], Point(float(row["x"]), float(row["y"])),
+                         float(row["rotation"]), Mirror(int(row["mirror"])), self.attributes[i],
+                         self.properties[i], toeprints)
+
+    def to_components(self):
+        """
+        Convert to a Components tuple like read_components().
+        Components are numbered in file order on each side.
+        """
+        from .Components import Components
+        return Components(*({num: self.component(i) for num, i in enumerate(self.side(side).tolist())}
+                            for side in (NetSide.Top, NetSide.Bottom)))
+
+    @property
+    def nbytes(self):
+        return self.components.nbytes + self.toeprints.nbytes
+
+    def __repr__(self):
+        return "ComponentTable({} components, {} toeprints)".format(len(self), len(self.toeprints))
+
+# Coordinate fields that are int64 nanometers in nanometers mode
+_nanometer_fields = ("x", "y")
+
+class _ComponentTableBuilder(object):
+    def __init__(self, side, chunksize):
+        self.side = side.value
+        self.unit = None
+        self.components = []
+        self.toeprints = _ColumnBuilder(toeprint_dtype, chunksize)
+        self.names, self.part_names, self.attributes, self.properties = [], [], [], []
+        self.toeprint_names = []
+        # parse_number() results of the frequently repeated part and pin names
+        self._parsed = {}
+
+    def _parse_number(self, s):
+        value = self._parsed.get(s)
+        if value is None:
+            value = self._parsed[s] = parse_number(s)
+        return value
+
+    def _add_component(self, line):
+        tokens = _tokenize_cmp(line)
+        if tokens is not None:
+            pkg_ref, x, y, rot, mirror, name, part_name, attributes = tokens
+            # Number tokens are converted in one batch by finish()
+            self.components.append((pkg_ref, x, y, rot, _mirror_codes[mirror], self.side,
+                                    len(self.toeprint_names), 0))
+            self.names.append(parse_number(name))
+            self.part_names.append(self._parse_number(part_name))
+            self.attributes.append(intern_attributes(attributes)
+                                   if attributes is not None else empty_attributes)
+            self.properties.append({})
+            return
+        tag = _components_decoder.decode_line(line) # Regex path
+        if type(tag) is ComponentRecordTag:
+            self.components.append((tag.package_ref, tag.location.x, tag.location.y, tag.rotation,
+                                    tag.mirror.value, self.side, len(self.toeprint_names), 0))
+            self.names.append(tag.name)
+            self.part_names.append(tag.part_name)
+            self.attributes.append(tag.attributes)
+            self.properties.append({})
+
+    def _add_toeprint(self, line):
+        if not self.components: # Toeprint outside of a component
+            return
+        row = len(self.components) - 1
+        tokens = _tokenize_top(line)
+        if tokens is not None:
+            pin_num, x, y, rot, mirror, net_num, subnet_num, name = tokens
+            # Number tokens are converted in one batch per chunk
+            self.toeprints.append((row, pin_num, x, y, rot, _mirror_codes[mirror],
+                                   net_num, subnet_num, self.side))
+            self.toeprint_names.append(self._parse_number(name))
+            return
+        tag = _components_decoder.decode_line(line) # Regex path
+        if type(tag) is ToeprintRecord:
+            self.toeprints.append((row, tag.pin_num, tag.location.x, tag.location.y, tag.rotation,
+                                   tag.mirrored.value, tag.net_num, tag.subnet_num, self.side))
+            self.toeprint_names.append(tag.toeprint_name)
+
+    def _add_property(self, line):
+        if not self.components:
+            return
+        tag = _fast_parse_prp(line) or _components_decoder.decode_line(line)
+        if type(tag) is PropertyRecordTag:
+            self.properties[-1][tag.key] = tag.value
+
+    def add(self, line):
+        tokens = line.split(None, 1)
+        token = tokens[0] if tokens else None
+        if token == "TOP":
+            self._add_toeprint(line)
+        elif token == "PRP":
+            self._add_property(line)
+        elif token == "CMP":
+            self._add_component(line)
+        elif token is not None and token[0] == "U" and self.unit is None:
+            self.unit = parse_unit_line(line) # "UNITS=MM" or "U MM"
+
+    def finish(self, nanometers=False):
+        components = numeric_records(self.components, component_dtype)
+        components["toeprint_end"] = np.append(components["toeprint_start"][1:],
+                                               len(self.toeprint_names))
+        toeprints, unit = self.toeprints.finish(), self.unit
+        if nanometers:
+            components = records_to_nanometers(components, _nanometer_fields, unit or default_unit)
+            toeprints = records_to_nanometers(toeprints, _nanometer_fields, unit or default_unit)
+            unit = nanometer_unit
+        return ComponentTable(components, self.names, self.part_names, self.attributes,
+                              self.properties, toeprints, self.toeprint_names, unit)
+
+def _concatenate(tables):
+    "Concatenate ComponentTables, renumbering the component back-references"
+    components = np.concatenate([table.components for table in tables])
+    toeprints = np.concatenate([table.toeprints for table in tables])
+    component_offset = toeprint_offset = 0
+    for table in tables:
+        ncomponents, ntoeprints = len(table.components), len(table.toeprints)
+        rows = slice(component_offset, component_offset + ncomponents)
+        components["toeprint_start"][rows] += toeprint_offset
+        components["toeprint_end"][rows] += toeprint_offset
+        toeprints["component"][toeprint_offset:toeprint_offset + ntoeprints] += component_offset
+        component_offset += ncomponents
+        toeprint_offset += ntoeprints
+    def join(field):
+        return [value for table in tables for value in getattr(table, field)]
+    # Sides without components usually don't have a unit line
+    units = {table.unit for table in tables if len(table)} or {table.unit for table in tables}
+    unit = units.pop() if len(units) == 1 else None
+    return ComponentTable(components, join("names"), join("part_names"), join("attributes"),
+                          join("properties"), toeprints, join("toeprint_names"), unit)
+
+def decode_component_table(linerecords, side=NetSide.Top, chunksize=65536, nanometers=False):
+    """
+    Decode the components of a linerecord dict or of a section stream
+    from iter_linerecords() into a ComponentTable. All components
+    are assigned to the given NetSide.
+    If nanometers is True, the coordinates are converted from the unit
+    of the UNITS line (inch if there is none) to int64 nanometers.
+    """
+    sections = linerecords.items() if isinstance(linerecords, Mapping) else linerecords
+    return _decode_lines((line for _, lines in sections for line in lines), side,
+                         chunksize, nanometers)
+
+def _decode_lines(lines, side, chunksize=65536, nanometers=False):
+    builder = _ComponentTableBuilder(side, chunksize)
+    for line in lines:
+        builder.add(line)
+    return builder.finish(nanometers)
+
+def _read_side(job, side, nanometers=False):
+    path = component_paths[side]
+    if not job.exists(path):
+        return _decode_lines([], side, nanometers=nanometers)
+    with job.open(path) as fin:
+        # Components are delimited by their CMP records, so the sections are not needed
+        return _decode_lines(iter_raw_linerecords(fin), side, nanometers=nanometers)
+
+def read_component_table(directory, workers=2, nanometers=False):
+    """
+    Read the top and bottom components of an ODB++ directory,
+    archive or JobSource into one ComponentTable, top components first.
+    Both files are decompressed and decoded concurrently
+    on a thread pool unless workers is 1.
+    See decode_component_table() for the nanometers mode.
+    """
+    sides = [NetSide.Top, NetSide.Bottom]
+    with job_source(directory) as job:
+        if workers == 1:
+            return _concatenate([_read_side(job, side, nanometers) for side in sides])
+        with ThreadPoolExecutor(workers) as executor:
+            return _concatenate(list(executor.map(
+                lambda side: _read_side(job, side, nanometers), sides)))
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import os.path
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from .LineRecordParser import *
+from .JobSource import job_source
 from .SurfaceParser import *
 from .PolygonParser import *
 from .ComponentParser import *
@@ -11,9 +12,23 @@ from .Units import *
 
 Components = namedtuple("Components", ["top", "bot"])
 
-def read_components(directory):
-    top_path = os.path.join(directory, "steps/pcb/layers/comp_+_top/components.Z")
-    top_components = read_linerecords(top_path) if os.path.isfile(top_path) else {}
-    bot_path = os.path.join(directory, "steps/pcb/layers/comp_+_bot/components.Z")
-    bot_components = read_linerecords(bot_path) if os.path.isfile(bot_path) else {}
-    return Components(parse_components(top_components), parse_components(bot_components))
+def _read_side_components(job, path):
+    if not job.exists(path):
+        return {}
+    with job.open(path) as fin:
+        return parse_components(iter_linerecords(fin))
+
+def read_components(directory, workers=2):
+    """
+    Read top and bottom components from an ODB++ directory, archive or JobSource.
+    Both files are decompressed and parsed concurrently
+    on a thread pool unless workers is 1.
+    See also ComponentTable.read_component_table().
+    """
+    paths = ["steps/pcb/layers/comp_+_top/components.Z",
+             "steps/pcb/layers/comp_+_bot/components.Z"]
+    with job_source(directory) as job:
+        if workers == 1:
+            return Components(*(_read_side_components(job, path) for path in paths))
+        with ThreadPoolExecutor(workers) as executor:
+            return Components(*executor.map(lambda path: _read_side_components(job, path), paths))
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Decompression of ODB++ job files.
+
+Compressed ODB++ files (usually features.Z and components.Z) are either
+stored in the classic Unix compress (LZW) format, as single-entry ZIP archive
+or gzip'ed. The format is detected using the magic bytes at the start of the file,
+not by the file extension.
+
+The LZW decoder is pure Python. If NumPy is available,
+code words are unpacked from the bit stream in vectorized batches.
+"""
+import gzip
+import io
+import zipfile
+from enum import Enum
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional for this module
+    np = None
+
+__all__ = ["Compression", "detect_compression", "LZWDecompressor",
+           "lzw_decompress", "lzw_compress", "open_decompressed"]
+
+class Compression(Enum):
+    """Compression format of a file"""
+    Plain = 1
+    LZW = 2
+    GZIP = 3
+    ZIP = 4
+
+_magic_map = [
+    (b"\x1f\x9d", Compression.LZW),
+    (b"\x1f\x8b", Compression.GZIP),
+    (b"PK\x03\x04", Compression.ZIP)
+]
+
+def detect_compression(header):
+    """
+    Detect the compression format from the first bytes of a file.
+    At least four bytes should be given.
+    """
+    for magic, compression in _magic_map:
+        if header.startswith(magic):
+            return compression
+    return Compression.Plain
+
+_lzw_clear = 256 # Clear code in block mode
+_lzw_max_groups = 8192 # Max number of 8-code groups that are unpacked at once
+_lzw_read_size = 1 << 16
+
+def _unpack_codes_python(data, pos, ngroups, n_bits):
+    """
+    Unpack ngroups groups of eight little-endian n_bits wide codes
+    from data, starting at byte pos
+    """
+    mask = (1 << n_bits) - 1
+    shifts = range(0, 8 * n_bits, n_bits)
+    codes = []
+    for start in range(pos, pos + ngroups * n_bits, n_bits):
+        value = int.from_bytes(data[start:start + n_bits], "little")
+        codes += [(value >> shift) & mask for shift in shifts]
+    return codes
+
+def _unpack_codes_numpy(data, pos, ngroups, n_bits):
+    "NumPy variant of _unpack_codes_python()"
+    arr = np.frombuffer(data, dtype=np.uint8, count=ngroups * n_bits, offset=pos)
+    bits = np.unpackbits(arr, bitorder="little").reshape(-1, n_bits)
+    return bits.dot(1 << np.arange(n_bits)).tolist()
+
+def _unpack_partial_group(data, n_bits):
+    "Unpack all complete codes from a trailing, incomplete group"
+    value = int.from_bytes(data, "little")
+    mask = (1 << n_bits) - 1
+    return [(value >> shift) & mask
+            for shift in range(0, len(data) * 8 - n_bits + 1, n_bits)]
+
+class LZWDecompressor(object):
+    """
+    Incremental decompressor for the Unix compress (.Z, LZW) format,
+    modelled after zlib.decompressobj().
+
+    Feed chunks of compressed data to decompress() and
+    call flush() after the last chunk.
+    """
+    def __init__(self, use_numpy=None):
+        self.use_numpy = (np is not None) if use_numpy is None else use_numpy
+        self._unpack = _unpack_codes_numpy if self.use_numpy else _unpack_codes_python
+        self._buffer = bytearray()
+        self._maxbits = None # None => Header not read yet
+
+    def _read_header(self):
+        if self._buffer[:2] != b"\x1f\x9d":
+            raise ValueError("Not a Unix compress (LZW) stream")
+        flags = self._buffer[2]
+        self._maxbits = flags & 0x1f
+        self._block_mode = bool(flags & 0x80)
+        if not 9 <= self._maxbits <= 16:
+            raise ValueError("Invalid LZW max code width: {}".format(self._maxbits))
+        del self._buffer[:3]
+        self._reset()
+
+    def _reset(self):
+        "Reset the dictionary to its initial state (start or clear code)"
+        self._table = [bytes((i,)) for i in range(256)]
+        if self._block_mode: # Placeholder for the clear code
+            self._table.append(b"")
+        self._n_bits = 9
+        self._prev = None
+
+    def decompress(self, data):
+        """Decompress a chunk of data and return all bytes available so far"""
+        self._buffer += data
+        if self._maxbits is None:
+            if len(self._buffer) < 3:
+                return b""
+            self._read_header()
+        return self._decode(final=False)
+
+    def flush(self):
+        """Decompress all remaining data. No more data may be fed afterwards."""
+        if self._maxbits is None:
+            if self._buffer:
+                raise ValueError("Truncated LZW header")
+            return b""
+        return self._decode(final=True)
+
+    def _decode(self, final):
+        """
+        Decode as many codes from the buffer as possible.
+
+        Codes are stored in groups of eight codes (i.e. n_bits bytes).
+        When the code width changes or a clear code is encountered,
+        the remainder of the current group is padding and skipped.
+        """
+        out = []
+        buf = self._buffer
+        pos = 0
+        while True:
+            n_bits = self._n_bits
+            # Number of codes until the decoder has to widen the codes
+            if n_bits == self._maxbits:
+                limit = _lzw_max_groups * 8
+            else:
+                limit = (1 << n_bits) - len(self._table) + (self._prev is None)
+            ngroups = min((len(buf) - pos) // n_bits, -(-limit // 8), _lzw_max_groups)
+            if ngroups > 0:
+                nbytes = ngroups * n_bits
+                codes = self._unpack(buf, pos, ngroups, n_bits)
+            elif final and pos < len(buf): # Trailing incomplete group
+                nbytes = len(buf) - pos
+                codes = _unpack_partial_group(buf[pos:], n_bits)
+            else:
+                break
+            consumed, cleared = self._decode_codes(codes, limit, out)
+            if cleared: # Skip the rest of the group the clear code is in
+                pos += min(((consumed + 7) // 8) * n_bits, nbytes)
+                self._reset()
+                continue
+            pos += nbytes
+            if consumed == limit and n_bits < self._maxbits:
+                self._n_bits += 1
+            elif consumed < 8 * ngroups:
+                break # Incomplete last group
+        del buf[:pos]
+        return b"".join(out)
+
+    def _decode_codes(self, codes, limit, out):
+        """
+        Decode up to limit codes, appending the output to out.
+        Returns (number of codes consumed, True if a clear code was encountered)
+        """
+        table = self._table
+        prev = self._prev
+        block_mode = self._block_mode
+        maxsize = 1 << self._maxbits
+        free_ent = len(table)
+        append = out.append
+        add_entry = table.append
+        if limit < len(codes):
+            codes = codes[:limit]
+        for i, code in enumerate(codes):
+            if code == _lzw_clear and block_mode:
+                self._prev = prev
+                return i + 1, True
+            if code < free_ent:
+                entry = table[code]
+            elif code == free_ent and prev is not None: # KwKwK case
+                entry = prev + prev[:1]
+            else:
+                raise ValueError("Corrupt LZW stream: Invalid code {}".format(code))
+            if prev is not None and free_ent < maxsize:
+                add_entry(prev + entry[:1])
+                free_ent += 1
+            append(entry)
+            prev = entry
+        self._prev = prev
+        return len(codes), False
+
+def lzw_decompress(data, use_numpy=None):
+    """Decompress a complete Unix compress (.Z) bytes object"""
+    decompressor = LZWDecompressor(use_numpy)
+    return decompressor.decompress(data) + decompressor.flush()
+
+def lzw_compress(data, maxbits=16):
+    """
+    Compress bytes into the Unix compress (.Z) format in block mode.
+    The dictionary is cleared whenever it is full.
+    Mainly used to generate test data.
+    """
+    maxsize = 1 << maxbits
+    out = bytearray(b"\x1f\x9d" + bytes((0x80 | maxbits,)))
+    run = [] # Codes with the current code width
+    state = {"n_bits": 9, "decoder_size": 257, "first": True}
+
+    def flush_run(final=False):
+        # Pad the run to whole groups of eight codes, except at the end of the stream
+        n_bits = state["n_bits"]
+        for i in range(0, len(run), 8):
+            group = run[i:i + 8]
+            value = 0
+            for j, code in enumerate(group):
+                value |= code << (j * n_bits)
+            nbytes = -(-len(group) * n_bits // 8) if final else n_bits
+            out.extend(value.to_bytes(nbytes, "little"))
+        del run[:]
+
+    def emit(code):
+        # Mirror the decoder, which widens codes once its table outgrows the width
+        if state["decoder_size"] > (1 << state["n_bits"]) - 1 and state["n_bits"] < maxbits:
+            flush_run()
+            state["n_bits"] += 1
+        run.append(code)
+        if not state["first"] and state["decoder_size"] < maxsize:
+            state["decoder_size"] += 1
+        state["first"] = False
+
+    table = {bytes((i,)): i for i in range(256)}
+    prefix = b""
+    for i in range(len(data)):
+        char = data[i:i + 1]
+        if prefix + char in table:
+            prefix += char
+            continue
+        emit(table[prefix])
+        if len(table) + 1 < maxsize:
+            table[prefix + char] = len(table) + 1 # +1: Skip clear code
+        else: # Dictionary full
+            emit(_lzw_clear)
+            flush_run()
+            table = {bytes((i,)): i for i in range(256)}
+            state.update(n_bits=9, decoder_size=257, first=True)
+        prefix = char
+    if prefix:
+        emit(table[prefix])
+    flush_run(final=True)
+    return bytes(out)
+
+class _LZWReader(io.RawIOBase):
+    """Binary file-like object decompressing a .Z stream on the fly"""
+    def __init__(self, fileobj, use_numpy=None):
+        self._fileobj = fileobj
+        self._decompressor = LZWDecompressor(use_numpy)
+        self._pending = b""
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._pending and not self._eof:
+            chunk = self._fileobj.read(_lzw_read_size)
+            if chunk:
+                self._pending = self._decompressor.decompress(chunk)
+            else:
+                self._pending = self._decompressor.flush()
+                self._eof = True
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fileobj.close()
+        super().close()
+
+class _PrefixedReader(io.RawIOBase):
+    """Re-attaches already consumed header bytes to a binary stream"""
+    def __init__(self, prefix, fileobj):
+        self._prefix = prefix
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._prefix:
+            n = min(len(b), len(self._prefix))
+            b[:n] = self._prefix[:n]
+            self._prefix = self._prefix[n:]
+            return n
+        data = self._fileobj.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._fileobj.close()
+        super().close()
+
+class _BorrowedReader(io.RawIOBase):
+    """View on a binary stream owned by the caller. Closing it doesn't close the stream."""
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._fileobj.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._fileobj.seek(offset, whence)
+
+    def tell(self):
+        return self._fileobj.tell()
+
+    def readinto(self, b):
+        data = self._fileobj.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+class _OwningReader(io.RawIOBase):
+    """Reads from a decompressing stream and also closes the objects it wraps"""
+    def __init__(self, stream, *owned):
+        self._stream = stream
+        self._owned = owned
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._stream.readinto(b)
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            for obj in self._owned:
+                obj.close()
+        super().close()
+
+def _open_zip_member(fileobj):
+    "Open the only entry of a ZIP archive"
+    if not fileobj.seekable():
+        fileobj = io.BytesIO(fileobj.read())
+    thezip = zipfile.ZipFile(fileobj, 'r')
+    names = thezip.namelist()
+    if len(names) != 1:
+        raise ValueError("ZIP files does not contain exactly one file: {}".format(names))
+    return io.BufferedReader(_OwningReader(thezip.open(names[0]), thezip, fileobj))
+
+def open_decompressed(source, use_numpy=None):
+    """
+    Open a filename or binary file-like object for streaming reading,
+    transparently decompressing LZW, gzip and single-entry ZIP content.
+    Returns a binary file-like object. Closing it only closes files
+    opened here: File-like objects passed in stay open.
+    """
+    if hasattr(source, "read"):
+        fileobj = io.BufferedReader(_BorrowedReader(source), _lzw_read_size)
+    else:
+        fileobj = open(source, "rb")
+    header = fileobj.read(4)
+    compression = detect_compression(header)
+    if fileobj.seekable():
+        fileobj.seek(-len(header), io.SEEK_CUR)
+    else:
+        fileobj = io.BufferedReader(_PrefixedReader(header, fileobj))
+    if compression == Compression.LZW:
+        return io.BufferedReader(_LZWReader(fileobj, use_numpy), _lzw_read_size)
+    elif compression == Compression.GZIP:
+        return io.BufferedReader(_OwningReader(
+            gzip.GzipFile(fileobj=fileobj, mode="rb"), fileobj))
+    elif compression == Compression.ZIP:
+        return _open_zip_member(fileobj)
+    return fileobj
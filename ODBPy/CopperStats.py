@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Copper area and density per layer and per grid cell.
+
+Two methods are available:
+
+"exact" sums the areas of the individual features using closed-form
+symbol, line and polygon area formulas (arcs included exactly).
+Negative features are subtracted. This is only correct if the
+features don't overlap. Grid cells get the area of the features
+whose bounding box center is inside the cell.
+
+"raster" renders the layer (see the Raster module) and counts pixels,
+which handles overlapping and negative features correctly.
+The error is bounded by about half a pixel along all feature outlines.
+
+The default method "auto" uses "exact" if the layer has no negative
+features and no overlapping feature bounding boxes, else "raster".
+
+All areas are in square coordinate units (e.g. mm²).
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .Geometry import arc_angles, step_segment, step_arc_cw
+from .PolygonParser import PolygonType
+from .Raster import RasterGrid, iter_tiles
+from .SpatialIndex import feature_table_bboxes
+from .StandardSymbols import symbol_area, symbol_size, parse_standard_symbol, Square
+from .Structures import Polarity
+
+__all__ = ["CopperStats", "feature_areas", "surface_areas", "copper_stats", "copper_stats_all"]
+
+# Maximum number of candidate box pairs checked for overlaps before assuming there are overlaps
+_max_overlap_candidates = 1 << 24
+
+class CopperStats(namedtuple("CopperStats", ["bounds", "area", "copper_area",
+                                             "cell_areas", "cell_copper_areas", "method"])):
+    """
+    Copper statistics of a layer within bounds (minx, miny, maxx, maxy).
+    cell_areas and cell_copper_areas are (rows, cols) arrays,
+    row 0 is the top of the board as in the Raster module.
+    """
+    @property
+    def density(self):
+        """Copper area / total area"""
+        return self.copper_area / self.area if self.area else 0.
+
+    @property
+    def cell_densities(self):
+        """Copper density of every grid cell"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.nan_to_num(self.cell_copper_areas / self.cell_areas)
+
+def _symbol_areas(table, scale):
+    "Array symbol number => area in square coordinate units (0 for user symbols)"
+    maxnum = max(list(table.symbol_names.keys()) + [-1])
+    areas = np.zeros(maxnum + 2) # Unknown symbol numbers are mapped to the last entry
+    for num, name in table.symbol_names.items():
+        areas[num] = symbol_area(name) or 0.
+    return areas * scale ** 2
+
+def surface_areas(table):
+    """
+    Exact area of every surface of a FeatureTable: The area of its islands
+    minus the area of its holes. Arc steps contribute their circular segment
+    r²/2 * (sweep - sin(sweep)) in addition to their chord.
+    """
+    steps, polygons = table.steps, table.polygons
+    # Shoelace formula on the chords, counterclockwise positive
+    step_areas = (steps["xs"] * steps["ye"] - steps["xe"] * steps["ys"]) / 2
+    arcs = np.nonzero(steps["kind"] != step_segment)[0]
+    radius, _, sweep = arc_angles(steps["xs"][arcs], steps["ys"][arcs], steps["xe"][arcs],
+                                  steps["ye"][arcs], steps["xc"][arcs], steps["yc"][arcs],
+                                  steps["kind"][arcs])
+    segments = radius ** 2 / 2 * (sweep - np.sin(sweep))
+    step_areas[arcs] += np.where(steps["kind"][arcs] == step_arc_cw, -segments, segments)
+    # Sum the steps of every polygon
+    cumulative = np.concatenate([[0.], np.cumsum(step_areas)])
+    polygon_areas = np.abs(cumulative[polygons["step_end"]] - cumulative[polygons["step_start"]])
+    sign = np.where(polygons["type"] == PolygonType.Hole.value, -1., 1.)
+    return np.bincount(polygons["surface"], sign * polygon_areas, minlength=len(table.surfaces))
+
+def feature_areas(table, scale=None):
+    """
+    Area of every pad, line and surface of a FeatureTable, in the order
+    of feature_table_bboxes(). Lines are the union of the aperture swept
+    along the line: For round apertures 2rL + pi*r², for square apertures
+    s² + sL(|cos a| + |sin a|). Pads with user symbols have an area of 0.
+    scale converts symbol units to coordinate units (default: table.symbol_scale).
+    """
+    if scale is None:
+        scale = table.symbol_scale
+    pads, lines = table.pads, table.lines
+    areas = _symbol_areas(table, scale)
+    pad_areas = areas[np.minimum(pads["symbol"], len(areas) - 1)] * pads["resize_factor"] ** 2
+    # Lines: Aperture width and shape
+    width = np.zeros(len(areas))
+    square = np.zeros(len(areas), dtype=bool)
+    for num, name in table.symbol_names.items():
+        size = symbol_size(name)
+        width[num] = max(size) * scale if size is not None else 0.
+        square[num] = isinstance(parse_standard_symbol(name), Square)
+    symbols = np.minimum(lines["symbol"], len(areas) - 1)
+    dx, dy = lines["xe"] - lines["xs"], lines["ye"] - lines["ys"]
+    length = np.hypot(dx, dy)
+    w = width[symbols]
+    line_areas = np.where(square[symbols], w * w + w * (np.abs(dx) + np.abs(dy)),
+                          w * length + np.pi * w * w / 4)
+    has_contour = ~np.isnan(table.surfaces["minx"])
+    return np.concatenate([pad_areas, line_areas, surface_areas(table)[has_contour]])
+
+def _polarities(table):
+    "Polarity values in the order of feature_table_bboxes()"
+    has_contour = ~np.isnan(table.surfaces["minx"])
+    return np.concatenate([table.pads["polarity"], table.lines["polarity"],
+                           table.surfaces["polarity"][has_contour]])
+
+def _has_overlaps(boxes):
+    """
+    Check if any two boxes intersect using a sweep over x.
+    Boxes that only touch at an edge don't overlap.
+    Returns True if there are too many candidate pairs to check.
+    """
+    order = np.argsort(boxes[:, 0], kind="stable")
+    boxes = boxes[order]
+    # Candidates for box i are the boxes i+1...ends[i]-1 starting before box i ends
+    ends = np.searchsorted(boxes[:, 0], boxes[:, 2], side="left")
+    counts = np.maximum(ends - np.arange(len(boxes)) - 1, 0)
+    if counts.sum() > _max_overlap_candidates:
+        return True
+    first = np.repeat(np.arange(len(boxes)), counts)
+    second = first + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return bool(np.any((boxes[first, 1] < boxes[second, 3]) & (boxes[second, 1] < boxes[first, 3])))
+
+def _grid_edges(bounds, grid):
+    minx, miny, maxx, maxy = bounds
+    rows, cols = grid
+    return np.linspace(minx, maxx, cols + 1), np.linspace(maxy, miny, rows + 1)
+
+def _exact_cells(table, bounds, grid, scale):
+    ids, boxes = feature_table_bboxes(table, scale)
+    areas = feature_areas(table, scale)
+    areas = np.where(_polarities(table) == Polarity.Negative.value, -areas, areas)
+    xedges, yedges = _grid_edges(bounds, grid)
+    cx, cy = (boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2
+    minx, miny, maxx, maxy = bounds
+    inside = (cx >= minx) & (cx <= maxx) & (cy >= miny) & (cy <= maxy)
+    # Centers on the right or bottom border belong to the last cell
+    col = np.minimum(np.searchsorted(xedges, cx, side="right") - 1, grid[1] - 1)
+    row = np.minimum(np.searchsorted(-yedges, -cy, side="right") - 1, grid[0] - 1)
+    cells = np.zeros(grid)
+    np.add.at(cells, (row[inside], col[inside]), areas[inside])
+    return cells
+
+def _raster_cells(table, bounds, grid, resolution, scale, workers):
+    raster = RasterGrid.from_bounds(bounds, resolution)
+    xedges, yedges = _grid_edges(bounds, grid)
+    # Grid cell of every pixel column and row, by pixel center
+    colcell = np.clip(np.searchsorted(xedges, raster.minx + (np.arange(raster.width) + 0.5) * resolution,
+                                      side="right") - 1, 0, grid[1] - 1)
+    rowcell = np.clip(np.searchsorted(-yedges, -(raster.maxy - (np.arange(raster.height) + 0.5) * resolution),
+                                      side="right") - 1, 0, grid[0] - 1)
+    counts = np.zeros(grid, dtype=np.int64)
+    for row0, col0, tile in iter_tiles(table, resolution, bounds, workers=workers, scale=scale):
+        rows = rowcell[row0:row0 + tile.shape[0]]
+        cols = colcell[col0:col0 + tile.shape[1]]
+        # Cells are contiguous pixel ranges: Reduce each range
+        rstarts = np.concatenate([[0], np.nonzero(np.diff(rows))[0] + 1])
+        cstarts = np.concatenate([[0], np.nonzero(np.diff(cols))[0] + 1])
+        sums = np.add.reduceat(np.add.reduceat(tile, rstarts, axis=0, dtype=np.int64), cstarts, axis=1)
+        counts[np.ix_(rows[rstarts], cols[cstarts])] += sums
+    return counts * resolution ** 2
+
+def copper_stats(table, grid=(1, 1), bounds=None, method="auto", resolution=None,
+                 scale=None, workers=None):
+    """
+    Compute the CopperStats of a FeatureTable.
+
+    grid is the number of (rows, cols) of grid cells.
+    bounds is the (minx, miny, maxx, maxy) area, e.g. the profile bbox().
+    By default, the extent of the layer is used.
+    method is "exact", "raster" or "auto" (see the module documentation).
+    resolution is the pixel size for the raster method,
+    by default 1/8192 of the larger side of the bounds.
+    workers is the number of rendering processes for the raster method.
+    scale converts symbol units to coordinate units (default: table.symbol_scale).
+    """
+    if method not in ("auto", "exact", "raster"):
+        raise ValueError("Unknown copper area method: {}".format(method))
+    if scale is None:
+        scale = table.symbol_scale
+    bounds = bounds or table.extent(scale) or (0., 0., 0., 0.)
+    minx, miny, maxx, maxy = bounds
+    xedges, yedges = _grid_edges(bounds, grid)
+    cell_areas = np.outer(yedges[:-1] - yedges[1:], np.diff(xedges))
+    if method == "auto":
+        _, boxes = feature_table_bboxes(table, scale)
+        negative = np.any(_polarities(table) == Polarity.Negative.value)
+        method = "raster" if negative or _has_overlaps(boxes) else "exact"
+    if method == "exact" or not len(table) or maxx <= minx or maxy <= miny:
+        cells = _exact_cells(table, bounds, grid, scale)
+        method = "exact"
+    else:
+        resolution = resolution or max(maxx - minx, maxy - miny) / 8192
+        cells = _raster_cells(table, bounds, grid, resolution, scale, workers)
+    return CopperStats(bounds, (maxx - minx) * (maxy - miny), float(cells.sum()),
+                       cell_areas, cells, method)
+
+def _layer_copper_stats(args):
+    table, kwargs = args
+    return copper_stats(table, workers=1, **kwargs)
+
+def copper_stats_all(tables, workers=None, **kwargs):
+    """
+    Compute the CopperStats of many layers in a process pool.
+    tables is a dict layer name => FeatureTable, e.g. from read_all_layer_features().
+    All other arguments are passed to copper_stats(). Pass the same bounds
+    (e.g. the profile bbox()) to get comparable grid cells for all layers.
+    Returns a dict layer name => CopperStats.
+    """
+    names = list(tables.keys())
+    tasks = [(tables[name], kwargs) for name in names]
+    if workers == 1 or len(tasks) <= 1:
+        return {name: _layer_copper_stats(task) for name, task in zip(names, tasks)}
+    with ProcessPoolExecutor(workers) as executor:
+        return dict(zip(names, executor.map(_layer_copper_stats, tasks)))
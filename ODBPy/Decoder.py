@@ -8,9 +8,10 @@ into tag lists.
 
 The result can then be used in the treeifier.
 """
+import re
 from collections import namedtuple
 
-__all__ = ["run_decoder", "run_decoder_on_line", "DecoderOption"]
+__all__ = ["run_decoder", "run_decoder_on_line", "DecoderOption", "CompiledDecoder"]
 
 class DecoderOption(namedtuple("DecoderOption", ["regex", "function"])):
     """
@@ -25,10 +26,78 @@ class DecoderOption(namedtuple("DecoderOption", ["regex", "function"])):
         match = self.regex.search(line)
         return self.function(match) if match is not None else None
 
+# Matches the pattern text of regexes like r"^OB\s+..." or r"^OE\s*$"
+_leading_token_re = re.compile(r"^\^([A-Za-z]+)(?=\\s|\$)")
+
+def _leading_token(opt):
+    """
+    Return the literal record token (e.g. "P" or "OB") every line
+    matched by the option's regex starts with, or None if there is no such token.
+    """
+    if opt.regex.flags & re.IGNORECASE:
+        return None
+    match = _leading_token_re.match(opt.regex.pattern)
+    return match.group(1) if match is not None else None
+
+class CompiledDecoder(object):
+    """
+    Decoder built from a list of DecoderOptions that dispatches every line
+    by its leading token (e.g. "P", "OB" or "CMP"), so only the regexes
+    for that record type are run, instead of trying every option in order.
+
+    Options without a literal leading token are tried for every line.
+    The result is identical to running the options in order.
+
+    fast_paths optionally maps a leading token to a regex-free unary
+    function taking the line. It returns the tag, or None if it
+    can't handle the line, in which case the regex options decide.
+    The fast path for the key None is used for lines whose
+    leading token has no fast path of its own (e.g. netlist points).
+    """
+    def __init__(self, opts, fast_paths=None):
+        self.options = list(opts)
+        self.fast_paths = dict(fast_paths or {})
+        self._default_fast_path = self.fast_paths.get(None)
+        tokens = [_leading_token(opt) for opt in self.options]
+        self._fallback = [opt for opt, token in zip(self.options, tokens) if token is None]
+        self._dispatch = {
+            token: [opt for opt, opt_token in zip(self.options, tokens)
+                    if opt_token in (token, None)]
+            for token in set(tokens) if token is not None
+        }
+
+    def decode_line(self, line):
+        """Decode a line and return a tag or None"""
+        tokens = line.split(None, 1)
+        if not tokens:
+            opts = self._fallback
+        else:
+            fast_path = self.fast_paths.get(tokens[0], self._default_fast_path)
+            if fast_path is not None:
+                try:
+                    tag = fast_path(line)
+                except (ValueError, KeyError, IndexError):
+                    tag = None
+                if tag is not None:
+                    return tag
+            opts = self._dispatch.get(tokens[0], self._fallback)
+        for opt in opts:
+            match = opt.regex.search(line)
+            if match is not None:
+                return opt.function(match)
+        return None
+
+    def __call__(self, lines):
+        """Lazily decode all lines"""
+        return map(self.decode_line, lines)
+
 def run_decoder_on_line(line, opts):
     """
-    Run a decoder on a line and return a tag or None
+    Run a decoder on a line and return a tag or None.
+    opts may be a list of DecoderOptions or a CompiledDecoder.
     """
+    if isinstance(opts, CompiledDecoder):
+        return opts.decode_line(line)
     potential_matches = (opt.run(line) for opt in opts)
     # Remove Nones from generator
     matches = filter(lambda x: x is not None, potential_matches)
@@ -38,4 +107,9 @@ def run_decoder_on_line(line, opts):
         return None
 
 def run_decoder(lines, opts):
-    return (run_decoder_on_line(line, opts) for line in lines)
+    """
+    Lazily decode the given lines.
+    opts may be a list of DecoderOptions or a CompiledDecoder.
+    """
+    decoder = opts if isinstance(opts, CompiledDecoder) else CompiledDecoder(opts)
+    return decoder(lines)
@@ -5,10 +5,9 @@ Read the structured text ODB++ drill tools file
 """
 import gzip
 from collections import namedtuple, defaultdict
-import os.path
 from enum import Enum
 from .Utils import readFileLines 
-from .StructuredTextParser import read_structured_text
+from .StructuredTextParser import read_job_structured_text
 from .Structures import HolePlating
 
 __all__ = ["DrillToolSet", "DrillTool", "DrillToolType", "parse_drill_tools", "read_drill_tools"]
@@ -60,6 +59,6 @@ def parse_drill_tools(structured_text):
     return DrillToolSet(metadata, toolmap)
 
 def read_drill_tools(odbpath):
-    "Read the drill tools from a given ODB++ directory"
-    stext = read_structured_text(os.path.join(odbpath, "steps/pcb/layers/through_drill/tools"))
+    "Read the drill tools from a given ODB++ directory, archive or JobSource"
+    stext = read_job_structured_text(odbpath, "steps/pcb/layers/through_drill/tools")
     return parse_drill_tools(stext)
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar ODB++ layer feature store.
+
+Instead of one Pad or Line object per record, the pads, lines and surfaces
+of a layer are decoded into NumPy structured arrays (see pad_dtype, line_dtype
+and surface_dtype). Surface contours are stored in polygon and step arrays.
+Attributes are stored once per distinct attribute string in a side table.
+Pad, Line and Surface objects are only built on demand when indexing a row.
+
+In nanometers mode, all coordinates are converted to int64 nanometers
+while decoding (see Units.to_nanometers()) so they compare exactly.
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .Attributes import intern_attributes, empty_attributes
+from .JobSource import job_source
+from .LineRecordParser import iter_linerecords, materialize_sections
+from .Layers import read_layers
+from .Features import parse_feature_map
+from .Units import linerecords_unit, default_unit, nanometer_unit, \
+    nanometer_dtype, records_to_nanometers, symbol_scale
+from .LayerFeatureParser import Pad, Line, _tokenize_pad, _tokenize_line, _fast_features_decoder
+from .Decoder import CompiledDecoder
+from .SurfaceParser import Surface, SurfaceBeginTag, SurfaceEndTag, \
+    surface_decoder_options, surface_fast_paths
+from .PolygonParser import Polygon, PolygonSegment, PolygonCircle, PolygonType, CircleDirection, \
+    PolygonBeginTag, PolygonSegmentTag, PolygonCircleTag, PolygonEndTag, polygon_decoder_options, \
+    polygon_fast_paths, _tokenize_contour
+from .Numeric import numeric_records
+from .Geometry import steps_bbox, step_segment, step_arc_cw, step_arc_ccw
+from .SpatialIndex import feature_table_bboxes
+from .Tessellation import tessellate_table
+from .Structures import Point, Polarity, Mirror, SymbolReference
+
+__all__ = ["FeatureTable", "pad_dtype", "line_dtype", "surface_dtype", "polygon_dtype",
+           "step_dtype", "decode_feature_table", "read_feature_table", "read_all_layer_features"]
+
+# index: Ordinal of the feature record in the layer (i.e. the ODB++ feature index)
+# polarity and mirror: Polarity and Mirror enum values
+# attributes: Index into FeatureTable.attributes or -1 if there are no attributes
+pad_dtype = np.dtype([
+    ("index", np.int64), ("x", np.float64), ("y", np.float64),
+    ("symbol", np.int32), ("resize_factor", np.float64),
+    ("polarity", np.int8), ("dcode", np.int32), ("mirror", np.int8),
+    ("angle", np.float64), ("attributes", np.int32)
+])
+
+line_dtype = np.dtype([
+    ("index", np.int64), ("xs", np.float64), ("ys", np.float64),
+    ("xe", np.float64), ("ye", np.float64), ("symbol", np.int32),
+    ("polarity", np.int8), ("dcode", np.int32), ("attributes", np.int32)
+])
+
+# Surfaces refer to the range polygon_start...polygon_end-1 of FeatureTable.polygons,
+# polygons to the range step_start...step_end-1 of FeatureTable.steps.
+# The bounding boxes (including arcs) are computed when decoding.
+_bbox_fields = [("minx", np.float64), ("miny", np.float64),
+                ("maxx", np.float64), ("maxy", np.float64)]
+
+surface_dtype = np.dtype([
+    ("index", np.int64), ("polarity", np.int8), ("dcode", np.int32),
+    ("attributes", np.int32), ("polygon_start", np.int64), ("polygon_end", np.int64)
+] + _bbox_fields)
+
+# type: PolygonType value
+polygon_dtype = np.dtype([
+    ("surface", np.int64), ("type", np.int8),
+    ("step_start", np.int64), ("step_end", np.int64)
+] + _bbox_fields)
+
+# kind: Geometry.step_segment, step_arc_cw or step_arc_ccw. (xc, yc) is 0 for segments
+step_dtype = np.dtype([
+    ("xs", np.float64), ("ys", np.float64), ("xe", np.float64), ("ye", np.float64),
+    ("xc", np.float64), ("yc", np.float64), ("kind", np.int8)
+])
+
+_contour_decoder = CompiledDecoder(surface_decoder_options + polygon_decoder_options,
+                                   dict(surface_fast_paths, **polygon_fast_paths))
+_contour_tokens = frozenset(["OB", "OS", "OC", "OE", "SE"])
+
+# Record tokens that start a feature and therefore get a feature index
+_feature_tokens = frozenset(["P", "L", "A", "T", "B", "S"])
+
+_polarity_codes = {"P": Polarity.Positive.value, "N": Polarity.Negative.value}
+_mirror_codes = {8: Mirror.No.value, 9: Mirror.MirrorX.value}
+# Coordinate fields that are int64 nanometers in nanometers mode.
+# The polygon and surface bounding boxes stay float64 (in nanometers),
+# because contours without steps have NaN bounding boxes.
+_pad_nm_fields = ("x", "y")
+_line_nm_fields = ("xs", "ys", "xe", "ye")
+_step_nm_fields = ("xs", "ys", "xe", "ye", "xc", "yc")
+
+_polygon_type_codes = {"I": PolygonType.Island.value, "H": PolygonType.Hole.value}
+_arc_kinds = {"Y": step_arc_cw, "N": step_arc_ccw}
+
+class FeatureTable(object):
+    """
+    The pads, lines and surfaces of a layer as NumPy structured arrays.
+
+    pads, lines and surfaces are arrays of pad_dtype, line_dtype and surface_dtype.
+    The surface contours are stored in polygons (polygon_dtype)
+    and steps (step_dtype).
+    attributes is the list of distinct raw attribute strings
+    the "attributes" columns refer to.
+    symbol_names maps the "symbol" columns to symbol names like "r120".
+    unit is the unit string of the coordinates (e.g. "MM") or None if unknown.
+    Tables decoded in nanometers mode have int64 coordinate columns and unit "NM".
+    source_unit is the unit of the file the table was decoded from.
+    It defaults to unit and determines the unit of the symbol sizes.
+    """
+    def __init__(self, pads, lines, attributes, symbol_names=None, unit=None,
+                 surfaces=None, polygons=None, steps=None, source_unit=None):
+        self.pads = pads
+        self.lines = lines
+        self.attributes = attributes
+        self.symbol_names = symbol_names or {}
+        self.unit = unit
+        self.source_unit = source_unit or unit
+        self.surfaces = surfaces if surfaces is not None else np.empty(0, dtype=surface_dtype)
+        self.polygons = polygons if polygons is not None else np.empty(0, dtype=polygon_dtype)
+        self.steps = steps if steps is not None else np.empty(0, dtype=step_dtype)
+        self._extents = {} # scale => extent
+        self._tessellations = {} # tolerance => Tessellation
+
+    def _attributes(self, idx):
+        return intern_attributes(self.attributes[idx]) if idx >= 0 else empty_attributes
+
+    def pad(self, i):
+        """Build the Pad object for the given pad row"""
+        row = self.pads[i]
+        return Pad(Point(float(row["x"]), float(row["y"])),
+                   SymbolReference(int(row["symbol"]), float(row["resize_factor"])),
+                   Polarity(int(row["polarity"])), int(row["dcode"]),
+                   Mirror(int(row["mirror"])), float(row["angle"]),
+                   self._attributes(int(row["attributes"])))
+
+    def line(self, i):
+        """Build the Line object for the given line row"""
+        row = self.lines[i]
+        return Line(Point(float(row["xs"]), float(row["ys"])),
+                    Point(float(row["xe"]), float(row["ye"])),
+                    SymbolReference(int(row["symbol"]), 1.0),
+                    Polarity(int(row["polarity"])), int(row["dcode"]),
+                    self._attributes(int(row["attributes"])))
+
+    def polygon(self, i):
+        """Build the Polygon object for the given polygon row"""
+        row = self.polygons[i]
+        steps = []
+        for xs, ys, xe, ye, xc, yc, kind in self.steps[row["step_start"]:row["step_end"]].tolist():
+            if kind == step_segment:
+                steps.append(PolygonSegment(Point(xs, ys), Point(xe, ye)))
+            else:
+                direction = CircleDirection.Clockwise if kind == step_arc_cw \
+                    else CircleDirection.CounterClockwise
+                steps.append(PolygonCircle(Point(xs, ys), Point(xe, ye), Point(xc, yc), direction))
+        return Polygon(PolygonType(int(row["type"])), steps)
+
+    def surface(self, i):
+        """Build the Surface object for the given surface row"""
+        row = self.surfaces[i]
+        polygons = [self.polygon(j) for j in range(row["polygon_start"], row["polygon_end"])]
+        return Surface(Polarity(int(row["polarity"])), int(row["dcode"]), polygons,
+                       self._attributes(int(row["attributes"])))
+
+    def features(self):
+        """Lazily build all Pad, Line and Surface objects in file order"""
+        builders = [self.pad, self.line, self.surface]
+        arrays = [self.pads, self.lines, self.surfaces]
+        indices = np.concatenate([arr["index"] for arr in arrays])
+        kinds = np.concatenate([np.full(len(arr), kind) for kind, arr in enumerate(arrays)])
+        rows = np.concatenate([np.arange(len(arr)) for arr in arrays])
+        for i in np.argsort(indices, kind="stable").tolist():
+            yield builders[kinds[i]](int(rows[i]))
+
+    @property
+    def symbol_scale(self):
+        """
+        Factor that converts symbol sizes (mil or micron) to coordinate units:
+        0.001, or 25400 (inch files) or 1000 (mm files) for nanometer tables.
+        """
+        return symbol_scale(self.unit, self.source_unit)
+
+    def extent(self, scale=None):
+        """
+        Returns the (minx, miny, maxx, maxy) bounding box of all features
+        (see SpatialIndex.feature_table_bboxes()) or None if there are none.
+        The result is cached.
+        """
+        if scale is None:
+            scale = self.symbol_scale
+        if scale not in self._extents:
+            _, boxes = feature_table_bboxes(self, scale)
+            self._extents[scale] = None if not len(boxes) else (
+                float(boxes[:, 0].min()), float(boxes[:, 1].min()),
+                float(boxes[:, 2].max()), float(boxes[:, 3].max()))
+        return self._extents[scale]
+
+    def tessellation(self, tolerance):
+        """
+        Returns the Tessellation of all surface polygons with arcs
+        flattened to the given chord error tolerance.
+        All arcs of the layer are tessellated at once, the result is cached per tolerance.
+        """
+        if tolerance not in self._tessellations:
+            self._tessellations[tolerance] = tessellate_table(self, tolerance)
+        return self._tessellations[tolerance]
+
+    def __len__(self):
+        return len(self.pads) + len(self.lines) + len(self.surfaces)
+
+    def to_arrays(self):
+        """Arrays for saving the table, e.g. using numpy.savez()"""
+        symbol_nums = sorted(self.symbol_names.keys())
+        return {
+            "pads": self.pads, "lines": self.lines,
+            "attributes": np.array(self.attributes, dtype=str),
+            "symbol_nums": np.array(symbol_nums, dtype=np.int64),
+            "symbol_names": np.array([self.symbol_names[num] for num in symbol_nums], dtype=str),
+            "unit": np.array(self.unit or "", dtype=str),
+            "source_unit": np.array(self.source_unit or "", dtype=str),
+            "surfaces": self.surfaces, "polygons": self.polygons, "steps": self.steps
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Restore a table from to_arrays() output"""
+        symbol_names = dict(zip(arrays["symbol_nums"].tolist(), arrays["symbol_names"].tolist()))
+        source_unit = str(arrays["source_unit"]) if "source_unit" in arrays else ""
+        return cls(arrays["pads"], arrays["lines"], arrays["attributes"].tolist(),
+                   symbol_names, str(arrays["unit"]) or None,
+                   arrays["surfaces"], arrays["polygons"], arrays["steps"], source_unit or None)
+
+    @property
+    def nbytes(self):
+        """Approximate memory usage of the arrays and the attribute table"""
+        return self.pads.nbytes + self.lines.nbytes + self.surfaces.nbytes + \
+            self.polygons.nbytes + self.steps.nbytes + sum(len(s) for s in self.attributes)
+
+    def __repr__(self):
+        return "FeatureTable({} pads, {} lines, {} surfaces, {} distinct attribute sets)".format(
+            len(self.pads), len(self.lines), len(self.surfaces), len(self.attributes))
+
+class _ColumnBuilder(object):
+    """
+    Collects rows as tuples and converts them to a structured array in chunks.
+    Numeric fields may be number tokens, which are converted with the whole chunk.
+    If unit is given, the nanometer_fields of every chunk are converted
+    from that unit to int64 nanometers.
+    """
+    def __init__(self, dtype, chunksize, nanometer_fields=(), unit=None):
+        self.dtype = dtype
+        self.chunksize = chunksize
+        self.nanometer_fields = nanometer_fields
+        self.unit = unit
+        self.result_dtype = nanometer_dtype(dtype, nanometer_fields) if unit is not None else dtype
+        self.rows = []
+        self.chunks = []
+
+    def append(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            chunk = numeric_records(self.rows, self.dtype)
+            if self.unit is not None:
+                chunk = records_to_nanometers(chunk, self.nanometer_fields, self.unit)
+            self.chunks.append(chunk)
+            self.rows = []
+
+    def finish(self):
+        self.flush()
+        if not self.chunks:
+            return np.empty(0, dtype=self.result_dtype)
+        return np.concatenate(self.chunks)
+
+class _FeatureTableBuilder(object):
+    "unit: The file unit to convert the coordinates from to nanometers or None"
+    def __init__(self, chunksize, unit=None):
+        self.pads = _ColumnBuilder(pad_dtype, chunksize, _pad_nm_fields, unit)
+        self.lines = _ColumnBuilder(line_dtype, chunksize, _line_nm_fields, unit)
+        self.surfaces = _ColumnBuilder(surface_dtype, chunksize)
+        self.polygons = _ColumnBuilder(polygon_dtype, chunksize)
+        self.steps = _ColumnBuilder(step_dtype, chunksize, _step_nm_fields, unit)
+        self._nsurfaces = self._npolygons = self._nsteps = 0
+        self._surface = None # (SurfaceBeginTag, attribute index, first polygon) while in a surface
+        self._polygon = None # (PolygonType value, first step) while in a polygon
+        self._point = None # Current contour point
+        self.attributes = []
+        self._attribute_indices = {}
+        self.index = 0
+
+    def _attribute_index(self, attribute_str):
+        if attribute_str is None:
+            return -1
+        idx = self._attribute_indices.get(attribute_str)
+        if idx is None:
+            idx = self._attribute_indices[attribute_str] = len(self.attributes)
+            self.attributes.append(attribute_str)
+        return idx
+
+    def _add_pad(self, line):
+        try:
+            tokens = _tokenize_pad(line)
+        except (ValueError, IndexError):
+            tokens = None
+        if tokens is not None:
+            x, y, sym, resize_factor, polarity, dcode, orient_code, angle, attributes = tokens
+            self.pads.append((self.index, x, y, sym, resize_factor, _polarity_codes[polarity],
+                              dcode, _mirror_codes[orient_code], angle,
+                              self._attribute_index(attributes)))
+            return
+        pad = _fast_features_decoder.decode_line(line) # Regex path
+        if isinstance(pad, Pad):
+            self.pads.append((self.index, pad.coords.x, pad.coords.y, pad.symbol.symcode,
+                              pad.symbol.resize_factor, pad.polarity.value, pad.dcode,
+                              pad.mirror.value, pad.angle, self._raw_attribute_index(line)))
+
+    def _add_line(self, line):
+        try:
+            tokens = _tokenize_line(line)
+        except (ValueError, IndexError):
+            tokens = None
+        if tokens is not None:
+            xs, ys, xe, ye, sym, polarity, dcode, attributes = tokens
+            self.lines.append((self.index, xs, ys, xe, ye, sym, _polarity_codes[polarity],
+                               dcode, self._attribute_index(attributes)))
+            return
+        feature = _fast_features_decoder.decode_line(line) # Regex path
+        if isinstance(feature, Line):
+            self.lines.append((self.index, feature.start.x, feature.start.y,
+                               feature.end.x, feature.end.y, feature.symbol.symcode,
+                               feature.polarity.value, feature.dcode,
+                               self._raw_attribute_index(line)))
+
+    def _raw_attribute_index(self, line):
+        "Attribute index for a line decoded by the regex path (which starts attributes at the first ;)"
+        record, sep, attributes = line.partition(";")
+        return self._attribute_index(attributes if sep else None)
+
+    def _add_surface_begin(self, line):
+        tag = _contour_decoder.decode_line(line)
+        if isinstance(tag, SurfaceBeginTag):
+            self._surface = (tag, self._raw_attribute_index(line), self._npolygons)
+
+    def _add_step(self, xe, ye, xc, yc, kind):
+        if self._polygon is None:
+            return
+        xs, ys = self._point
+        self.steps.append((xs, ys, xe, ye, xc, yc, kind))
+        self._nsteps += 1
+        self._point = (xe, ye)
+
+    def _add_contour(self, line):
+        "Add a polygon or surface end record of the current surface"
+        tokens = _tokenize_contour(line)
+        if tokens is not None: # Number tokens are converted in one batch per chunk
+            token = tokens[0]
+            if token == "OS":
+                self._add_step(tokens[1], tokens[2], 0., 0., step_segment)
+            elif token == "OC":
+                self._add_step(tokens[1], tokens[2], tokens[3], tokens[4], _arc_kinds[tokens[5]])
+            else:
+                self._polygon = (_polygon_type_codes[tokens[3]], self._nsteps)
+                self._point = (tokens[1], tokens[2])
+            return
+        tag = _contour_decoder.decode_line(line) # Regex path
+        if isinstance(tag, PolygonBeginTag):
+            self._polygon = (tag.type.value, self._nsteps)
+            self._point = tag.start
+        elif isinstance(tag, PolygonSegmentTag):
+            self._add_step(tag.end.x, tag.end.y, 0., 0., step_segment)
+        elif isinstance(tag, PolygonCircleTag):
+            kind = step_arc_cw if tag.direction == CircleDirection.Clockwise else step_arc_ccw
+            self._add_step(tag.end.x, tag.end.y, tag.center.x, tag.center.y, kind)
+        elif isinstance(tag, PolygonEndTag) and self._polygon is not None:
+            polygon_type, step_start = self._polygon
+            self.polygons.append((self._nsurfaces, polygon_type, step_start, self._nsteps,
+                                  0., 0., 0., 0.))
+            self._npolygons += 1
+            self._polygon = None
+        elif isinstance(tag, SurfaceEndTag):
+            begin, attributes, polygon_start = self._surface
+            self.surfaces.append((self._surface_index, begin.polarity.value, begin.dcode,
+                                  attributes, polygon_start, self._npolygons, 0., 0., 0., 0.))
+            self._nsurfaces += 1
+            self._surface = None
+
+    def add(self, line):
+        tokens = line.split(None, 1)
+        token = tokens[0] if tokens else None
+        if self._surface is not None and token in _contour_tokens:
+            self._add_contour(line)
+            return
+        if token not in _feature_tokens:
+            return
+        if token == "P":
+            self._add_pad(line)
+        elif token == "L":
+            self._add_line(line)
+        elif token == "S":
+            self._surface_index = self.index
+            self._add_surface_begin(line)
+        self.index += 1
+
+    def finish(self, symbol_names=None, unit=None, source_unit=None):
+        steps = self.steps.finish()
+        polygons = self.polygons.finish()
+        surfaces = self.surfaces.finish()
+        # Bounding boxes: Steps => polygons => surfaces
+        step_boxes = np.stack(steps_bbox(steps["xs"], steps["ys"], steps["xe"], steps["ye"],
+                                         steps["xc"], steps["yc"], steps["kind"]), axis=1)
+        polygon_boxes = _reduce_boxes(step_boxes, polygons["step_start"], polygons["step_end"])
+        surface_boxes = _reduce_boxes(polygon_boxes, surfaces["polygon_start"], surfaces["polygon_end"])
+        for arr, boxes in [(polygons, polygon_boxes), (surfaces, surface_boxes)]:
+            for i, field in enumerate(["minx", "miny", "maxx", "maxy"]):
+                arr[field] = boxes[:, i]
+        return FeatureTable(self.pads.finish(), self.lines.finish(), self.attributes,
+                            symbol_names, unit, surfaces, polygons, steps, source_unit)
+
+def _reduce_boxes(boxes, starts, ends):
+    """
+    Union of the boxes in the ranges starts[i]...ends[i]-1.
+    Empty ranges and NaN boxes (i.e. empty children) are ignored.
+    Ranges without any box result in NaN boxes.
+    """
+    result = np.full((len(starts), 4), np.nan)
+    nonempty = ends > starts
+    if nonempty.any():
+        # Reduce over [start, end) pairs. The padding row allows end == len(boxes).
+        padded = np.concatenate([boxes, np.full((1, 4), np.nan)])
+        idx = np.stack([starts[nonempty], ends[nonempty]], axis=1).ravel()
+        result[nonempty, :2] = np.fmin.reduceat(padded[:, :2], idx)[::2]
+        result[nonempty, 2:] = np.fmax.reduceat(padded[:, 2:], idx)[::2]
+    return result
+
+def decode_feature_table(linerecords, chunksize=65536, nanometers=False):
+    """
+    Decode the pads, lines and surfaces of a linerecord dict or of a section stream
+    from iter_linerecords() into a FeatureTable.
+    Other features (arcs, text, barcodes) are counted for the feature
+    index, but not stored.
+
+    If nanometers is True, the coordinates are converted from the unit
+    of the file (inch if it has no unit line) to int64 nanometers.
+    The symbol sizes stay in the units of the file (mil or micron),
+    the source_unit of the table tells which.
+
+    At most chunksize rows are buffered as Python objects at any time.
+    """
+    linerecords = materialize_sections(linerecords, "Layer features")
+    symbol_names = parse_feature_map(linerecords["Feature symbol names"]) \
+        if "Feature symbol names" in linerecords else {}
+    unit = linerecords_unit(linerecords) if "Units" in linerecords else None
+    if nanometers:
+        unit = unit or default_unit
+    builder = _FeatureTableBuilder(chunksize, unit if nanometers else None)
+    for line in linerecords["Layer features"]:
+        builder.add(line)
+    return builder.finish(symbol_names, nanometer_unit if nanometers else unit, unit)
+
+def _features_path(layer):
+    return "steps/pcb/layers/{}/features.Z".format(layer)
+
+def read_feature_table(directory, layer, nanometers=False):
+    """
+    Read the features of the given layer into a FeatureTable.
+    See decode_feature_table() for the nanometers mode.
+    """
+    with job_source(directory) as source, source.open(_features_path(layer)) as fin:
+        return decode_feature_table(iter_linerecords(fin), nanometers=nanometers)
+
+def read_all_layer_features(directory, layers=None, workers=None, nanometers=False):
+    """
+    Read the features of many layers into FeatureTables using a process pool.
+
+    layers is an iterable of layer names or Layer objects. By default,
+    all layers in the matrix that have a features file are read.
+    The largest (compressed) feature files are scheduled first
+    so one big layer doesn't end up running alone at the end.
+    workers is the number of processes (default: number of CPUs).
+    With workers=1, all layers are read in the current process.
+    See decode_feature_table() for the nanometers mode.
+
+    Returns a dict layer name => FeatureTable in the order of the layers.
+    """
+    with job_source(directory) as job:
+        if layers is None:
+            names = [layer.name for layer in read_layers(job)
+                     if job.exists(_features_path(layer.name))]
+        else:
+            names = [getattr(layer, "name", layer) for layer in layers]
+        schedule = sorted(names, key=lambda name: job.size(_features_path(name)), reverse=True)
+        if workers == 1 or len(schedule) <= 1:
+            tables = {name: read_feature_table(job, name, nanometers) for name in schedule}
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                futures = {name: executor.submit(read_feature_table, job.path, name, nanometers)
+                           for name in schedule}
+                tables = {name: future.result() for name, future in futures.items()}
+    return {name: tables[name] for name in names}
@@ -4,18 +4,46 @@
 ODB++ feature info parser
 """
 from collections import namedtuple
+from .Attributes import FrozenAttributes
 
 __all__ = ["FeatureInfo", "parse_feature_info"]
 
 class FeatureInfo(namedtuple("FeatureInfo", ["symbol_names", "attribute_names", "strings"])):
     def apply(self, attributes):
         """Apply the current feature info to a given attribute dictionary.
-        This function is not content-aware and therefore"""
+        This function is not content-aware and therefore
+
+        The result for shared FrozenAttributes (i.e. attributes from the decoders)
+        is computed once and shared as well.
+        """
+        if not isinstance(attributes, FrozenAttributes):
+            return self._apply(attributes)
+        cache = self.__dict__.setdefault("_apply_cache", {})
+        result = cache.get(attributes)
+        if result is None:
+            result = cache[attributes] = FrozenAttributes(self._apply(attributes))
+        return result
+
+    def _apply(self, attributes):
         return {
             self.attribute_names[k]: v
             for k, v in attributes.items()
         }
 
+    def attribute_id(self, name):
+        """Find the numeric attribute ID for an attribute name like ".smd" or None"""
+        return self._inverse("attribute_names").get(name)
+
+    def string_id(self, text):
+        """Find the numeric ID of an attribute text string or None"""
+        return self._inverse("strings").get(text)
+
+    def _inverse(self, field):
+        key = "_inverse_" + field
+        if key not in self.__dict__:
+            self.__dict__[key] = {v: k for k, v in getattr(self, field).items()}
+        return self.__dict__[key]
+
 def parse_feature_map(elems):
     # The first character ($, @, &) is ignored as it is clear from the context
     ret = {}
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized geometry of polygon contour steps.
+
+Contour steps are given as coordinate arrays:
+(xs, ys) start point, (xe, ye) end point, (xc, yc) arc center
+and kind (step_segment, step_arc_cw or step_arc_ccw) for every step.
+An arc whose start point equals its end point is a full circle.
+"""
+import numpy as np
+
+__all__ = ["step_segment", "step_arc_cw", "step_arc_ccw", "arc_angles", "steps_bbox"]
+
+step_segment = 0
+step_arc_cw = 1
+step_arc_ccw = 2
+
+def arc_angles(xs, ys, xe, ye, xc, yc, kind):
+    """
+    Compute (radius, start angle, counterclockwise sweep) of arc steps.
+    Clockwise arcs are described by their end angle and the counterclockwise
+    sweep from there to their start point, so the sweep is always positive.
+    Angles are in radians. Full circles have a sweep of 2*pi.
+    """
+    radius = np.hypot(xs - xc, ys - yc)
+    angle_start = np.arctan2(ys - yc, xs - xc)
+    angle_end = np.arctan2(ye - yc, xe - xc)
+    clockwise = kind == step_arc_cw
+    angle0 = np.where(clockwise, angle_end, angle_start)
+    angle1 = np.where(clockwise, angle_start, angle_end)
+    sweep = np.mod(angle1 - angle0, 2 * np.pi)
+    full_circle = (xs == xe) & (ys == ye)
+    sweep = np.where(full_circle, 2 * np.pi, sweep)
+    return radius, angle0, sweep
+
+def steps_bbox(xs, ys, xe, ye, xc, yc, kind):
+    """
+    Compute the bounding box (minx, miny, maxx, maxy) of every step.
+    For arcs, the extremal points (0°, 90°, 180° and 270°) inside the sweep are included.
+    """
+    xs, ys, xe, ye, xc, yc = (np.asarray(arr, dtype=np.float64) for arr in (xs, ys, xe, ye, xc, yc))
+    kind = np.asarray(kind)
+    minx, maxx = np.minimum(xs, xe), np.maximum(xs, xe)
+    miny, maxy = np.minimum(ys, ye), np.maximum(ys, ye)
+    arcs = kind != step_segment
+    if arcs.any():
+        radius, angle0, sweep = arc_angles(xs[arcs], ys[arcs], xe[arcs], ye[arcs],
+                                           xc[arcs], yc[arcs], kind[arcs])
+        def contains(angle):
+            return np.mod(angle - angle0, 2 * np.pi) <= sweep
+        cx, cy = xc[arcs], yc[arcs]
+        maxx[arcs] = np.where(contains(0), cx + radius, maxx[arcs])
+        maxy[arcs] = np.where(contains(np.pi / 2), cy + radius, maxy[arcs])
+        minx[arcs] = np.where(contains(np.pi), cx - radius, minx[arcs])
+        miny[arcs] = np.where(contains(3 * np.pi / 2), cy - radius, miny[arcs])
+    return minx, miny, maxx, maxy
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ODBJob: One object to access all parts of an ODB++ job.
+
+Every part (matrix, layers, profile, ...) is read on first access and memoized.
+Per-layer feature tables are kept in a LRU cache limited by a memory budget.
+Parts whose files changed on disk can be dropped using refresh(),
+or explicitly using invalidate().
+
+Optionally, parsed results are also stored in a persistent ParseCache.
+"""
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from .JobSource import JobSource, open_job, DirectoryJobSource
+from .StructuredTextParser import read_job_structured_text
+from .Layers import parse_layers
+from .Profile import read_profile
+from .Netlist import read_netlist
+from .NetlistIndex import read_netlist_index
+from .Components import read_components
+from .ComponentTable import read_component_table
+from .DrillTools import read_drill_tools
+from .FeatureTable import read_feature_table, _features_path
+from .SpatialIndex import SpatialIndex
+
+__all__ = ["ODBJob"]
+
+# Reader function and the job files each part depends on
+_parts = {
+    "matrix": (lambda job: read_job_structured_text(job.source, "matrix/matrix"),
+               ["matrix/matrix"]),
+    "layers": (lambda job: parse_layers(job.matrix), ["matrix/matrix"]),
+    "profile": (lambda job: read_profile(job.source), ["steps/pcb/profile"]),
+    "netlist": (lambda job: read_netlist(job.source), ["steps/pcb/netlists/cadnet/netlist"]),
+    "netlist_index": (lambda job: read_netlist_index(job.source),
+                      ["steps/pcb/netlists/cadnet/netlist"]),
+    "components": (lambda job: read_components(job.source),
+                   ["steps/pcb/layers/comp_+_top/components.Z",
+                    "steps/pcb/layers/comp_+_bot/components.Z"]),
+    "component_table": (lambda job: read_component_table(job.source),
+                        ["steps/pcb/layers/comp_+_top/components.Z",
+                         "steps/pcb/layers/comp_+_bot/components.Z"]),
+    "drill_tools": (lambda job: read_drill_tools(job.source),
+                    ["steps/pcb/layers/through_drill/tools"])
+}
+
+def _part(name, doc):
+    return property(lambda self: self._get(name), doc=doc)
+
+class _LayerFeatures(Mapping):
+    """
+    Mapping layer name => FeatureTable, read on access.
+    The least recently used tables are evicted if the total size
+    exceeds the memory budget of the job.
+    """
+    def __init__(self, job):
+        self._job = job
+        self._tables = OrderedDict() # name => (FeatureTable, fingerprint)
+
+    def __getitem__(self, layer):
+        if layer in self._tables:
+            self._tables.move_to_end(layer)
+            return self._tables[layer][0]
+        source = self._job.source
+        path = _features_path(layer)
+        if not source.exists(path):
+            raise KeyError(layer)
+        fingerprint = source.fingerprint(path)
+        if self._job.cache is not None:
+            table = self._job.cache.get(source, [path], "features",
+                                        lambda: read_feature_table(source, layer))
+        else:
+            table = read_feature_table(source, layer)
+        self._tables[layer] = (table, fingerprint)
+        self._evict(keep=layer)
+        return table
+
+    def _evict(self, keep=None):
+        budget = self._job.memory_budget
+        if budget is None:
+            return
+        while self.nbytes > budget and len(self._tables) > 1:
+            oldest = next(iter(self._tables))
+            if oldest == keep:
+                break
+            del self._tables[oldest]
+
+    def __iter__(self):
+        source = self._job.source
+        return (layer.name for layer in self._job.layers
+                if source.exists(_features_path(layer.name)))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    @property
+    def cached(self):
+        """Names of the layers currently in memory, least recently used first"""
+        return list(self._tables.keys())
+
+    @property
+    def nbytes(self):
+        return sum(table.nbytes for table, _ in self._tables.values())
+
+    def invalidate(self, layer=None):
+        if layer is None:
+            self._tables.clear()
+        else:
+            self._tables.pop(layer, None)
+
+    def refresh(self):
+        source = self._job.source
+        for layer, (_, fingerprint) in list(self._tables.items()):
+            if source.fingerprint(_features_path(layer)) != fingerprint:
+                del self._tables[layer]
+
+class ODBJob(object):
+    """
+    Lazy, memoizing access to an ODB++ job directory or archive.
+
+    memory_budget is the maximum number of bytes used by the cached
+    per-layer feature tables (None: unlimited). Other parts are small
+    and always kept until invalidated.
+
+    cache is an optional ParseCache that is used before parsing any file.
+
+    path may also be an opened JobSource, which is owned by the caller
+    and therefore not closed by close().
+    """
+    def __init__(self, path, memory_budget=256 << 20, cache=None):
+        self._owns_source = not isinstance(path, JobSource)
+        self.source = open_job(path)
+        self.path = self.source.path
+        self.memory_budget = memory_budget
+        self.cache = cache
+        self.features = _LayerFeatures(self)
+        self._parts = {} # name => (value, fingerprints)
+        self._spatial_indexes = {} # layer => (SpatialIndex, fingerprint)
+        self._archive_fingerprint = self._stat_archive()
+
+    matrix = _part("matrix", "The parsed matrix/matrix structured text file")
+    layers = _part("layers", "The LayerSet from the matrix")
+    profile = _part("profile", "The board Profile")
+    netlist = _part("netlist", "The CAD netlist")
+    netlist_index = _part("netlist_index", "The CAD netlist as NetlistIndex")
+    components = _part("components", "Top and bottom Components")
+    component_table = _part("component_table", "Top and bottom components as ComponentTable")
+    drill_tools = _part("drill_tools", "The through drill DrillToolSet")
+
+    def _get(self, name):
+        if name not in self._parts:
+            reader, files = _parts[name]
+            fingerprints = [self.source.fingerprint(path) for path in files]
+            if self.cache is not None and name != "layers": # layers are derived from the matrix
+                value = self.cache.get(self.source, files, name, lambda: reader(self))
+            else:
+                value = reader(self)
+            self._parts[name] = (value, fingerprints)
+        return self._parts[name][0]
+
+    def spatial_index(self, layer):
+        """
+        SpatialIndex of the pads, lines and surfaces of the given layer by feature index.
+        The index is memoized as long as the features file is unchanged.
+        """
+        path = _features_path(layer)
+        fingerprint = self.source.fingerprint(path)
+        if layer in self._spatial_indexes and self._spatial_indexes[layer][1] == fingerprint:
+            return self._spatial_indexes[layer][0]
+        build = lambda: SpatialIndex.from_feature_table(self.features[layer])
+        if self.cache is not None:
+            index = self.cache.get(self.source, [path], "spatial_index", build)
+        else:
+            index = build()
+        self._spatial_indexes[layer] = (index, fingerprint)
+        return index
+
+    def _stat_archive(self):
+        if isinstance(self.source, DirectoryJobSource):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    @property
+    def loaded(self):
+        """Names of the parts currently in memory"""
+        return sorted(self._parts.keys())
+
+    def invalidate(self, *names):
+        """
+        Drop the given memoized parts (e.g. "netlist") so they are read
+        again on the next access. Without names, everything is dropped,
+        including all feature tables.
+        """
+        if not names:
+            self._parts.clear()
+            self._spatial_indexes.clear()
+            self.features.invalidate()
+        for name in names:
+            self._parts.pop(name, None)
+            if name == "matrix": # The layers depend on the matrix
+                self._parts.pop("layers", None)
+
+    def refresh(self):
+        """
+        Drop all memoized parts whose files changed on disk since they were read.
+        If the job is an archive and the archive changed, it is reopened
+        and everything is dropped.
+        """
+        if self._stat_archive() != self._archive_fingerprint:
+            if self._owns_source:
+                self.source.close()
+            self.source = open_job(self.path)
+            self._owns_source = True
+            self._archive_fingerprint = self._stat_archive()
+            self.invalidate()
+            return
+        for name, (_, fingerprints) in list(self._parts.items()):
+            files = _parts[name][1]
+            if [self.source.fingerprint(path) for path in files] != fingerprints:
+                self.invalidate(name)
+        self.features.refresh()
+
+    def close(self):
+        if self._owns_source:
+            self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "ODBJob({!r})".format(self.path)
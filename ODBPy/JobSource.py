@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Access to the files of an ODB++ job, regardless of whether the job
+is an extracted directory or a .tgz, .tar or .zip archive.
+
+All paths are relative to the job root and use "/" as separator,
+e.g. "matrix/matrix" or "steps/pcb/layers/top/features.Z".
+
+Archives are opened once and indexed by member name, so single files
+can be read without extracting or scanning the whole archive.
+For tar archives, the index of member offsets is cached next to the
+archive (<archive>.odbindex) and reused as long as the archive is unchanged.
+"""
+import bisect
+import contextlib
+import io
+import json
+import os
+import os.path
+import tarfile
+import threading
+import zipfile
+import zlib
+from collections import namedtuple
+
+__all__ = ["JobSource", "DirectoryJobSource", "TarJobSource", "ZipJobSource", "open_job",
+           "job_source"]
+
+_index_version = 1
+_read_size = 1 << 16
+
+class JobSource(object):
+    """
+    Read-only access to the files of an ODB++ job.
+    Subclasses implement open(), exists(), size() and names().
+
+    path is the directory or archive filename that can be passed
+    to open_job() to open the same job again, e.g. in another process.
+    """
+    path = None
+
+    def open(self, path):
+        """Open the given job file for reading. Returns a binary file-like object."""
+        raise NotImplementedError
+
+    def exists(self, path):
+        """Return True if the given job file exists"""
+        raise NotImplementedError
+
+    def size(self, path):
+        """Return the (compressed) size of the given job file in bytes"""
+        raise NotImplementedError
+
+    def names(self):
+        """Return a list of the relative paths of all files in the job"""
+        raise NotImplementedError
+
+    def fingerprint(self, path):
+        """
+        Return a (size, mtime) tuple that changes when the given job file changes
+        or None if the file does not exist.
+        For archives, this is the fingerprint of the archive itself.
+        """
+        if not self.exists(path):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def listdir(self, path):
+        """List the names of the files and directories in the given job directory"""
+        prefix = path.strip("/") + "/" if path.strip("/") else ""
+        return sorted({
+            name[len(prefix):].partition("/")[0]
+            for name in self.names() if name.startswith(prefix)
+        })
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class DirectoryJobSource(JobSource):
+    """An extracted ODB++ job directory"""
+    def __init__(self, directory):
+        self.directory = self.path = directory
+
+    def _path(self, path):
+        return os.path.join(self.directory, *path.split("/"))
+
+    def open(self, path):
+        return open(self._path(path), "rb")
+
+    def exists(self, path):
+        return os.path.isfile(self._path(path))
+
+    def size(self, path):
+        return os.path.getsize(self._path(path))
+
+    def fingerprint(self, path):
+        try:
+            stat = os.stat(self._path(path))
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def names(self):
+        return [
+            os.path.relpath(os.path.join(root, filename), self.directory).replace(os.sep, "/")
+            for root, _, filenames in os.walk(self.directory)
+            for filename in filenames
+        ]
+
+    def listdir(self, path):
+        return sorted(os.listdir(self._path(path)))
+
+    def __repr__(self):
+        return "DirectoryJobSource({!r})".format(self.directory)
+
+def _job_root(names):
+    "Find the job root directory prefix inside an archive"
+    for name in names:
+        if name == "matrix/matrix" or name.endswith("/matrix/matrix"):
+            return name[:-len("matrix/matrix")]
+    return ""
+
+class _MemberReader(io.RawIOBase):
+    """Seekable view on the byte range of one member inside an archive stream"""
+    def __init__(self, fileobj, offset, size):
+        self._fileobj = fileobj
+        self._offset = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, b):
+        n = max(0, min(len(b), self._size - self._pos))
+        if n == 0:
+            return 0
+        self._fileobj.seek(self._offset + self._pos)
+        data = self._fileobj.read(n)
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._fileobj.close()
+        super().close()
+
+_GzipCheckpoint = namedtuple("GzipCheckpoint", ["upos", "cpos", "decompressor"])
+
+class _GzipIndex(object):
+    """
+    zlib checkpoints for random access into a gzip file,
+    shared by all readers of the same file.
+    A checkpoint is recorded every <spacing> bytes of uncompressed data.
+    Readers in different threads may add and find checkpoints concurrently.
+    """
+    def __init__(self, spacing=1 << 20):
+        self.spacing = spacing
+        self.checkpoints = [_GzipCheckpoint(0, 0, None)]
+        self._upos = [0]
+        self._lock = threading.Lock()
+
+    def add(self, upos, cpos, decompressor):
+        with self._lock:
+            if upos >= self._upos[-1] + self.spacing:
+                self.checkpoints.append(_GzipCheckpoint(upos, cpos, decompressor.copy()))
+                self._upos.append(upos)
+
+    def find(self, upos):
+        "Find the last checkpoint at or before the given uncompressed position"
+        with self._lock:
+            return self.checkpoints[bisect.bisect_right(self._upos, upos) - 1]
+
+class _GzipReader(io.RawIOBase):
+    """
+    Seekable reader for the uncompressed content of a gzip file.
+    Seeking restarts decompression at the nearest checkpoint
+    instead of the start of the file.
+    """
+    def __init__(self, filename, index):
+        self._fileobj = open(filename, "rb")
+        self._index = index
+        self._pos = 0 # Logical position
+        self._restore(index.checkpoints[0])
+
+    def _restore(self, checkpoint):
+        self._fileobj.seek(checkpoint.cpos)
+        self._decompressor = checkpoint.decompressor.copy() \
+            if checkpoint.decompressor is not None else zlib.decompressobj(31)
+        self._head = checkpoint.upos # Uncompressed position of self._pending[0]
+        self._pending = b""
+        self._eof = False
+
+    def _advance(self):
+        "Decompress the next chunk into self._pending"
+        self._head += len(self._pending)
+        chunk = self._fileobj.read(_read_size)
+        if not chunk:
+            self._pending = self._decompressor.flush()
+            self._eof = True
+            return
+        data = self._decompressor.decompress(chunk)
+        while self._decompressor.eof and self._decompressor.unused_data:
+            # Concatenated gzip members
+            unused = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(31)
+            data += self._decompressor.decompress(unused)
+        self._pending = data
+        if not self._decompressor.eof:
+            self._index.add(self._head + len(data), self._fileobj.tell(), self._decompressor)
+
+    def _seek_head(self, target):
+        "Make self._pending start at the given position, if possible"
+        if not self._head <= target <= self._head + len(self._pending):
+            checkpoint = self._index.find(target)
+            if target < self._head or checkpoint.upos > self._head:
+                self._restore(checkpoint)
+            while self._head + len(self._pending) < target and not self._eof:
+                self._advance()
+        drop = min(target - self._head, len(self._pending))
+        self._pending = self._pending[drop:]
+        self._head += drop
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            raise io.UnsupportedOperation("Can't seek relative to the end of a gzip stream")
+        self._pos = max(0, offset)
+        return self._pos
+
+    def readinto(self, b):
+        self._seek_head(self._pos)
+        while not self._pending and not self._eof:
+            self._advance()
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        self._head += n
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._fileobj.close()
+        super().close()
+
+class TarJobSource(JobSource):
+    """
+    An ODB++ job stored in an uncompressed or gzip compressed tar archive.
+
+    The member index (offset and size of every file) is cached in
+    <archive>.odbindex if index_cache is True. gzip checkpoints are kept in memory
+    only, so the first access to a member of a compressed archive still has to
+    decompress the archive up to that member.
+    """
+    def __init__(self, filename, index_cache=True):
+        self.filename = self.path = filename
+        with open(filename, "rb") as fin:
+            self.compressed = fin.read(2) == b"\x1f\x8b"
+        self._gzip_index = _GzipIndex() if self.compressed else None
+        self._members = self._read_index() if index_cache else None
+        if self._members is None:
+            self._members = self._build_index()
+            if index_cache:
+                self._write_index()
+
+    def _open_archive(self):
+        if self.compressed:
+            return io.BufferedReader(_GzipReader(self.filename, self._gzip_index), _read_size)
+        return open(self.filename, "rb")
+
+    @property
+    def index_filename(self):
+        return self.filename + ".odbindex"
+
+    def _fingerprint(self):
+        stat = os.stat(self.filename)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _build_index(self):
+        "Scan the tar headers once and record all member offsets"
+        with self._open_archive() as fileobj:
+            with tarfile.open(fileobj=fileobj, mode="r:") as archive:
+                members = [member for member in archive.getmembers() if member.isfile()]
+        root = _job_root([member.name for member in members])
+        return {
+            member.name[len(root):]: (member.offset_data, member.size)
+            for member in members if member.name.startswith(root)
+        }
+
+    def _read_index(self):
+        try:
+            with open(self.index_filename) as fin:
+                index = json.load(fin)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != _index_version or \
+           index.get("archive") != self._fingerprint():
+            return None
+        return {name: tuple(entry) for name, entry in index["members"].items()}
+
+    def _write_index(self):
+        try:
+            with open(self.index_filename, "w") as fout:
+                json.dump({"version": _index_version, "archive": self._fingerprint(),
+                           "members": self._members}, fout)
+        except OSError: # Read-only location. The index is just not cached.
+            pass
+
+    def open(self, path):
+        try:
+            offset, size = self._members[path]
+        except KeyError:
+            raise FileNotFoundError("No such file in {}: {}".format(self.filename, path))
+        return io.BufferedReader(_MemberReader(self._open_archive(), offset, size))
+
+    def exists(self, path):
+        return path in self._members
+
+    def size(self, path):
+        return self._members[path][1]
+
+    def names(self):
+        return list(self._members.keys())
+
+    def __repr__(self):
+        return "TarJobSource({!r})".format(self.filename)
+
+class ZipJobSource(JobSource):
+    """
+    An ODB++ job stored in a ZIP archive.
+    The ZIP central directory already is a member index, so no extra index is cached.
+    """
+    def __init__(self, filename):
+        self.filename = self.path = filename
+        self._zip = zipfile.ZipFile(filename, "r")
+        infos = [info for info in self._zip.infolist() if not info.is_dir()]
+        root = _job_root([info.filename for info in infos])
+        self._members = {
+            info.filename[len(root):]: info
+            for info in infos if info.filename.startswith(root)
+        }
+
+    def open(self, path):
+        try:
+            return self._zip.open(self._members[path])
+        except KeyError:
+            raise FileNotFoundError("No such file in {}: {}".format(self.filename, path))
+
+    def exists(self, path):
+        return path in self._members
+
+    def size(self, path):
+        return self._members[path].compress_size
+
+    def names(self):
+        return list(self._members.keys())
+
+    def close(self):
+        self._zip.close()
+
+    def __repr__(self):
+        return "ZipJobSource({!r})".format(self.filename)
+
+_tar_extensions = (".tgz", ".tar.gz", ".tar")
+
+def open_job(path):
+    """
+    Open an ODB++ job directory or archive (.tgz, .tar.gz, .tar or .zip).
+    JobSource instances are returned as-is, so every reader function
+    accepts both a path and an already opened job.
+    """
+    if isinstance(path, JobSource):
+        return path
+    if os.path.isdir(path):
+        return DirectoryJobSource(path)
+    if zipfile.is_zipfile(path):
+        return ZipJobSource(path)
+    if path.lower().endswith(_tar_extensions) or tarfile.is_tarfile(path):
+        return TarJobSource(path)
+    raise ValueError("Not an ODB++ job directory or archive: {}".format(path))
+
+@contextlib.contextmanager
+def job_source(path):
+    """
+    Context manager version of open_job(). The JobSource is closed
+    on exit if it was opened here, but not if path already was a JobSource
+    (which is owned by the caller).
+    """
+    source = open_job(path)
+    try:
+        yield source
+    finally:
+        if source is not path:
+            source.close()
@@ -6,10 +6,12 @@ ODB++ layer feature parser.
 Parses features like pads and lines from 
 """
 from collections import namedtuple
-from .Decoder import DecoderOption, run_decoder
+from .Decoder import DecoderOption, CompiledDecoder, run_decoder
 from .Structures import Mirror, Point, polarity_map
-from .Attributes import parse_attributes
+from .Attributes import intern_attributes, empty_attributes
 from .Structures import SymbolReference
+from .LineRecordParser import materialize_sections
+from .Numeric import number_chars
 import re
 
 # See http://www.odb-sa.com/wp-content/uploads/ODB_Format_Description_v7.pdf p. 112
@@ -36,12 +38,18 @@ _orientation_mirror_lut = { # Old values are converted to 8 or 9
     9: Mirror.MirrorX
 }
 
+# Same as _orientation_old_to_new_lut, but with parsed values. 0 is not valid (see _pad_re)
+_orientation_old_lut = {
+    str(old): (int(new.split()[0]), float(new.split()[1]))
+    for old, new in _orientation_old_to_new_lut.items() if old != 0
+}
+
 def _parse_line(match):
     "Parse a line regex match"
     xs, ys, xe, ye, symnum, polarity, dcode, attributes = match.groups()
     # Parse attributes
-    attributes = parse_attributes(attributes[1:]) \
-                 if attributes is not None else {}
+    attributes = intern_attributes(attributes[1:]) \
+                 if attributes is not None else empty_attributes
     return Line(Point(float(xs), float(ys)), Point(float(xe), float(ye)),
                 SymbolReference(int(symnum), 1.0), polarity_map[polarity],
                 int(dcode), attributes)
@@ -62,21 +70,122 @@ def _parse_pad(match):
     orient_angle = float(orient_angle)
     mirror = _orientation_mirror_lut[orient_code]
     # Parse attributes
-    attributes = parse_attributes(attributes[1:]) \
-                 if attributes is not None else {}
+    attributes = intern_attributes(attributes[1:]) \
+                 if attributes is not None else empty_attributes
     # Create return object
     return Pad(Point(float(x), float(y)),
                aptref, polarity_map[polarity],
                int(dcode), mirror, orient_angle, attributes)
 
 
+def _tokenize_pad(line):
+    """
+    Regex-free tokenizer for pad records.
+    Returns (x, y, symnum, resize_factor, polarity, dcode, orient_code, angle, attributes)
+    as strings, except for the parsed orient_code and angle.
+    attributes is None if there is no attribute section.
+    Returns None if the line does not match exactly what _pad_re accepts.
+    """
+    record, sep, attributes = line.partition(";")
+    if record[-1:].isspace() or (sep and not attributes.strip()):
+        return None
+    tokens = record.split()
+    # The four pad syntax variants have different token counts
+    ntokens = len(tokens)
+    if ntokens == 8: # Short symbol reference, current orientation
+        _, x, y, sym, polarity, dcode, orient, angle = tokens
+        resize_factor = "1.0"
+    elif ntokens == 10: # Long symbol reference, current orientation
+        _, x, y, long_sym, sym, resize_factor, polarity, dcode, orient, angle = tokens
+        if long_sym != "-1":
+            return None
+    elif ntokens == 7: # Short symbol reference, legacy orientation
+        _, x, y, sym, polarity, dcode, orient = tokens
+        resize_factor, angle = "1.0", None
+    elif ntokens == 9: # Long symbol reference, legacy orientation
+        _, x, y, long_sym, sym, resize_factor, polarity, dcode, orient = tokens
+        if long_sym != "-1":
+            return None
+        angle = None
+    else:
+        return None
+    if angle is None:
+        if orient not in _orientation_old_lut:
+            return None
+        orient_code, angle = _orientation_old_lut[orient]
+        numbers = x + y + resize_factor
+    elif orient == "8" or orient == "9":
+        orient_code = int(orient)
+        numbers = x + y + resize_factor + angle
+    else:
+        return None
+    if (polarity != "P" and polarity != "N") or not sym.isdigit() or \
+       not dcode.isdigit() or not number_chars.issuperset(numbers):
+        return None
+    return (x, y, sym, resize_factor, polarity, dcode, orient_code, angle,
+            attributes if sep else None)
+
+def _tokenize_line(line):
+    """
+    Regex-free tokenizer for line records.
+    Returns (xs, ys, xe, ye, symnum, polarity, dcode, attributes) as strings.
+    attributes is None if there is no attribute section.
+    Returns None if the line does not match exactly what _line_re accepts.
+    """
+    record, sep, attributes = line.partition(";")
+    if record[-1:].isspace() or (sep and not attributes.strip()):
+        return None
+    _, xs, ys, xe, ye, sym, polarity, dcode = record.split()
+    if (polarity != "P" and polarity != "N") or not sym.isdigit() or \
+       not dcode.isdigit() or not number_chars.issuperset(xs + ys + xe + ye):
+        return None
+    return (xs, ys, xe, ye, sym, polarity, dcode, attributes if sep else None)
+
+def _fast_parse_pad(line):
+    "Parse a pad record without regex. Returns None for unsupported lines."
+    tokens = _tokenize_pad(line)
+    if tokens is None:
+        return None
+    x, y, sym, resize_factor, polarity, dcode, orient_code, angle, attributes = tokens
+    return Pad(Point(float(x), float(y)),
+               SymbolReference(int(sym), float(resize_factor)), polarity_map[polarity],
+               int(dcode), _orientation_mirror_lut[orient_code], float(angle),
+               intern_attributes(attributes) if attributes is not None else empty_attributes)
+
+def _fast_parse_line(line):
+    "Parse a line record without regex. Returns None for unsupported lines."
+    tokens = _tokenize_line(line)
+    if tokens is None:
+        return None
+    xs, ys, xe, ye, sym, polarity, dcode, attributes = tokens
+    return Line(Point(float(xs), float(ys)), Point(float(xe), float(ye)),
+                SymbolReference(int(sym), 1.0), polarity_map[polarity], int(dcode),
+                intern_attributes(attributes) if attributes is not None else empty_attributes)
+
 _features_decoder_options = [
     DecoderOption(_pad_re, _parse_pad),
     DecoderOption(_line_re, _parse_line)
 ]
 
-def decode_features(linerecords):
-    features = run_decoder(linerecords["Layer features"], _features_decoder_options)
+_features_fast_paths = {
+    "P": _fast_parse_pad,
+    "L": _fast_parse_line
+}
+
+_features_decoder = CompiledDecoder(_features_decoder_options)
+_fast_features_decoder = CompiledDecoder(_features_decoder_options, _features_fast_paths)
+
+def decode_features(linerecords, fast=True):
+    """
+    Lazily decode the features of a linerecord dict
+    or of a section stream from iter_linerecords().
+
+    If fast is True, pad and line records are tokenized without regexes
+    where possible. The result is identical to the regex-only decoder (fast=False).
+    """
+    linerecords = materialize_sections(linerecords, "Layer features")
+    decoder = _fast_features_decoder if fast else _features_decoder
+    features = run_decoder(linerecords["Layer features"], decoder)
     return features
 
 #_pad_re.match("P 1.0 2.0 -1 0 0.02 P 4 8 30.0").groups()
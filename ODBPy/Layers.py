@@ -3,10 +3,10 @@
 """
 Parser for the ODB++ PCB matrix file
 """
-import os.path
 from collections import namedtuple
-from .StructuredTextParser import read_structured_text
+from .StructuredTextParser import read_job_structured_text
 from .LineRecordParser import read_linerecords
+from .JobSource import job_source
 from .Structures import polarity_map
 from enum import Enum
 
@@ -112,23 +112,30 @@ def parse_layers(matrix):
     return layers
 
 def read_layers(directory):
-    matrix = read_structured_text(os.path.join(directory, "matrix/matrix"))
+    """
+    Read the layer matrix from an ODB++ directory, archive or JobSource.
+    The parsed matrix file is memoized until it changes.
+    """
+    matrix = read_job_structured_text(directory, "matrix/matrix")
     return parse_layers(matrix)
 
+def _read_layer_file(directory, layer, filename):
+    with job_source(directory) as source:
+        with source.open("steps/pcb/layers/{}/{}".format(layer, filename)) as fin:
+            return read_linerecords(fin)
+
 def read_layer_components(directory, layer):
-    return read_linerecords(os.path.join(
-        directory, "steps", "pcb", "layers", layer, "components.Z"))
+    return _read_layer_file(directory, layer, "components.Z")
 
 def read_layer_features(directory, layer):
-    return read_linerecords(os.path.join(
-        directory, "steps", "pcb", "layers", layer, "features.Z"))
+    return _read_layer_file(directory, layer, "features.Z")
 
 
 if __name__ == "__main__":
     #Parse commandline arguments
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("directory", help="The ODB++ directory")
+    parser.add_argument("directory", help="The ODB++ directory or archive")
     args = parser.parse_args()
     #Perform check
     print(read_layers(args.directory))
@@ -6,8 +6,15 @@ according to the ODB++ 7.0 specification:
 
 http://www.odb-sa.com/wp-content/uploads/ODB_Format_Description_v7.pdf
 """
+import io
+import itertools
+import mmap
+import operator
+import re
 from collections import defaultdict
-from .Utils import readFileLines, readZIPFileLines
+from collections.abc import Mapping
+from .Compression import Compression, detect_compression, open_decompressed
+from .Utils import iterCompressedFileLines
 
 def filter_line_record_lines(lines):
     "Remove empty and '#'-only lines from the given line list"
@@ -16,14 +23,24 @@ def filter_line_record_lines(lines):
         if line and line != "#"
     ]
 
+def iter_filter_line_record_lines(lines):
+    "Lazy variant of filter_line_record_lines()"
+    return (line for line in lines if line and line != "#")
+
+def iter_raw_linerecords(filename):
+    """
+    Lazily read a line record file and yield only important lines in order.
+    The file is decompressed and read incrementally,
+    so the whole text is never held in memory.
+
+    Compressed files (LZW, gzip or ZIP) are detected by their content,
+    not by their .Z extension.
+    """
+    return iter_filter_line_record_lines(iterCompressedFileLines(filename))
+
 def read_raw_linerecords(filename):
     "Read a .Z line record file and return only important lines in order"
-    try: # Assume file-like object
-        return filter_line_record_lines(filename.read().split("\n"))
-    except AttributeError:
-        open_fn = readZIPFileLines if filename.endswith(".Z") else readFileLines
-        return filter_line_record_lines(
-            open_fn(filename))
+    return list(iter_raw_linerecords(filename))
 
 def group_by_section(lines):
     "Group a line record file by the section. Returns a dict containing lists."
@@ -36,6 +53,164 @@ def group_by_section(lines):
             groups[name].append(line)
     return dict(groups)
 
+def _tag_section_lines(lines):
+    "Yield (section name, line) for every non-header line"
+    name = None
+    for line in lines:
+        if line.startswith("#"):
+            name = line.strip("#").strip()
+        else:
+            yield name, line
+
+def iter_sections(lines):
+    """
+    Lazy, section-aware variant of group_by_section().
+    Yields (section name, line iterator) pairs in file order.
+
+    Like itertools.groupby(), each line iterator is only valid
+    until the next pair is requested.
+    """
+    grouped = itertools.groupby(_tag_section_lines(lines), key=operator.itemgetter(0))
+    for name, group in grouped:
+        yield name, map(operator.itemgetter(1), group)
+
+def materialize_sections(linerecords, until):
+    """
+    Given either a linerecord dict or a section stream from iter_sections(),
+    return a dict-like object of section lines.
+
+    For section streams, all sections before the <until> section
+    are read into lists. The <until> section is not read but stored as
+    the live line iterator, so it can be decoded without ever holding it in memory.
+    Sections after <until> are not read at all.
+    """
+    if isinstance(linerecords, Mapping):
+        return linerecords
+    groups = defaultdict(list)
+    for name, lines in linerecords:
+        if name == until:
+            groups[name] = lines
+            break
+        groups[name] += lines
+    return dict(groups)
+
 def read_linerecords(filename):
     "Read a linerecord file and return a dict grouped by section"
-    return group_by_section(read_raw_linerecords(filename))
+    return group_by_section(iter_raw_linerecords(filename))
+
+def iter_linerecords(filename):
+    """
+    Lazily read a linerecord file and yield (section name, line iterator) pairs.
+    The result can be passed directly to decode_features(), parse_profile()
+    and parse_netlist() instead of a read_linerecords() dict.
+    """
+    return iter_sections(iter_raw_linerecords(filename))
+
+_section_header_re = re.compile(rb"^[ \t]*#[^\r\n]*", re.MULTILINE)
+_nonempty_line_re = re.compile(rb"^[ \t\r]*[^\s#]", re.MULTILINE)
+
+class LazyLineRecords(Mapping):
+    """
+    Read-only, dict-compatible alternative to read_linerecords().
+
+    On construction, only the byte offsets of the section headers are recorded.
+    The lines of a section are decoded when the section is accessed,
+    e.g. linerecords["Units"] or linerecords[None].
+    Uncompressed files are memory-mapped, compressed files are decompressed
+    into a single bytes buffer.
+
+    If cache is False, the lines of a section are not kept after they
+    have been returned, i.e. they are evicted as soon as the caller is done.
+    Cached sections can also be evicted explicitly using evict().
+
+    Unlike read_linerecords(), sections without any lines are present
+    as empty lists.
+    """
+    def __init__(self, source, cache=True, codec="utf-8"):
+        self.cache = cache
+        self.codec = codec
+        self._mmap = None
+        self._data = self._load(source)
+        self._sections = self._scan()
+        self._lines = {}
+
+    def _load(self, source):
+        if isinstance(source, io.TextIOBase):
+            return source.read().encode(self.codec)
+        if hasattr(source, "read"): # Owned by the caller, only the wrapper is closed
+            with open_decompressed(source) as fin:
+                return fin.read()
+        with open(source, "rb") as fin:
+            compression = detect_compression(fin.read(4))
+            if compression == Compression.Plain and fin.seek(0, io.SEEK_END) > 0:
+                self._mmap = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+                return self._mmap
+        with open_decompressed(source) as fin:
+            return fin.read()
+
+    def _scan(self):
+        "Record the byte ranges of every section. Returns a dict of name => [(start, end)]"
+        sections = defaultdict(list)
+        name, start = None, 0
+        for match in _section_header_re.finditer(self._data):
+            header = match.group().strip()
+            if header == b"#":
+                continue
+            sections[name].append((start, match.start()))
+            name, start = header.strip(b"#").strip().decode(self.codec), match.end()
+        sections[name].append((start, len(self._data)))
+        # The part before the first header usually only contains comment lines
+        if not any(_nonempty_line_re.search(self._data, start, end)
+                   for start, end in sections[None]):
+            del sections[None]
+        return dict(sections)
+
+    def _read_section(self, name):
+        lines = []
+        for start, end in self._sections[name]:
+            text = self._data[start:end].decode(self.codec)
+            lines += iter_filter_line_record_lines(line.strip() for line in text.split("\n"))
+        return lines
+
+    def __getitem__(self, name):
+        try:
+            return self._lines[name]
+        except KeyError:
+            pass
+        lines = self._read_section(name) # Raises KeyError for unknown sections
+        if self.cache:
+            self._lines[name] = lines
+        return lines
+
+    def __contains__(self, name):
+        return name in self._sections
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+    def evict(self, name=None):
+        """Drop the cached lines of the given section or of all sections (name=None)"""
+        if name is None:
+            self._lines.clear()
+        else:
+            self._lines.pop(name, None)
+
+    def close(self):
+        self._lines.clear()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._data = b""
+        self._sections = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "LazyLineRecords(sections={})".format(list(self._sections.keys()))
@@ -7,32 +7,39 @@ according to the ODB++ 7.0 specification:
 http://www.odb-sa.com/wp-content/uploads/ODB_Format_Description_v7.pdf
 """
 from .Decoder import run_decoder
-import functools
 from toolz.itertoolz import groupby
 import operator
-import os.path
-from .LineRecordParser import read_linerecords
+from .LineRecordParser import iter_linerecords, materialize_sections
+from .JobSource import job_source
 from .Utils import not_none
-from .NetlistParser import netlist_decoder_options, assign_net_name, parse_net_names
+from .NetlistParser import netlist_decoder, parse_net_names
 
 __all_ = ["read_netlist"]
 
 
 def read_netlist(directory):
-    netlist_path = os.path.join(directory, "steps/pcb/netlists/cadnet/netlist")
-    linerec = read_linerecords(netlist_path)
+    """Read the CAD netlist from an ODB++ directory, archive or JobSource"""
+    with job_source(directory) as source:
+        with source.open("steps/pcb/netlists/cadnet/netlist") as fin:
+            return parse_netlist(iter_linerecords(fin))
+
+def parse_netlist(linerecords):
+    """
+    Parse a netlist from a linerecord dict
+    or from a section stream from iter_linerecords()
+    """
+    linerec = materialize_sections(linerecords, "Netlist points")
     netnames = parse_net_names(linerec)
     # All the following operations are performed lazily
-    decoded = run_decoder(linerec["Netlist points"], netlist_decoder_options)
+    decoded = run_decoder(linerec["Netlist points"], netlist_decoder(netnames))
     decoded = filter(not_none, decoded)
-    decoded_mapped = map(functools.partial(assign_net_name, netnames), decoded)
-    return groupby(operator.attrgetter("netid"), decoded_mapped)
+    return groupby(operator.attrgetter("netid"), decoded)
 
 if __name__ == "__main__":
     #Parse commandline arguments
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("directory", help="The ODB++ directory")
+    parser.add_argument("directory", help="The ODB++ directory or archive")
     args = parser.parse_args()
     #Perform check
     print(read_netlist(args.directory))
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compare two netlists, e.g. the CAD netlist against a reference netlist.
+
+Every net is canonicalized as the sorted set of its quantized point
+locations (rounded to multiples of the tolerance) and hashed.
+Nets with the same hash in both netlists are identical and are matched
+directly, regardless of their names.
+
+Only the remaining nets are matched spatially: Two nets are connected
+if they have a point at the same quantized location, or in a neighboring
+cell, so points less than one tolerance apart always match.
+From these connections, shorts (a net of the first netlist connecting
+several nets of the second one) and opens (a net of the second netlist
+split into several nets of the first one) are derived.
+
+Points without a net ($NONE$) and tooling holes are ignored.
+"""
+from collections import namedtuple
+import numpy as np
+from .NetlistIndex import NetlistIndex, read_netlist_index
+
+__all__ = ["NetlistDiff", "diff_netlists", "read_netlist_diff", "net_hashes", "match_dtype"]
+
+# Net numbers in the first and second netlist.
+# identical is True for nets with the same point set.
+match_dtype = np.dtype([("first", np.int32), ("second", np.int32), ("identical", np.bool_)])
+
+class NetlistDiff(namedtuple("NetlistDiff", ["matches", "renamed", "shorts", "opens",
+                                             "first_only", "second_only"])):
+    """
+    Result of diff_netlists().
+
+    matches: match_dtype array of nets connected one-to-one
+    renamed: List of (first name, second name) of matches with different names
+    shorts: dict first net name => names of the second nets it connects
+    opens: dict second net name => names of the first nets it is split into
+    first_only / second_only: Names of the nets without any matching point
+    """
+    @property
+    def equivalent(self):
+        """True if the connectivity of both netlists is the same (ignoring names)"""
+        return not (self.shorts or self.opens or self.first_only or self.second_only)
+
+def _as_index(netlist):
+    "Accept NetlistIndex objects and read_netlist() dicts"
+    return netlist if isinstance(netlist, NetlistIndex) else NetlistIndex.from_netlist(netlist)
+
+def _quantize(first, second, tolerance):
+    """
+    Integer cell coordinates of all points with a net, for both netlists.
+    Returns (first nets, first keys, second nets, second keys, row length)
+    where key = row * row length + column.
+    """
+    if tolerance <= 0:
+        raise ValueError("Netlist diff tolerance must be positive: {}".format(tolerance))
+    parts = []
+    for index in (first, second):
+        points = index.points[index.points["net"] >= 0]
+        parts.append((points["net"].astype(np.int64),
+                      np.round(points["x"] / tolerance).astype(np.int64),
+                      np.round(points["y"] / tolerance).astype(np.int64)))
+    allx = np.concatenate([part[1] for part in parts])
+    ally = np.concatenate([part[2] for part in parts])
+    if not len(allx):
+        return tuple(np.empty(0, dtype=np.int64) for _ in range(4)) + (1,)
+    # One empty cell on every side, so that neighbor keys don't wrap
+    minx, miny = allx.min() - 1, ally.min() - 1
+    rowlen = int(ally.max() - miny) + 2
+    if (int(allx.max() - minx) + 2) * rowlen >= 2 ** 62:
+        raise ValueError("Netlist diff tolerance too small for the board size: {}".format(tolerance))
+    (nets1, x1, y1), (nets2, x2, y2) = parts
+    return nets1, (x1 - minx) * rowlen + y1 - miny, nets2, (x2 - minx) * rowlen + y2 - miny, rowlen
+
+def _net_locations(nets, keys):
+    "Sorted unique (net, key) pairs"
+    order = np.lexsort((keys, nets))
+    nets, keys = nets[order], keys[order]
+    unique = np.ones(len(nets), dtype=bool)
+    unique[1:] = (nets[1:] != nets[:-1]) | (keys[1:] != keys[:-1])
+    return nets[unique], keys[unique]
+
+def _mix(values):
+    "splitmix64 finalizer: Well-distributed 64 bit hashes of integers"
+    z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def _hash_sets(nets, keys):
+    """
+    Hash the key set of every net, given sorted unique (net, key) pairs.
+    Returns (net numbers, hashes, set sizes).
+    """
+    if not len(nets):
+        return nets, np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    starts = np.concatenate([[0], np.nonzero(np.diff(nets))[0] + 1])
+    sizes = np.diff(np.append(starts, len(nets)))
+    hashes = np.add.reduceat(_mix(keys), starts) ^ _mix(sizes)
+    return nets[starts], hashes, sizes
+
+def net_hashes(index, tolerance=1e-4):
+    """
+    dict net number => 64 bit hash of the quantized point set of every net.
+    Nets of different netlists have the same hash if (and, up to
+    hash collisions, only if) they have the same quantized point locations.
+    """
+    index = _as_index(index)
+    points = index.points[index.points["net"] >= 0]
+    # The cell keys only need to be consistent, so a fixed row length is used here
+    x = np.round(points["x"] / tolerance).astype(np.int64)
+    y = np.round(points["y"] / tolerance).astype(np.int64)
+    nets, hashes, _ = _hash_sets(*_net_locations(points["net"].astype(np.int64),
+                                                 x * (1 << 31) + y))
+    return dict(zip(nets.tolist(), hashes.tolist()))
+
+def _hash_matches(sets1, sets2):
+    "Pairs of net numbers with the same hash and set size"
+    nets1, hashes1, sizes1 = sets1
+    nets2, hashes2, sizes2 = sets2
+    order = np.argsort(hashes2, kind="stable")
+    pos = np.minimum(np.searchsorted(hashes2[order], hashes1), max(len(order) - 1, 0))
+    if not len(order):
+        return nets1[:0], nets2[:0]
+    candidates = order[pos]
+    found = (hashes2[candidates] == hashes1) & (sizes2[candidates] == sizes1)
+    # Every net of the second netlist is only matched once
+    second, first = np.unique(candidates[found], return_index=True)
+    return nets1[found][first], nets2[second]
+
+def _links(nets1, keys1, nets2, keys2, rowlen):
+    """
+    Unique (first net, second net) pairs of nets that have points
+    at the same or at neighboring cells
+    """
+    order = np.argsort(keys2, kind="stable")
+    sorted_keys = keys2[order]
+    first, second = [], []
+    same = None
+    for dx in (0, -1, 1):
+        for dy in (0, -1, 1):
+            query = keys1 + dx * rowlen + dy
+            if same is not None:
+                # Neighbor cells are only needed for points without an exact match
+                query = query[~same]
+            lo = np.searchsorted(sorted_keys, query, side="left")
+            hi = np.searchsorted(sorted_keys, query, side="right")
+            counts = hi - lo
+            if same is None:
+                same = counts > 0
+                source = np.arange(len(keys1))
+            else:
+                source = np.nonzero(~same)[0]
+            item = np.repeat(source, counts)
+            k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            first.append(nets1[item])
+            second.append(nets2[order[np.repeat(lo, counts) + k]])
+    first, second = np.concatenate(first), np.concatenate(second)
+    pairs = np.unique(np.stack([first, second], axis=1), axis=0) \
+        if len(first) else np.empty((0, 2), dtype=np.int64)
+    return pairs[:, 0], pairs[:, 1]
+
+def _group(keys, values):
+    "dict key => sorted list of values for keys with more than one value"
+    order = np.lexsort((values, keys))
+    keys, values = keys[order].tolist(), values[order].tolist()
+    groups = {}
+    for key, value in zip(keys, values):
+        groups.setdefault(key, []).append(value)
+    return {key: group for key, group in groups.items() if len(group) > 1}
+
+def diff_netlists(first, second, tolerance=1e-4):
+    """
+    Compare two netlists (NetlistIndex objects or read_netlist() dicts),
+    e.g. the CAD netlist (first) with a reference netlist (second).
+    Points closer than tolerance (in coordinate units) are considered
+    to be at the same location. Returns a NetlistDiff.
+    """
+    first, second = _as_index(first), _as_index(second)
+    nets1, keys1, nets2, keys2, rowlen = _quantize(first, second, tolerance)
+    nets1, keys1 = _net_locations(nets1, keys1)
+    nets2, keys2 = _net_locations(nets2, keys2)
+    # Identical nets by hash
+    sets1, sets2 = _hash_sets(nets1, keys1), _hash_sets(nets2, keys2)
+    hash1, hash2 = _hash_matches(sets1, sets2)
+    # Spatial matching of the remaining nets
+    rest1 = ~np.isin(nets1, hash1)
+    rest2 = ~np.isin(nets2, hash2)
+    link1, link2 = _links(nets1[rest1], keys1[rest1], nets2[rest2], keys2[rest2], rowlen)
+    shorts = _group(link1, link2)
+    opens = _group(link2, link1)
+    # Nets linked to exactly one net which in turn is only linked to them
+    one_to_one = ~np.isin(link1, list(shorts.keys())) & ~np.isin(link2, list(opens.keys()))
+    matches = np.empty(len(hash1) + one_to_one.sum(), dtype=match_dtype)
+    matches["first"] = np.concatenate([hash1, link1[one_to_one]])
+    matches["second"] = np.concatenate([hash2, link2[one_to_one]])
+    matches["identical"] = np.arange(len(matches)) < len(hash1)
+    renamed = [(name1, name2) for name1, name2 in (
+        (first.net_name(num1), second.net_name(num2))
+        for num1, num2 in zip(matches["first"].tolist(), matches["second"].tolist()))
+               if name1 != name2]
+    return NetlistDiff(
+        matches, renamed,
+        {first.net_name(num): [second.net_name(other) for other in others]
+         for num, others in shorts.items()},
+        {second.net_name(num): [first.net_name(other) for other in others]
+         for num, others in opens.items()},
+        [first.net_name(num) for num in np.setdiff1d(sets1[0][~np.isin(sets1[0], hash1)], link1).tolist()],
+        [second.net_name(num) for num in np.setdiff1d(sets2[0][~np.isin(sets2[0], hash2)], link2).tolist()])
+
+def read_netlist_diff(directory, first="cadnet", second="reference", tolerance=1e-4):
+    """
+    Compare two netlists of an ODB++ directory, archive or JobSource.
+    first and second are netlist names (see steps/pcb/netlists).
+    """
+    return diff_netlists(read_netlist_index(directory, first),
+                         read_netlist_index(directory, second), tolerance)
+
+if __name__ == "__main__":
+    #Parse commandline arguments
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", help="The ODB++ directory or archive")
+    parser.add_argument("-f", "--first", default="cadnet", help="The first netlist")
+    parser.add_argument("-s", "--second", default="reference", help="The second netlist")
+    parser.add_argument("-t", "--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+    diff = read_netlist_diff(args.directory, args.first, args.second, args.tolerance)
+    for net, others in diff.shorts.items():
+        print("Short: {} connects {}".format(net, ", ".join(map(str, others))))
+    for net, others in diff.opens.items():
+        print("Open: {} is split into {}".format(net, ", ".join(map(str, others))))
+    for name1, name2 in diff.renamed:
+        print("Renamed: {} => {}".format(name2, name1))
+    for net in diff.first_only:
+        print("Only in {}: {}".format(args.first, net))
+    for net in diff.second_only:
+        print("Only in {}: {}".format(args.second, net))
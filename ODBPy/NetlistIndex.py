@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Array-backed netlist with fast per-net and per-location queries.
+
+All netlist points are stored in one NumPy structured array
+(see netlist_point_dtype), sorted by net. The points of the net
+at position i of NetlistIndex.nets are
+points[offsets[i]:offsets[i+1]] (CSR layout).
+
+The boolean and enum attributes of every point are bit-packed
+into the flags column, see the flag_... constants and
+NetlistIndex.exposure() / NetlistIndex.testside().
+
+Location queries use a uniform grid (BoxGrid) over the pad circles of the points,
+nearest neighbor queries a SpatialIndex.
+
+In nanometers mode, radius, coordinates and sizes are stored as int64 nanometers.
+"""
+import numpy as np
+from .Decoder import run_decoder
+from .LineRecordParser import iter_linerecords, materialize_sections
+from .JobSource import job_source
+from .NetlistParser import parse_net_names, netlist_decoder, NetPointLocation
+from .SpatialIndex import SpatialIndex, BoxGrid
+from .Units import lines_unit, nanometer_unit, records_to_nanometers
+from .Utils import not_none
+
+__all__ = ["NetlistIndex", "netlist_point_dtype", "read_netlist_index",
+           "parse_netlist_index", "no_net",
+           "flag_via", "flag_fiducial", "flag_testpoint", "flag_force_midpoint",
+           "flag_midpoint", "flag_staggered"]
+
+# Net number of points listed as $NONE$. Tooling holes have the net number -1.
+no_net = -2
+
+# width and height are NaN unless the point is a slot (radius 0),
+# -1 for int64 nanometer tables (see parse_netlist_index())
+netlist_point_dtype = np.dtype([
+    ("net", np.int32), ("radius", np.float64), ("x", np.float64), ("y", np.float64),
+    ("side", np.int8), ("width", np.float64), ("height", np.float64), ("flags", np.uint16)
+])
+
+flag_via = 1 << 0
+flag_fiducial = 1 << 1
+flag_testpoint = 1 << 2
+flag_force_midpoint = 1 << 3
+flag_midpoint = 1 << 4 # NetPointLocation.MidPoint
+flag_staggered = 1 << 5
+# NetPointExposure value - 1
+_exposure_shift, _exposure_mask = 6, 0b11
+# TestpointTestSide value - 1
+_testside_shift, _testside_mask = 8, 0b111
+
+def _pack_flags(point):
+    "Bit-pack the flags of a NetlistPoint"
+    info = point.point_type
+    flags = (flag_via if info.is_via else 0) | \
+        (flag_fiducial if info.is_fiducial else 0) | \
+        (flag_testpoint if info.is_testpoint else 0) | \
+        (flag_force_midpoint if info.force_midpoint_testability else 0) | \
+        (flag_midpoint if point.point_location == NetPointLocation.MidPoint else 0) | \
+        (flag_staggered if point.staggered is not None else 0)
+    return flags | ((point.exposure.value - 1) << _exposure_shift) | \
+        ((info.testpoint_testside.value - 1) << _testside_shift)
+
+def _point_row(net, point):
+    width, height = (point.size.x, point.size.y) if point.size is not None else (np.nan, np.nan)
+    return (net, point.radius, point.location.x, point.location.y, point.side.value,
+            width, height, _pack_flags(point))
+
+class NetlistIndex(object):
+    """
+    Netlist points sorted by net, with CSR offsets and a spatial index.
+
+    nets is the sorted array of net numbers that have points,
+    net_names maps net numbers to net names.
+    unit is "NM" for indexes built in nanometers mode, else None (file units).
+    """
+    def __init__(self, points, net_names=None, unit=None):
+        order = np.argsort(points["net"], kind="stable")
+        self.points = points[order]
+        self.nets, starts = np.unique(self.points["net"], return_index=True)
+        self.offsets = np.append(starts, len(self.points)).astype(np.int64)
+        self._positions = {num: pos for pos, num in enumerate(self.nets.tolist())}
+        self.net_names = net_names or {}
+        self._net_numbers = {name: num for num, name in self.net_names.items()}
+        self.unit = unit
+        self._spatial_index = None
+        self._grid = None
+
+    @classmethod
+    def from_points(cls, points, net_names=None):
+        """
+        Build the index from an iterable of NetlistPoint objects
+        whose netid is the net number (not the net name).
+        """
+        rows = []
+        for point in points:
+            net = point.netid if isinstance(point.netid, int) else no_net
+            rows.append(_point_row(net, point))
+        return cls(np.array(rows, dtype=netlist_point_dtype), net_names)
+
+    @classmethod
+    def from_netlist(cls, netlist):
+        """
+        Build the index from a read_netlist() result (net name => points).
+        Named nets are numbered in the order of the dict.
+        """
+        unnamed = {name for name in netlist.keys() if isinstance(name, int)}
+        numbers = (num for num in range(len(netlist) + len(unnamed)) if num not in unnamed)
+        net_names, rows = {}, []
+        for name, points in netlist.items():
+            if isinstance(name, int): # Net without a name
+                num = name
+            elif name == "$NONE$":
+                num = no_net
+            else:
+                num = next(numbers)
+                net_names[num] = name
+            rows += [_point_row(num, point) for point in points]
+        return cls(np.array(rows, dtype=netlist_point_dtype), net_names)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def nbytes(self):
+        return self.points.nbytes + self.nets.nbytes + self.offsets.nbytes
+
+    def net_number(self, net):
+        """Net number for a net name or number. Raises KeyError for unknown nets."""
+        if isinstance(net, str):
+            return self._net_numbers[net]
+        return net
+
+    def net_name(self, num):
+        """Name of a net number, or the number itself for unnamed nets"""
+        return self.net_names.get(num, num)
+
+    def net_points(self, net):
+        """Array of the points of a net, given by name or number (empty if it has no points)"""
+        pos = self._positions.get(self.net_number(net))
+        if pos is None:
+            return self.points[:0]
+        return self.points[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def net_sizes(self):
+        """dict net number => number of points"""
+        return dict(zip(self.nets.tolist(), np.diff(self.offsets).tolist()))
+
+    @property
+    def spatial_index(self):
+        """SpatialIndex over the pad circle of every point, built on first use"""
+        if self._spatial_index is None:
+            points = self.points
+            radius = points["radius"]
+            self._spatial_index = SpatialIndex(np.stack([
+                points["x"] - radius, points["y"] - radius,
+                points["x"] + radius, points["y"] + radius], axis=1))
+        return self._spatial_index
+
+    def points_at(self, x, y, tolerance=0.):
+        """
+        Sorted indices into points of all points whose pad circle
+        (enlarged by tolerance) contains (x, y)
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        if self._grid is None:
+            points = self.points
+            radius = points["radius"]
+            self._grid = BoxGrid(np.stack([points["x"] - radius, points["y"] - radius,
+                                           points["x"] + radius, points["y"] + radius], axis=1))
+        candidates = self._grid.candidates(x - tolerance, y - tolerance,
+                                           x + tolerance, y + tolerance)
+        if tolerance > 0:
+            candidates = np.unique(candidates)
+        points = self.points[candidates]
+        dx, dy = points["x"] - x, points["y"] - y
+        limit = points["radius"] + tolerance
+        return candidates[dx * dx + dy * dy <= limit * limit]
+
+    def nets_at(self, x, y, tolerance=0.):
+        """Sorted net numbers of all points at (x, y), see points_at()"""
+        return np.unique(self.points["net"][self.points_at(x, y, tolerance)])
+
+    def nearest(self, x, y, k=1):
+        """Indices into points of the k points with the nearest pad circles"""
+        return self.spatial_index.nearest(x, y, k)
+
+    def has_flag(self, flag):
+        """Boolean mask of the points that have the given flag (e.g. flag_via)"""
+        return (self.points["flags"] & flag) != 0
+
+    def exposure(self):
+        """NetPointExposure value of every point"""
+        return ((self.points["flags"] >> _exposure_shift) & _exposure_mask) + 1
+
+    def testside(self):
+        """TestpointTestSide value of every point"""
+        return ((self.points["flags"] >> _testside_shift) & _testside_mask) + 1
+
+    def to_arrays(self):
+        """Arrays for saving the index, e.g. using numpy.savez()"""
+        nums = sorted(self.net_names.keys())
+        return {
+            "points": self.points,
+            "net_name_nums": np.array(nums, dtype=np.int64),
+            "net_name_names": np.array([self.net_names[num] for num in nums], dtype=str),
+            "unit": np.array(self.unit or "", dtype=str)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Restore an index from to_arrays() output"""
+        net_names = dict(zip(arrays["net_name_nums"].tolist(), arrays["net_name_names"].tolist()))
+        unit = str(arrays["unit"]) or None if "unit" in arrays else None
+        return cls(arrays["points"], net_names, unit)
+
+    def __repr__(self):
+        return "NetlistIndex({} points, {} nets)".format(len(self), len(self.nets))
+
+def read_netlist_index(directory, netlist="cadnet", nanometers=False):
+    """
+    Read a netlist of an ODB++ directory, archive or JobSource into a NetlistIndex.
+    By default, the CAD netlist is read. Use e.g. netlist="reference"
+    for other netlists. See parse_netlist_index() for the nanometers mode.
+    """
+    with job_source(directory) as source:
+        with source.open("steps/pcb/netlists/{}/netlist".format(netlist)) as fin:
+            return parse_netlist_index(iter_linerecords(fin), nanometers)
+
+# Length fields that are int64 nanometers in nanometers mode
+_nanometer_fields = ("radius", "x", "y", "width", "height")
+
+def parse_netlist_index(linerecords, nanometers=False):
+    """
+    Parse a netlist into a NetlistIndex from a linerecord dict
+    or from a section stream from iter_linerecords()
+
+    If nanometers is True, radius, coordinates and sizes are converted from
+    the unit of the UNITS line (inch if there is none) to int64 nanometers.
+    """
+    linerecords = materialize_sections(linerecords, "Netlist points")
+    points = filter(not_none, run_decoder(linerecords["Netlist points"], netlist_decoder()))
+    index = NetlistIndex.from_points(points, parse_net_names(linerecords))
+    if not nanometers:
+        return index
+    unit = lines_unit(line for section, lines in linerecords.items()
+                      if section != "Netlist points" for line in lines)
+    return NetlistIndex(records_to_nanometers(index.points, _nanometer_fields, unit),
+                        index.net_names, nanometer_unit)
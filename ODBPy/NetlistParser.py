@@ -7,21 +7,24 @@ according to the ODB++ 7.0 specification:
 http://www.odb-sa.com/wp-content/uploads/ODB_Format_Description_v7.pdf
 """
 import re
+import functools
 from collections import namedtuple, defaultdict
-from .Utils import const_false, not_none, try_parse_number
+from .Utils import const_false, not_none
+from .Numeric import number_chars, digit_chars, parse_number
 from .Structures import Point
 from enum import Enum
-from .Decoder import DecoderOption
+from .Decoder import DecoderOption, CompiledDecoder
 
 __all__ = ["is_netlist_optimized", "parse_net_names", "StaggeringParameters",
            "NetlistPointTypeInformation", "NetlistPoint", "TestpointTestSide",
            "NetSide", "NetPointLocation", "NetPointExposure",
-           "netlist_decoder_options", "assign_net_name"]
+           "netlist_decoder_options", "netlist_fast_paths", "assign_net_name",
+           "netlist_decoder"]
 
 _h_optimize_re = re.compile(r"^H\s+optimize\s+([YN])\s*$", re.IGNORECASE)
 
 # TODO comment point is not supported as the exact format is not clear
-_netlist_point_re = re.compile(r"^(-?\d+|\$NONE\$)\s+(-?[\.\d]+)\s+(-?[\.\d]+)\s+(-?[\.\d]+)\s+([TDB])\s+(-?[\.\d]+\s+-?[\.\d]+)?\s*([em])\s+([ecps])\s+(staggered\s+-?[\.\d]+\s+-?[\.\d]+\s+-?[\.\d]+)?\s*([vV]\s+)?([fF]\s+)?([tT]\s+)?([mM]\s*)?(eXtended\s+\S+\s*)?([csban])?")
+_netlist_point_re = re.compile(r"^(-?\d+|\$NONE\$)\s+(-?[\.\d]+)\s+(-?[\.\d]+)\s+(-?[\.\d]+)\s+([TDB])\s+(-?[\.\d]+\s+-?[\.\d]+)?\s*([em])\s+([ecps])(?:\s+|$)(staggered\s+-?[\.\d]+\s+-?[\.\d]+\s+-?[\.\d]+)?\s*([vV](?:\s+|$))?([fF](?:\s+|$))?([tT](?:\s+|$))?([mM]\s*)?(eXtended\s+\S+\s*)?([csban])?")
 # Test cases:
 # Actual
 # 10 0.0236 0.45 -1.2916 B e e staggered 0 0 0
@@ -96,14 +99,16 @@ def _parse_netlist_point(match):
         sx, sy, sr = staggered.split()[1:]
         staggering_params = StaggeringParameters(
             Point(float(sx), float(sy)), float(sr))
+    # The flag groups include the trailing whitespace
+    v, f, t, m = (flag.strip() if flag is not None else None for flag in (v, f, t, m))
     # Extension
     if xtension is not None:
         # Format (presumed): "eXtended foobar"
         # Remove "eXtended"
-        xtension = xtension.partition(" ")[2]
+        xtension = xtension.partition(" ")[2].strip()
     # Create return data structure
     return NetlistPoint(
-        try_parse_number(netid),
+        parse_number(netid),
         float(radius),
         Point(float(x), float(y)),
         _net_side_lut[side],
@@ -177,13 +182,125 @@ netlist_decoder_options = [
     DecoderOption(_netlist_point_re, _parse_netlist_point)
 ]
 
+# Optional single-character flags in the order they appear after the exposure
+_netlist_flags = ({"v", "V"}, {"f", "F"}, {"t", "T"}, {"m", "M"})
+
+@functools.lru_cache(maxsize=1024)
+def _parse_netlist_tail(tail):
+    """
+    Parse the optional fields after the exposure (a tuple of tokens)
+    with a small state machine: The fields are consumed in their fixed order,
+    so every token is looked at once.
+    Returns (StaggeringParameters or None, NetlistPointTypeInformation)
+    or None if there are unknown trailing fields.
+    Netlists usually only have a few distinct tails, so the results
+    (immutable namedtuples) are cached and shared.
+    """
+    ntokens = len(tail)
+    pos = 0
+    staggering_params = None
+    if ntokens and tail[0] == "staggered":
+        sx, sy, sr = tail[1:4]
+        if not number_chars.issuperset(sx + sy + sr):
+            return None
+        staggering_params = StaggeringParameters(Point(float(sx), float(sy)), float(sr))
+        pos = 4
+    flags = [None] * len(_netlist_flags)
+    for i, chars in enumerate(_netlist_flags):
+        if pos < ntokens and tail[pos] in chars:
+            flags[i] = tail[pos]
+            pos += 1
+    xtension = None
+    if pos + 1 < ntokens and tail[pos] == "eXtended":
+        xtension = tail[pos + 1]
+        pos += 2
+    testside = None
+    if pos < ntokens and tail[pos] in _testpoint_test_side_lut:
+        testside = tail[pos]
+        pos += 1
+    if pos != ntokens:
+        return None
+    v, f, t, m = flags
+    return staggering_params, NetlistPointTypeInformation(
+        _is_via_lut[v], _is_fiducial_lut[f], _is_testpoint_lut[t],
+        _force_midpoint_testable_lut[m], xtension,
+        _testpoint_test_side_lut[testside])
+
+def _fast_parse_netlist_point(line, netnames=None):
+    """
+    Regex-free equivalent of _parse_netlist_point(_netlist_point_re.search(line)).
+    Returns None for lines it doesn't handle (the regex decides).
+
+    If netnames (net ID => name) is given, the net name is
+    assigned directly instead of using assign_net_name().
+    """
+    tokens = line.split()
+    if len(tokens) < 7:
+        return None
+    netid, radius, x, y, side = tokens[:5]
+    digits = netid[1:] if netid.startswith("-") else netid
+    if digits and digit_chars.issuperset(digits):
+        # Same as parse_number(): Leading zeros => not a number
+        if not netid.startswith("0") or len(netid) == 1:
+            netid = int(netid)
+        if netnames is not None:
+            netid = netnames.get(netid, netid)
+    elif netid != "$NONE$":
+        return None
+    if side not in _net_side_lut or not number_chars.issuperset(radius + x + y):
+        return None
+    # Optional width and height (slots)
+    size = None
+    pos = 5
+    if tokens[5] not in _net_point_location_lut:
+        w, h = tokens[5:7]
+        if not number_chars.issuperset(w + h):
+            return None
+        size = Point(float(w), float(h))
+        pos = 7
+    point_location = _net_point_location_lut.get(tokens[pos]) if pos < len(tokens) else None
+    exposure = _net_point_exposure_lut.get(tokens[pos + 1]) if pos + 1 < len(tokens) else None
+    if point_location is None or exposure is None:
+        return None
+    tail = _parse_netlist_tail(tuple(tokens[pos + 2:]))
+    if tail is None:
+        return None
+    radius, x, y = map(float, (radius, x, y))
+    return NetlistPoint(netid, radius, Point(x, y), _net_side_lut[side], size,
+                        point_location, exposure, tail[0], tail[1])
+
+# Netlist points have no leading token, so the fast path is the CompiledDecoder default
+netlist_fast_paths = {
+    None: _fast_parse_netlist_point
+}
+
 def assign_net_name(netnames, netpoint):
     """Looksup the netpoint netid in the net name map and replace """
     netid = netpoint.netid
     if netid not in netnames:
         return netpoint
-    netname = netnames[netid]
-    # Tuples and namedtuples are immutable, so we'll use an intermediary list
-    params = list(netpoint)
-    params[0] = netname
-    return NetlistPoint(*params)
+    return netpoint._replace(netid=netnames[netid])
+
+_netlist_decoder = CompiledDecoder(netlist_decoder_options, netlist_fast_paths)
+
+def _assigning_net_names(function, netnames):
+    "Wrap the function of a DecoderOption so it assigns the net names"
+    def parse(match):
+        netpoint = function(match)
+        return assign_net_name(netnames, netpoint) if netpoint is not None else None
+    return parse
+
+def netlist_decoder(netnames=None):
+    """
+    CompiledDecoder for netlist point lines.
+    If netnames (net ID => name, see parse_net_names()) is given,
+    the net IDs of the decoded points are replaced by their names:
+    The fast path assigns them while constructing the points, only points
+    decoded by the regex fallback go through assign_net_name().
+    """
+    if netnames is None:
+        return _netlist_decoder
+    options = [DecoderOption(opt.regex, _assigning_net_names(opt.function, netnames))
+               for opt in netlist_decoder_options]
+    return CompiledDecoder(options, {
+        None: functools.partial(_fast_parse_netlist_point, netnames=netnames)})
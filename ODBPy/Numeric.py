@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exception-free numeric conversion shared by all parsers.
+
+Scalars: parse_number() classifies a token as int, float or string
+by looking at its characters instead of trying int() and float()
+and catching the exceptions.
+
+Batches: The columnar decoders (FeatureTable, ComponentTable) don't
+convert every token to a Python float or int. They keep the validated
+number tokens as strings and convert whole chunks of rows at once
+using numeric_records(), i.e. a single NumPy conversion per chunk.
+"""
+import re
+import numpy as np
+
+__all__ = ["number_chars", "digit_chars", "parse_number", "is_number",
+           "numeric_column", "numeric_records"]
+
+# Characters valid in -?[\.\d]+ numbers
+number_chars = frozenset("-.0123456789")
+digit_chars = frozenset("0123456789")
+
+# Tokens that can't be numbers are recognized by their first character
+_number_start = frozenset("+-.0123456789")
+_number_re = re.compile(r"[+-]?(\d*)(\.\d*)?([eE][+-]?\d+)?")
+
+def _classify(s):
+    "int, float or None (not a number) for a token"
+    if not s or s[0] not in _number_start:
+        return None
+    if s.isdigit() and s.isascii():
+        return int
+    match = _number_re.fullmatch(s)
+    if match is None:
+        return None
+    intpart, fraction, exponent = match.groups()
+    if fraction is None and exponent is None:
+        return int if intpart else None
+    if not intpart and len(fraction or "") < 2: # ".", "-." or ".e5"
+        return None
+    return float
+
+def is_number(s):
+    """Return True if s is an int or float literal like "-1", "0.5" or "1e3" """
+    return _classify(s) is not None
+
+def parse_number(s):
+    """
+    Return int(s), float(s) or s if s is not a number, without raising exceptions.
+    Also returns s if s starts with 0 unless it is "0" or starts with "0."
+    (and therefore can't be treated like a number)
+    Special float values like "inf" or "nan" are not treated as numbers.
+    """
+    if s[:1] == "0" and len(s) != 1 and s[1] != ".":
+        return s
+    kind = _classify(s)
+    return kind(s) if kind is not None else s
+
+def numeric_column(tokens, dtype=np.float64):
+    """
+    Convert a sequence of number tokens (strings) to a NumPy array
+    in one pass. Raises ValueError for tokens that are not numbers.
+    """
+    return np.array(tokens, dtype=dtype) if len(tokens) else np.empty(0, dtype=dtype)
+
+def numeric_records(rows, dtype):
+    """
+    Convert a list of row tuples to a structured array of the given dtype.
+    Numeric fields may be number tokens (strings) or numbers,
+    all of them are converted at once.
+    Raises ValueError for tokens that are not numbers.
+    """
+    return np.array(rows, dtype=dtype) if rows else np.empty(0, dtype=dtype)
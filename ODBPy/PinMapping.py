@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Map component pins (toeprints) to the copper pads they sit on.
+
+The toeprints of all components are stored in one NumPy structured array
+(see toeprint_dtype), sorted by component. Top side toeprints are joined
+with the pads of the top signal layer, bottom side toeprints with the
+pads of the bottom signal layer, in one vectorized pass per side using a
+BoxGrid over the pad bounding boxes.
+
+A pad matches a toeprint if the toeprint location is inside the pad
+bounding box (enlarged by the tolerance). Pads with user-defined symbols
+have no known size and only match toeprints exactly at their center
+(unless a tolerance is given).
+"""
+import numpy as np
+from .ComponentTable import ComponentTable, toeprint_dtype, read_component_table
+from .FeatureTable import read_feature_table
+from .JobSource import job_source
+from .Layers import read_layers
+from .NetlistParser import NetSide
+from .SpatialIndex import BoxGrid, feature_table_bboxes
+
+__all__ = ["PinMap", "toeprint_dtype", "pin_pad_dtype", "toeprint_table",
+           "map_pins", "read_pin_map", "outer_signal_layers"]
+
+# toeprint: Index into PinMap.toeprints
+# pad: ODB++ feature index of the pad in the signal layer of the toeprint side
+pin_pad_dtype = np.dtype([("toeprint", np.int64), ("pad", np.int64)])
+
+def toeprint_table(components):
+    """
+    Build (component names, toeprint array) from a read_components() result
+    or a ComponentTable, top components first
+    """
+    if isinstance(components, ComponentTable):
+        return components.names, components.toeprints
+    names, rows = [], []
+    for side, side_components in ((NetSide.Top, components.top), (NetSide.Bottom, components.bot)):
+        for component in side_components.values():
+            num = len(names)
+            names.append(component.name)
+            rows += [(num, toeprint.pin_num, toeprint.location.x, toeprint.location.y,
+                      toeprint.rotation, toeprint.mirrored.value, toeprint.net_num,
+                      toeprint.subnet_num, side.value)
+                     for toeprint in component.toeprints]
+    return names, np.array(rows, dtype=toeprint_dtype)
+
+def _join_side(toeprints, side, table, tolerance, scale):
+    "pin_pad_dtype array of the toeprints of one side and the pads of table"
+    rows = np.nonzero(toeprints["side"] == side.value)[0]
+    if table is None or not len(rows) or not len(table.pads):
+        return np.empty(0, dtype=pin_pad_dtype)
+    ids, boxes = feature_table_bboxes(table, scale)
+    # The pads are the first rows of feature_table_bboxes()
+    npads = len(table.pads)
+    boxes = boxes[:npads] + np.array([-tolerance, -tolerance, tolerance, tolerance])
+    point, box = BoxGrid(boxes).join_points(toeprints["x"][rows], toeprints["y"][rows])
+    result = np.empty(len(point), dtype=pin_pad_dtype)
+    result["toeprint"] = rows[point]
+    result["pad"] = ids[box]
+    return result
+
+class PinMap(object):
+    """
+    Toeprints of all components and the pads they sit on.
+
+    toeprints is a toeprint_dtype array sorted by component,
+    the toeprints of component i are toeprints[offsets[i]:offsets[i+1]].
+    pin_pads is a pin_pad_dtype array sorted by toeprint
+    (a toeprint may sit on several pads, or on none).
+    layers maps NetSide to the name of the signal layer used for that side.
+    """
+    def __init__(self, component_names, toeprints, pin_pads, layers=None):
+        self.component_names = component_names
+        order = np.argsort(toeprints["component"], kind="stable")
+        self.toeprints = toeprints[order]
+        self.offsets = np.searchsorted(self.toeprints["component"],
+                                       np.arange(len(component_names) + 1)).astype(np.int64)
+        # Renumber the toeprints of the pad matches to the sorted order
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.arange(len(order))
+        pin_pads = pin_pads.copy()
+        pin_pads["toeprint"] = inverse[pin_pads["toeprint"]]
+        self.pin_pads = pin_pads[np.lexsort((pin_pads["pad"], pin_pads["toeprint"]))]
+        self.layers = layers or {}
+        self._positions = {name: pos for pos, name in enumerate(component_names)}
+
+    def __len__(self):
+        return len(self.toeprints)
+
+    def component(self, name):
+        """Position of a component by name. Raises KeyError for unknown components"""
+        return self._positions[name]
+
+    def component_toeprints(self, name):
+        """Toeprint array of a component"""
+        pos = self.component(name)
+        return self.toeprints[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def component_pads(self, name):
+        """pin_pad_dtype array of the pads under the toeprints of a component"""
+        pos = self.component(name)
+        start, end = np.searchsorted(self.pin_pads["toeprint"], self.offsets[pos:pos + 2])
+        return self.pin_pads[start:end]
+
+    def pad_counts(self):
+        """Number of pads under every toeprint"""
+        return np.bincount(self.pin_pads["toeprint"], minlength=len(self.toeprints))
+
+    def unmatched(self):
+        """Indices of the toeprints without any pad below them"""
+        return np.nonzero(self.pad_counts() == 0)[0]
+
+    def unmatched_components(self):
+        """Names of the components with at least one toeprint without pad"""
+        components = np.unique(self.toeprints["component"][self.unmatched()])
+        return [self.component_names[num] for num in components.tolist()]
+
+    def __repr__(self):
+        return "PinMap({} components, {} toeprints, {} pads)".format(
+            len(self.component_names), len(self.toeprints), len(self.pin_pads))
+
+def map_pins(components, top_table=None, bottom_table=None, tolerance=0., scale=None):
+    """
+    Map the toeprints of a read_components() result or a ComponentTable
+    to the pads of the FeatureTables of the top and bottom signal layers.
+    Sides without a table get no pads. scale converts symbol units
+    to coordinate units (see feature_table_bboxes(), default: the symbol_scale
+    of each table).
+    Returns a PinMap.
+    """
+    names, toeprints = toeprint_table(components)
+    pin_pads = np.concatenate([
+        _join_side(toeprints, NetSide.Top, top_table, tolerance, scale),
+        _join_side(toeprints, NetSide.Bottom, bottom_table, tolerance, scale)])
+    return PinMap(names, toeprints, pin_pads)
+
+def outer_signal_layers(layers):
+    """(top, bottom) signal layer of a LayerSet (by matrix row)"""
+    signal = sorted(layers.signal_layers(), key=lambda layer: layer.index)
+    if not signal:
+        raise ValueError("No signal layers in the layer matrix")
+    return signal[0], signal[-1]
+
+def read_pin_map(directory, tolerance=0., scale=None):
+    """Read the PinMap of an ODB++ directory, archive or JobSource"""
+    with job_source(directory) as job:
+        top, bottom = outer_signal_layers(read_layers(job))
+        pin_map = map_pins(read_component_table(job),
+                           read_feature_table(job, top.name),
+                           read_feature_table(job, bottom.name), tolerance, scale)
+    pin_map.layers = {NetSide.Top: top.name, NetSide.Bottom: bottom.name}
+    return pin_map
@@ -6,23 +6,65 @@ ODB++ polygon parser components
 import re
 from collections import namedtuple
 from enum import Enum
+import numpy as np
 from .Structures import Point
+from .Geometry import steps_bbox, step_segment, step_arc_cw, step_arc_ccw
+from .Tessellation import tessellate_steps
 from .Decoder import DecoderOption
+from .Numeric import number_chars
 from .Treeifier import TreeifierRule
 
 __all__ = ["Polygon", "PolygonSegment", "PolygonCircle",
            "PolygonBeginTag", "PolygonSegmentTag", "PolygonCircleTag", "PolygonEndTag",
            "PolygonType", "CircleDirection", "polygon_decoder_options",
-           "polygon_treeify_rules"]
+           "polygon_fast_paths", "polygon_treeify_rules"]
 
 # Polygon steps consist of PolygonSegment and PolygonCircle objects
 class Polygon(namedtuple("Polygon", ["type", "steps"])):
+    def step_arrays(self):
+        """
+        Returns the (xs, ys, xe, ye, xc, yc, kind) coordinate arrays
+        of all steps as used by the Geometry module
+        """
+        if "_step_arrays" not in self.__dict__:
+            rows = [step._step_row() for step in self.steps]
+            columns = np.array(rows, dtype=np.float64).reshape(-1, 7).T
+            self.__dict__["_step_arrays"] = tuple(columns[:6]) + (columns[6].astype(np.int8),)
+        return self.__dict__["_step_arrays"]
+
+    def bbox(self):
+        """
+        Returns the (minx, miny, maxx, maxy) bounding box including arcs
+        or None for polygons without steps. The result is cached.
+        """
+        if "_bbox" not in self.__dict__:
+            if not self.steps:
+                self.__dict__["_bbox"] = None
+            else:
+                minx, miny, maxx, maxy = steps_bbox(*self.step_arrays())
+                self.__dict__["_bbox"] = (float(minx.min()), float(miny.min()),
+                                          float(maxx.max()), float(maxy.max()))
+        return self.__dict__["_bbox"]
+
+    def vertices(self, tolerance):
+        """
+        Returns the closed contour as (n, 2) vertex array with arcs
+        flattened to the given chord error tolerance (see Tessellation).
+        The result is cached per tolerance.
+        """
+        cache = self.__dict__.setdefault("_vertices", {})
+        if tolerance not in cache:
+            cache[tolerance] = tessellate_steps(*self.step_arrays(), tolerance)[0]
+        return cache[tolerance]
+
     def min(self):
         """Returns (minimum x, minimum y) of both coordinates"""
-        return Point(min(step.min()[0] for step in self.steps), min(step.min()[1] for step in self.steps))
+        minx, miny, _, _ = self.bbox()
+        return Point(minx, miny)
     def max(self):
         """Returns (maximum x, maximum y) of both coordinates"""
-        return Point(max(step.max()[0] for step in self.steps), max(step.max()[1] for step in self.steps))
+        _, _, maxx, maxy = self.bbox()
+        return Point(maxx, maxy)
 
 
 class PolygonSegment(namedtuple("PolygonSegment", ["start", "end"])):
@@ -32,8 +74,25 @@ class PolygonSegment(namedtuple("PolygonSegment", ["start", "end"])):
     def max(self):
         """Returns (maximum x, maximum y) of both coordinates"""
         return Point(max(self.start.x, self.end.x), max(self.start.y, self.end.y))
+    def _step_row(self):
+        return (self.start.x, self.start.y, self.end.x, self.end.y, 0., 0., step_segment)
 
-PolygonCircle = namedtuple("PolygonCircle", ["start", "end", "center", "direction"])
+class PolygonCircle(namedtuple("PolygonCircle", ["start", "end", "center", "direction"])):
+    def bbox(self):
+        """Returns the (minx, miny, maxx, maxy) bounding box of the arc"""
+        return tuple(float(v[0]) for v in steps_bbox(*np.array([self._step_row()]).T))
+    def min(self):
+        """Returns (minimum x, minimum y) of the arc, including its extremal points"""
+        minx, miny, _, _ = self.bbox()
+        return Point(minx, miny)
+    def max(self):
+        """Returns (maximum x, maximum y) of the arc, including its extremal points"""
+        _, _, maxx, maxy = self.bbox()
+        return Point(maxx, maxy)
+    def _step_row(self):
+        kind = step_arc_cw if self.direction == CircleDirection.Clockwise else step_arc_ccw
+        return (self.start.x, self.start.y, self.end.x, self.end.y,
+                self.center.x, self.center.y, kind)
 
 PolygonBeginTag = namedtuple("PolygonBeginTag", ["start", "type"])
 PolygonSegmentTag = namedtuple("PolygonSegmentTag", ["end"])
@@ -96,6 +155,47 @@ polygon_decoder_options = [
     DecoderOption(_oe_re, _parse_oe)
 ]
 
+def _tokenize_contour(line):
+    """
+    Regex-free tokenizer for OB, OS and OC contour records.
+    Returns the list of tokens (numbers as strings), starting with the record token.
+    Returns None if the line is not a plain contour record (the regexes decide).
+    """
+    tokens = line.split()
+    ntokens = len(tokens)
+    token = tokens[0] if ntokens else None
+    if token == "OS" and ntokens == 3:
+        numbers = tokens[1] + tokens[2]
+    elif token == "OC" and ntokens == 6 and tokens[5] in _circle_direction_map:
+        numbers = tokens[1] + tokens[2] + tokens[3] + tokens[4]
+    elif token == "OB" and ntokens == 4 and tokens[3] in _polygon_type_map:
+        numbers = tokens[1] + tokens[2]
+    else:
+        return None
+    return tokens if number_chars.issuperset(numbers) else None
+
+def _fast_parse_contour(line):
+    "Parse an OB, OS or OC record without regex. Returns None for unsupported lines."
+    tokens = _tokenize_contour(line)
+    if tokens is None:
+        return None
+    token = tokens[0]
+    if token == "OS":
+        return PolygonSegmentTag(Point(float(tokens[1]), float(tokens[2])))
+    elif token == "OC":
+        return PolygonCircleTag(Point(float(tokens[1]), float(tokens[2])),
+                                Point(float(tokens[3]), float(tokens[4])),
+                                _circle_direction_map[tokens[5]])
+    return PolygonBeginTag(Point(float(tokens[1]), float(tokens[2])),
+                           _polygon_type_map[tokens[3]])
+
+# Regex-free parsers for CompiledDecoder
+polygon_fast_paths = {
+    "OB": _fast_parse_contour,
+    "OS": _fast_parse_contour,
+    "OC": _fast_parse_contour
+}
+
 def _treeifier_process_polygon(elems):
     """Treeifier processor function for polygons."""
     steps = []
@@ -3,9 +3,9 @@
 """
 Parser for the ODB++ PCB profile file
 """
-import os.path
 from collections import namedtuple
 from .LineRecordParser import *
+from .JobSource import job_source
 from .SurfaceParser import *
 from .PolygonParser import *
 from .Decoder import *
@@ -14,17 +14,35 @@ from .Units import *
 
 __all__ = ["read_profile", "parse_profile", "Profile"]
 
-Profile = namedtuple("Profile", ["unit", "surfaces"])
+class Profile(namedtuple("Profile", ["unit", "surfaces"])):
+    def bbox(self):
+        """
+        Returns the (minx, miny, maxx, maxy) bounding box of the board outline
+        or None for empty profiles. The result is cached.
+        """
+        if "_bbox" not in self.__dict__:
+            self.__dict__["_bbox"] = union_bbox(surface.bbox() for surface in self.surfaces)
+        return self.__dict__["_bbox"]
+
+_profile_decoder = CompiledDecoder(
+    surface_decoder_options + polygon_decoder_options,
+    dict(surface_fast_paths, **polygon_fast_paths))
 
 def read_profile(directory):
-    profile = read_linerecords(os.path.join(directory, "steps/pcb/profile"))
-    return parse_profile(profile)
+    """Read the board profile from an ODB++ directory, archive or JobSource"""
+    with job_source(directory) as source:
+        with source.open("steps/pcb/profile") as fin:
+            return parse_profile(iter_linerecords(fin))
 
 def parse_profile(linerecords):
+    """
+    Parse a profile from a linerecord dict
+    or from a section stream from iter_linerecords()
+    """
+    linerecords = materialize_sections(linerecords, "Layer features")
     # Build rulesets
-    decoder_options = surface_decoder_options + polygon_decoder_options
     treeifyer_rules = surface_treeify_rules + polygon_treeify_rules
 
-    decoded = list(run_decoder(linerecords["Layer features"], decoder_options))
+    decoded = run_decoder(linerecords["Layer features"], _profile_decoder)
     surfaces = treeify(decoded, treeifyer_rules)
     return Profile(linerecords_unit(linerecords), surfaces)
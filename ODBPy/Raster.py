@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Render the features of a layer into NumPy bitmaps.
+
+Pads are rendered using their standard symbol shape, lines using a round
+or square aperture and surfaces using the even-odd rule, so holes are cut out.
+Features are drawn in file order: Positive features set pixels,
+negative features clear them.
+
+The image is rendered tile by tile, optionally in a process pool,
+so only the tiles in flight need to be kept in memory.
+Use iter_tiles() to process tiles as they are rendered or
+render_layer() with a memory-mapped output array for images
+that don't fit into memory.
+
+Pixel (row, col) has its center at
+(minx + (col + 0.5) * resolution, maxy - (row + 0.5) * resolution),
+i.e. row 0 is the top of the image.
+
+Supported pad shapes are round, square, rectangle, oval, ellipse, diamond,
+round and square donuts and holes. Other standard symbols are rendered as their
+bounding box. User-defined symbols have no known geometry and are not rendered.
+"""
+import math
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from .SpatialIndex import SpatialIndex, feature_table_bboxes
+from .StandardSymbols import parse_standard_symbol, symbol_size, Round, Square, \
+    Oval, Ellipse, Diamond, RoundDonut, SquareDonut, Hole
+from .Structures import Polarity, Mirror
+
+__all__ = ["RasterGrid", "LayerRasterizer", "iter_tiles", "render_layer"]
+
+class RasterGrid(namedtuple("RasterGrid", ["minx", "maxy", "resolution", "width", "height"])):
+    """The pixel grid of an image: Top left corner, pixel size and size in pixels"""
+    @classmethod
+    def from_bounds(cls, bounds, resolution):
+        """Grid covering the given (minx, miny, maxx, maxy) bounds"""
+        minx, miny, maxx, maxy = bounds
+        return cls(minx, maxy, resolution,
+                   max(1, int(math.ceil((maxx - minx) / resolution))),
+                   max(1, int(math.ceil((maxy - miny) / resolution))))
+
+    def tiles(self, tile_size):
+        """(row0, col0, height, width) of all tiles, row by row"""
+        return [(row, col, min(tile_size, self.height - row), min(tile_size, self.width - col))
+                for row in range(0, self.height, tile_size)
+                for col in range(0, self.width, tile_size)]
+
+def _symbol_mask(symbol, size, u, v):
+    """
+    Pixels inside a standard symbol. u and v are the pixel center coordinates
+    relative to the symbol center in symbol units. size is the symbol_size().
+    Rectangles and unsupported symbols are rendered as their bounding box.
+    """
+    u, v = np.abs(u), np.abs(v)
+    if isinstance(symbol, Round):
+        return u * u + v * v <= (symbol.diameter / 2) ** 2
+    if isinstance(symbol, Hole):
+        return u * u + v * v <= (symbol.diameter / 2) ** 2
+    if isinstance(symbol, Square):
+        return (u <= symbol.side / 2) & (v <= symbol.side / 2)
+    if isinstance(symbol, Oval):
+        # Stadium along the longer axis
+        if symbol.width < symbol.height:
+            u, v = v, u
+        radius = min(symbol.width, symbol.height) / 2
+        straight = abs(symbol.width - symbol.height) / 2
+        du = np.maximum(u - straight, 0)
+        return du * du + v * v <= radius * radius
+    if isinstance(symbol, Ellipse):
+        return (u / (symbol.width / 2)) ** 2 + (v / (symbol.height / 2)) ** 2 <= 1
+    if isinstance(symbol, Diamond):
+        return u / (symbol.width / 2) + v / (symbol.height / 2) <= 1
+    if isinstance(symbol, RoundDonut):
+        rsq = u * u + v * v
+        return (rsq <= (symbol.outer_diameter / 2) ** 2) & (rsq >= (symbol.inner_diameter / 2) ** 2)
+    if isinstance(symbol, SquareDonut):
+        outer, inner = symbol.outer_diameter / 2, symbol.inner_diameter / 2
+        return (u <= outer) & (v <= outer) & ((u >= inner) | (v >= inner))
+    width, height = size
+    return (u <= width / 2) & (v <= height / 2)
+
+def _fill_even_odd(mask, edges, rowcenters, colorigin, resolution):
+    """
+    Set the pixels of mask that are inside the closed rings given by edges
+    (an (n, 4) array of x0, y0, x1, y1) using the even-odd rule.
+    rowcenters are the y coordinates of the mask rows, colorigin is
+    the x coordinate of the left border of the first mask column.
+    """
+    nrows, ncols = mask.shape
+    x0, y0, x1, y1 = edges.T
+    lo, hi = np.minimum(y0, y1), np.maximum(y0, y1)
+    top = rowcenters[0] + resolution / 2
+    # Half-open crossing rule: Row centers in [lo, hi)
+    first = np.maximum(np.floor((top - hi) / resolution - 0.5).astype(np.int64) + 1, 0)
+    last = np.minimum(np.floor((top - lo) / resolution - 0.5).astype(np.int64), nrows - 1)
+    counts = np.maximum(last - first + 1, 0)
+    edge = np.repeat(np.arange(len(edges)), counts)
+    rows = np.repeat(first, counts) + np.arange(counts.sum()) - \
+        np.repeat(np.cumsum(counts) - counts, counts)
+    yc = rowcenters[rows]
+    xc = x0[edge] + (yc - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+    order = np.lexsort((xc, rows))
+    rows, xc = rows[order], xc[order]
+    # Consecutive crossings in each row are span start and end
+    spanrows, xa, xb = rows[0::2], xc[0::2], xc[1::2]
+    ca = np.clip(np.ceil((xa - colorigin) / resolution - 0.5), 0, ncols).astype(np.int64)
+    cb = np.clip(np.ceil((xb - colorigin) / resolution - 0.5), 0, ncols).astype(np.int64)
+    valid = ca < cb
+    diff = np.zeros((nrows, ncols + 1), dtype=np.int32)
+    np.add.at(diff, (spanrows[valid], ca[valid]), 1)
+    np.add.at(diff, (spanrows[valid], cb[valid]), -1)
+    mask |= np.cumsum(diff, axis=1)[:, :-1] > 0
+
+class LayerRasterizer(object):
+    """
+    Renders tiles of the features of a FeatureTable.
+
+    scale converts symbol units to coordinate units (see feature_table_bboxes()),
+    by default table.symbol_scale.
+    Arcs in surfaces are flattened with the given tolerance,
+    by default a quarter of the resolution.
+    """
+    def __init__(self, table, grid, scale=None, tolerance=None):
+        self.table = table
+        self.grid = grid
+        self.scale = scale if scale is not None else table.symbol_scale
+        self.tolerance = tolerance or grid.resolution / 4
+        ids, self.boxes = feature_table_bboxes(table, scale)
+        self.feature_ids = ids
+        self.index = SpatialIndex(self.boxes)
+        self.npads, self.nlines = len(table.pads), len(table.lines)
+        self.surface_rows = np.nonzero(~np.isnan(table.surfaces["minx"]))[0]
+        # Symbol number => (standard symbol, symbol size). User symbols are (None, None)
+        self.symbols = {num: (parse_standard_symbol(name), symbol_size(name))
+                        for num, name in table.symbol_names.items()}
+        self._tessellation = None
+
+    def _edges(self, surface):
+        "(n, 4) edge array of all tessellated rings of a surface row"
+        if self._tessellation is None:
+            self._tessellation = self.table.tessellation(self.tolerance)
+        row = self.table.surfaces[surface]
+        rings = [self._tessellation.ring(i) for i in range(row["polygon_start"], row["polygon_end"])]
+        edges = [np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings if len(ring)]
+        return np.concatenate(edges) if edges else np.empty((0, 4))
+
+    def _window(self, box, row0, col0, height, width):
+        "Pixel range of the tile covering a box: (r0, r1, c0, c1)"
+        res = self.grid.resolution
+        left, top = self.grid.minx + col0 * res, self.grid.maxy - row0 * res
+        c0 = max(0, int(math.ceil((box[0] - left) / res - 0.5)))
+        c1 = min(width, int(math.floor((box[2] - left) / res - 0.5)) + 1)
+        r0 = max(0, int(math.ceil((top - box[3]) / res - 0.5)))
+        r1 = min(height, int(math.floor((top - box[1]) / res - 0.5)) + 1)
+        return r0, r1, c0, c1
+
+    def _pad_mask(self, row, xs, ys):
+        pad = self.table.pads[row]
+        symbol, size = self.symbols.get(int(pad["symbol"]), (None, None))
+        if symbol is None: # User symbol
+            return None
+        dx, dy = xs - pad["x"], ys - pad["y"]
+        # Undo the clockwise rotation, then the mirroring
+        angle = math.radians(pad["angle"])
+        cos, sin = math.cos(angle), math.sin(angle)
+        u, v = dx * cos - dy * sin, dx * sin + dy * cos
+        if pad["mirror"] in (Mirror.MirrorX.value, Mirror.Mirror.value):
+            u = -u
+        elif pad["mirror"] == Mirror.MirrorY.value:
+            v = -v
+        factor = self.scale * pad["resize_factor"]
+        return _symbol_mask(symbol, size, u / factor, v / factor)
+
+    def _line_mask(self, row, xs, ys):
+        line = self.table.lines[row]
+        symbol, size = self.symbols.get(int(line["symbol"]), (None, None))
+        if size is None:
+            return None
+        half = max(size) * self.scale / 2
+        sx, sy = line["xs"], line["ys"]
+        dx, dy = line["xe"] - sx, line["ye"] - sy
+        px, py = xs - sx, ys - sy
+        if isinstance(symbol, Square):
+            # Square aperture: t in [0, 1] exists with |p - t * d| <= half on both axes
+            tmin, tmax = 0., 1.
+            feasible = True
+            for p, d in ((px, dx), (py, dy)):
+                if d == 0:
+                    feasible = feasible & (np.abs(p) <= half)
+                else:
+                    ta, tb = (p - half) / d, (p + half) / d
+                    tmin, tmax = np.maximum(tmin, np.minimum(ta, tb)), np.minimum(tmax, np.maximum(ta, tb))
+            return feasible & (tmin <= tmax)
+        # Round aperture: Distance to the segment
+        length = dx * dx + dy * dy
+        t = np.clip((px * dx + py * dy) / length, 0, 1) if length > 0 else 0.
+        ex, ey = px - t * dx, py - t * dy
+        return ex * ex + ey * ey <= half * half
+
+    def render_tile(self, row0, col0, height, width):
+        """Render the given pixel range into a boolean (height, width) array"""
+        grid, res = self.grid, self.grid.resolution
+        tile = np.zeros((height, width), dtype=bool)
+        left, top = grid.minx + col0 * res, grid.maxy - row0 * res
+        positions = self.index.query(left, top - height * res, left + width * res, top)
+        # Draw in file order
+        positions = positions[np.argsort(self.feature_ids[positions], kind="stable")]
+        colcenters = left + (np.arange(width) + 0.5) * res
+        rowcenters = top - (np.arange(height) + 0.5) * res
+        for pos in positions.tolist():
+            r0, r1, c0, c1 = self._window(self.boxes[pos], row0, col0, height, width)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            xs, ys = colcenters[None, c0:c1], rowcenters[r0:r1, None]
+            if pos < self.npads:
+                polarity = self.table.pads["polarity"][pos]
+                mask = self._pad_mask(pos, xs, ys)
+            elif pos < self.npads + self.nlines:
+                polarity = self.table.lines["polarity"][pos - self.npads]
+                mask = self._line_mask(pos - self.npads, xs, ys)
+            else:
+                surface = self.surface_rows[pos - self.npads - self.nlines]
+                polarity = self.table.surfaces["polarity"][surface]
+                mask = np.zeros((r1 - r0, c1 - c0), dtype=bool)
+                _fill_even_odd(mask, self._edges(surface), rowcenters[r0:r1],
+                               left + c0 * res, res)
+            if mask is None:
+                continue
+            window = tile[r0:r1, c0:c1]
+            if polarity == Polarity.Negative.value:
+                window &= ~mask
+            else:
+                window |= mask
+        return tile
+
+# Rasterizer of the worker processes, see _init_worker()
+_worker_rasterizer = None
+
+def _init_worker(table, grid, scale, tolerance):
+    global _worker_rasterizer
+    _worker_rasterizer = LayerRasterizer(table, grid, scale, tolerance)
+
+def _render_worker_tile(tile):
+    return tile, _worker_rasterizer.render_tile(*tile)
+
+def iter_tiles(table, resolution, bounds=None, tile_size=2048, workers=None,
+               scale=None, tolerance=None):
+    """
+    Render a FeatureTable tile by tile.
+    resolution is the pixel size in coordinate units.
+    bounds is the (minx, miny, maxx, maxy) area to render,
+    by default the extent of the layer.
+    workers is the number of processes (default: number of CPUs).
+    With workers=1, all tiles are rendered in the current process.
+
+    Yields (row0, col0, tile) with boolean tile arrays in the order the
+    tiles are finished. At most two tiles per worker are queued or
+    waiting to be consumed at any time.
+    """
+    bounds = bounds or table.extent(scale)
+    if bounds is None: # No features
+        return
+    grid = RasterGrid.from_bounds(bounds, resolution)
+    tiles = grid.tiles(tile_size)
+    if workers == 1 or len(tiles) <= 1:
+        rasterizer = LayerRasterizer(table, grid, scale, tolerance)
+        for tile in tiles:
+            yield tile[0], tile[1], rasterizer.render_tile(*tile)
+        return
+    window = 2 * (workers or os.cpu_count() or 1)
+    pending = set()
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(table, grid, scale, tolerance)) as executor:
+        try:
+            tiles = iter(tiles)
+            while True:
+                for tile in tiles:
+                    pending.add(executor.submit(_render_worker_tile, tile))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    (row0, col0, _, _), image = future.result()
+                    yield row0, col0, image
+        finally: # Don't render the rest if the consumer stops early
+            for future in pending:
+                future.cancel()
+
+def render_layer(table, resolution, bounds=None, tile_size=2048, workers=None,
+                 scale=None, tolerance=None, dtype=bool, out=None):
+    """
+    Render a FeatureTable into one image (see iter_tiles() for the arguments).
+    dtype is bool or np.uint8 (copper is 255).
+    out is an optional preallocated (height, width) array of that size,
+    e.g. a numpy.memmap for images larger than the memory.
+    Use RasterGrid.from_bounds() to compute its size.
+    """
+    bounds = bounds or table.extent(scale)
+    if bounds is None:
+        return np.zeros((0, 0), dtype=dtype) if out is None else out
+    grid = RasterGrid.from_bounds(bounds, resolution)
+    if out is None:
+        out = np.zeros((grid.height, grid.width), dtype=dtype)
+    on = True if out.dtype == bool else 255
+    for row0, col0, tile in iter_tiles(table, resolution, bounds, tile_size,
+                                       workers, scale, tolerance):
+        window = out[row0:row0 + tile.shape[0], col0:col0 + tile.shape[1]]
+        window[...] = 0
+        window[tile] = on
+    return out
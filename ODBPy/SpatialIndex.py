@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Static spatial index for layer features.
+
+SpatialIndex is a packed R-tree, bulk loaded using Sort-Tile-Recursive (STR):
+Boxes are sorted into vertical slices by x and within each slice by y,
+then consecutive groups of node_size boxes form the nodes of the next level.
+Building is O(n log n) and fully vectorized.
+
+Boxes are (minx, miny, maxx, maxy) rows. Queries return the ids
+given when building the index, e.g. the feature indices of a FeatureTable.
+"""
+import heapq
+import math
+import numpy as np
+from .StandardSymbols import symbol_size
+
+__all__ = ["SpatialIndex", "BoxGrid", "feature_table_bboxes"]
+
+def _symbol_sizes(table, scale):
+    """(n, 2) array of (width, height) for every symbol number in the table"""
+    nums = list(table.symbol_names.keys())
+    maxnum = max(nums + [int(table.pads["symbol"].max(initial=-1)),
+                         int(table.lines["symbol"].max(initial=-1))])
+    sizes = np.zeros((maxnum + 1, 2))
+    for num, name in table.symbol_names.items():
+        size = symbol_size(name)
+        if size is not None:
+            sizes[num] = size
+    return sizes * scale
+
+def feature_table_bboxes(table, scale=None):
+    """
+    Compute the bounding boxes of all pads, lines and surfaces in a FeatureTable.
+    Symbol sizes (including the pad resize factor and rotation) are taken
+    into account. scale converts symbol units to coordinate units.
+    The default is the symbol_scale of the table: 0.001 converts mil to inch
+    and micron to mm, nanometer tables use 25400 or 1000.
+    User-defined symbols have no known size and are treated as points.
+    Surfaces use their contour bounding box, surfaces without contours are skipped.
+
+    Returns (ids, boxes) where ids are the feature indices and boxes is
+    a (n, 4) array of (minx, miny, maxx, maxy).
+    """
+    if scale is None:
+        scale = table.symbol_scale
+    sizes = _symbol_sizes(table, scale)
+    pads, lines = table.pads, table.lines
+    # Pads: Rotate the half extents of the symbol
+    half = sizes[pads["symbol"]] * pads["resize_factor"][:, None] / 2
+    angle = np.radians(pads["angle"])
+    cos, sin = np.abs(np.cos(angle)), np.abs(np.sin(angle))
+    hw = cos * half[:, 0] + sin * half[:, 1]
+    hh = sin * half[:, 0] + cos * half[:, 1]
+    pad_boxes = np.stack([pads["x"] - hw, pads["y"] - hh, pads["x"] + hw, pads["y"] + hh], axis=1)
+    # Lines: Endpoints extended by the half width of the (round or square) symbol
+    pen = sizes[lines["symbol"]].max(axis=1) / 2
+    line_boxes = np.stack([
+        np.minimum(lines["xs"], lines["xe"]) - pen, np.minimum(lines["ys"], lines["ye"]) - pen,
+        np.maximum(lines["xs"], lines["xe"]) + pen, np.maximum(lines["ys"], lines["ye"]) + pen
+    ], axis=1)
+    # Surfaces: Precomputed contour bounding boxes
+    surfaces = table.surfaces[~np.isnan(table.surfaces["minx"])]
+    surface_boxes = np.stack([surfaces["minx"], surfaces["miny"],
+                              surfaces["maxx"], surfaces["maxy"]], axis=1)
+    ids = np.concatenate([pads["index"], lines["index"], surfaces["index"]])
+    return ids, np.concatenate([pad_boxes, line_boxes, surface_boxes]).reshape(-1, 4)
+
+class BoxGrid(object):
+    """
+    Uniform grid over boxes for point queries and bulk point joins.
+    Every box is registered in all cells it overlaps, so a point
+    query only needs to look at a single cell.
+    By default, there is about one box per cell, but cells are
+    at least as large as the median box.
+    """
+    def __init__(self, boxes, cellsize=None):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        n = len(boxes)
+        if n:
+            self.minx, self.miny = boxes[:, 0].min(), boxes[:, 1].min()
+            width = max(boxes[:, 2].max() - self.minx, 1e-9)
+            height = max(boxes[:, 3].max() - self.miny, 1e-9)
+        else:
+            self.minx, self.miny, width, height = 0., 0., 1e-9, 1e-9
+        if cellsize is None:
+            extents = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+            cellsize = max(np.sqrt(width * height / max(n, 1)),
+                           np.median(extents) if n else 0., 1e-9)
+        self.cellsize = cellsize
+        self.nx = int(width / self.cellsize) + 1
+        self.ny = int(height / self.cellsize) + 1
+        c0, r0 = self._cell(boxes[:, 0], boxes[:, 1])
+        c1, r1 = self._cell(boxes[:, 2], boxes[:, 3])
+        wx = c1 - c0 + 1
+        counts = wx * (r1 - r0 + 1)
+        item = np.repeat(np.arange(n), counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (r0[item] + k // wx[item]) * self.nx + c0[item] + k % wx[item]
+        order = np.argsort(cells, kind="stable")
+        self.items = item[order]
+        self.offsets = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.nx * self.ny), out=self.offsets[1:])
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell(self, x, y):
+        col = np.clip(((x - self.minx) / self.cellsize).astype(np.int64), 0, self.nx - 1)
+        row = np.clip(((y - self.miny) / self.cellsize).astype(np.int64), 0, self.ny - 1)
+        return col, row
+
+    def candidates(self, minx, miny, maxx, maxy):
+        """Indices of the boxes in all cells overlapping the rectangle (may contain duplicates)"""
+        (c0, c1), (r0, r1) = self._cell(np.array([minx, maxx]), np.array([miny, maxy]))
+        if c0 == c1 and r0 == r1: # Fast path for point queries
+            cell = r0 * self.nx + c0
+            return self.items[self.offsets[cell]:self.offsets[cell + 1]]
+        cells = (np.arange(r0, r1 + 1)[:, None] * self.nx + np.arange(c0, c1 + 1)).ravel()
+        return np.concatenate([self.items[self.offsets[cell]:self.offsets[cell + 1]]
+                               for cell in cells.tolist()])
+
+    def join_points(self, x, y):
+        """
+        Find all (point, box) pairs where the box contains the point, for
+        arrays of points. Returns (point indices, box indices), sorted by point.
+        """
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        col, row = self._cell(x, y)
+        cells = row * self.nx + col
+        starts, ends = self.offsets[cells], self.offsets[cells + 1]
+        counts = ends - starts
+        point = np.repeat(np.arange(len(x)), counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        box = self.items[np.repeat(starts, counts) + k]
+        boxes = self.boxes[box]
+        px, py = x[point], y[point]
+        inside = (boxes[:, 0] <= px) & (px <= boxes[:, 2]) & (boxes[:, 1] <= py) & (py <= boxes[:, 3])
+        return point[inside], box[inside]
+
+    def __repr__(self):
+        return "BoxGrid({} boxes, {}x{} cells)".format(len(self), self.nx, self.ny)
+
+def _str_order(boxes, node_size):
+    """Sort-Tile-Recursive order of the given boxes"""
+    n = len(boxes)
+    cx = boxes[:, 0] + boxes[:, 2]
+    cy = boxes[:, 1] + boxes[:, 3]
+    nslices = max(1, int(math.ceil(math.sqrt(math.ceil(n / node_size)))))
+    slice_size = nslices * node_size
+    by_x = np.argsort(cx, kind="stable")
+    slices = np.empty(n, dtype=np.int64)
+    slices[by_x] = np.arange(n) // slice_size
+    return np.lexsort((cy, slices))
+
+def _group_boxes(boxes, node_size):
+    """Bounding boxes of consecutive groups of node_size boxes"""
+    starts = np.arange(0, len(boxes), node_size)
+    return np.stack([
+        np.minimum.reduceat(boxes[:, 0], starts), np.minimum.reduceat(boxes[:, 1], starts),
+        np.maximum.reduceat(boxes[:, 2], starts), np.maximum.reduceat(boxes[:, 3], starts)
+    ], axis=1)
+
+def _box_distance(boxes, x, y):
+    """Euclidean distance of a point to each box (0 if inside)"""
+    dx = np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 2]), 0)
+    dy = np.maximum(np.maximum(boxes[:, 1] - y, y - boxes[:, 3]), 0)
+    return np.hypot(dx, dy)
+
+class SpatialIndex(object):
+    """
+    Packed, static R-tree over axis-aligned boxes.
+
+    levels[0] are the item boxes in tree order, levels[-1] is the root.
+    The children of node i on level l+1 are the boxes
+    i*node_size ... (i+1)*node_size - 1 on level l.
+    """
+    def __init__(self, boxes, ids=None, node_size=16):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        ids = np.arange(len(boxes)) if ids is None else np.asarray(ids)
+        self.node_size = node_size
+        order = _str_order(boxes, node_size) if len(boxes) else np.empty(0, dtype=np.int64)
+        self.ids = ids[order]
+        self.levels = [boxes[order]]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(_group_boxes(self.levels[-1], node_size))
+
+    @classmethod
+    def from_feature_table(cls, table, scale=None, node_size=16):
+        """Build an index of the pads, lines and surfaces of a FeatureTable by feature index"""
+        ids, boxes = feature_table_bboxes(table, scale)
+        return cls(boxes, ids, node_size)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def bounds(self):
+        """(minx, miny, maxx, maxy) of all items or None if the index is empty"""
+        return tuple(self.levels[-1][0]) if len(self) else None
+
+    def _children(self, nodes, level):
+        children = (nodes[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+        return children[children < len(self.levels[level])]
+
+    def query(self, minx, miny, maxx, maxy):
+        """Return the sorted ids of all items whose box intersects the given rectangle"""
+        if not len(self):
+            return self.ids[:0]
+        nodes = np.arange(len(self.levels[-1]))
+        for level in range(len(self.levels) - 1, -1, -1):
+            boxes = self.levels[level][nodes]
+            hit = (boxes[:, 0] <= maxx) & (boxes[:, 2] >= minx) & \
+                  (boxes[:, 1] <= maxy) & (boxes[:, 3] >= miny)
+            nodes = nodes[hit]
+            if level > 0:
+                nodes = self._children(nodes, level - 1)
+        return np.sort(self.ids[nodes])
+
+    def query_point(self, x, y):
+        """Return the sorted ids of all items whose box contains the given point"""
+        return self.query(x, y, x, y)
+
+    def nearest(self, x, y, k=1):
+        """
+        Return the ids of the k items with the nearest boxes to the given point,
+        nearest first. Items whose box contains the point have distance 0.
+        """
+        if not len(self):
+            return self.ids[:0]
+        top = len(self.levels) - 1
+        dists = _box_distance(self.levels[top], x, y)
+        heap = [(dist, top, node) for node, dist in enumerate(dists.tolist())]
+        heapq.heapify(heap)
+        result = []
+        while heap and len(result) < k:
+            _, level, node = heapq.heappop(heap)
+            if level == 0: # Item
+                result.append(node)
+                continue
+            children = self._children(np.array([node]), level - 1)
+            dists = _box_distance(self.levels[level - 1][children], x, y)
+            for child, dist in zip(children.tolist(), dists.tolist()):
+                heapq.heappush(heap, (dist, level - 1, child))
+        return self.ids[np.array(result, dtype=np.int64)]
+
+    def to_arrays(self):
+        """Arrays for saving the index, e.g. using numpy.savez()"""
+        arrays = {"level{}".format(i): boxes for i, boxes in enumerate(self.levels)}
+        arrays.update(ids=self.ids, node_size=np.array(self.node_size))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Restore an index from to_arrays() output without rebuilding it"""
+        index = cls.__new__(cls)
+        index.node_size = int(arrays["node_size"])
+        index.ids = arrays["ids"]
+        nlevels = sum(1 for key in arrays.keys() if key.startswith("level"))
+        index.levels = [arrays["level{}".format(i)] for i in range(nlevels)]
+        return index
+
+    def save(self, file):
+        np.savez(file, **self.to_arrays())
+
+    @classmethod
+    def load(cls, file):
+        with np.load(file, allow_pickle=False) as data:
+            return cls.from_arrays({key: data[key] for key in data.files})
+
+    def __repr__(self):
+        return "SpatialIndex({} items, {} levels)".format(len(self), len(self.levels))
@@ -4,6 +4,7 @@
 ODB++ standard symbol geometries
 See ODB++ 7.0 spec page 202++
 """
+import math
 import re
 from enum import Enum
 from collections import namedtuple
@@ -35,7 +36,6 @@ def _parse_allfloat_corners(rgx, constr, s):
     # Assemble args list
     args = list(map(float, groups[:-1]))
     args.append(corners)
-    print(args)
     return constr(*args)
 
 
@@ -192,3 +192,96 @@ class Hole(namedtuple("Hole", ["diameter", "plating", "tolerance_plus", "toleran
             return None
         a, platingStr, b, c = match.groups()
         return Hole(float(a), _plating_map[platingStr], float(b), float(c))
+
+# All standard symbol types, for symbol name lookup
+_symbol_types = [
+    Round, Square, Rectangle, Oval, Diamond, Octagon, RoundDonut, SquareDonut,
+    SquareRoundDonut, RoundedSquareDonut, RectangleDonut, RoundedRectangleDonut,
+    OvalDonut, HorizontalHexagon, VerticalHexagon, Butterfly, SquareButterfly,
+    Triangle, HalfOval, RoundThermalRounded, RoundThermalSquared, SquareThermal,
+    SquareThermalOpenCorners, SquareRoundThermal, RectangularThermal,
+    RectangularThermalOpenCorners, RoundedSquareThermal, RoundedSquareThermalOpenCorners,
+    RoundedRectangleThermal, RoundedRectangleThermalOpenCorners, OvalThermal,
+    OvalThermalOpenCorners, Ellipse, Moire, Hole
+]
+
+# Fields giving the (width, height) of a symbol, in order of preference
+_size_fields = [
+    ("width", "height"), ("outer_width", "outer_height"), ("base", "height"),
+    ("diameter", "diameter"), ("outer_diameter", "outer_diameter"),
+    ("outer_size", "outer_size"), ("side", "side"), ("size", "size")
+]
+
+# Rectangle and oval donuts are <outer width>x<outer height>x<line width>,
+# but their first two fields are named like the ones of round donuts
+_size_fields_by_type = {
+    RectangleDonut: ("outer_diameter", "inner_diameter"),
+    RoundedRectangleDonut: ("outer_diameter", "inner_diameter"),
+    OvalDonut: ("outer_diameter", "inner_diameter")
+}
+
+def parse_standard_symbol(name):
+    """Parse a standard symbol name like "r120" or return None if it isn't one"""
+    for symbol_type in _symbol_types:
+        symbol = symbol_type.Parse(name)
+        if symbol is not None:
+            return symbol
+    return None
+
+@functools.lru_cache(maxsize=None)
+def symbol_size(name):
+    """
+    Return the (width, height) of the bounding box of a standard symbol
+    in symbol units (mil or micron), or None if name is not a standard symbol.
+    For donuts and thermals, this is the outer size.
+
+    Example:
+        symbol_size("r120") => (120.0, 120.0)
+    """
+    symbol = parse_standard_symbol(name)
+    if symbol is None:
+        return None
+    if isinstance(symbol, Moire):
+        diameter = max(2 * symbol.num_rings * (symbol.ring_width + symbol.ring_gap),
+                       symbol.line_length)
+        return (diameter, diameter)
+    fields = _size_fields_by_type.get(type(symbol))
+    if fields is not None:
+        return (getattr(symbol, fields[0]), getattr(symbol, fields[1]))
+    for width_field, height_field in _size_fields:
+        if hasattr(symbol, width_field) and hasattr(symbol, height_field):
+            return (getattr(symbol, width_field), getattr(symbol, height_field))
+    return None
+
+@functools.lru_cache(maxsize=None)
+def symbol_area(name):
+    """
+    Return the area of a standard symbol in square symbol units,
+    or None if name is not a standard symbol.
+    The area is exact for round, square, rectangle, oval, ellipse, diamond,
+    round and square donut and hole symbols. For all other symbols,
+    the area of the bounding box is returned.
+
+    Example:
+        symbol_area("s10") => 100.0
+    """
+    symbol = parse_standard_symbol(name)
+    if symbol is None:
+        return None
+    if isinstance(symbol, (Round, Hole)):
+        return math.pi * symbol.diameter ** 2 / 4
+    if isinstance(symbol, Square):
+        return symbol.side ** 2
+    if isinstance(symbol, Oval):
+        radius = min(symbol.width, symbol.height) / 2
+        return symbol.width * symbol.height - (4 - math.pi) * radius ** 2
+    if isinstance(symbol, Ellipse):
+        return math.pi * symbol.width * symbol.height / 4
+    if isinstance(symbol, Diamond):
+        return symbol.width * symbol.height / 2
+    if isinstance(symbol, RoundDonut):
+        return math.pi * (symbol.outer_diameter ** 2 - symbol.inner_diameter ** 2) / 4
+    if isinstance(symbol, SquareDonut):
+        return symbol.outer_diameter ** 2 - symbol.inner_diameter ** 2
+    width, height = symbol_size(name)
+    return width * height
@@ -5,57 +5,128 @@ Parsing routines for the ODB++ structured text format
 according to the ODB++ 7.0 specification:
 
 http://www.odb-sa.com/wp-content/uploads/ODB_Format_Description_v7.pdf
+
+Small structured text files like matrix/matrix, the drill tools
+or the step header are read over and over again by different readers.
+read_structured_text() and read_job_structured_text() therefore memoize
+the parsed result by the path and the fingerprint (size and mtime)
+of the file, so only the first read of an unchanged file is parsed.
+Every caller gets its own copy of the memoized dicts, so modifying
+a result doesn't affect later reads.
 """
-from collections import defaultdict, namedtuple
+from collections import OrderedDict, namedtuple
+import os
 import os.path
 import re
-from .Utils import readFileLines, try_parse_number
+import threading
+from .JobSource import job_source
+from .Numeric import parse_number
+from .Utils import iterCompressedFileLines, try_parse_number
 
-__all__ = ["StructuredArray", "StructuredText", "parse_structured_text", "read_structured_text"]
+__all__ = ["StructuredArray", "StructuredText", "parse_structured_text", "read_structured_text",
+           "read_job_structured_text", "read_step_header", "clear_structured_text_cache"]
 
 StructuredText = namedtuple("StructuredText", ["metadata", "arrays"])
 StructuredArray = namedtuple("StructuredArray", ["name", "attributes"])
 array_start_re = re.compile(r"(\w+)\s+\{")
 
-
-def read_structured_text(filename):
-    "Run parse_structured_text() on the content of the given file"
-    return parse_structured_text(readFileLines(filename))
-
 def parse_structured_text(lines):
     """
     Parse structured text lines into a metadata dictionary
     and a set of StructuredArrays.
-    Takes a generator of list of pre-stripped lines
+    Takes an iterable of lines (stripped or not) and processes it in one pass.
     """
     metadata = {}
     arrays = []
     current_array = None
+    attributes = metadata # Where key/value lines go
     for line in lines:
-        line = line.strip()
-        # Parse key/value line
-        if "=" in line:
-            k, _, v = line.partition("=")
-            if current_array is None:
-                metadata[k] = try_parse_number(v)
-            else:
-                current_array.attributes[k] = try_parse_number(v)
-            continue
-        elif line == "}":
+        key, sep, value = line.strip().partition("=")
+        if sep: # Key/value line
+            # Values padded with whitespace (e.g. "KEY= 12") are rare,
+            # but int() and float() accept them
+            attributes[key] = try_parse_number(value) if value[:1].isspace() \
+                else parse_number(value)
+        elif key == "}":
             if current_array is not None:
                 arrays.append(current_array)
             current_array = None
-            continue
-        # Try to parse the start line of an array (e.g. "TOOLS {")
-        array_start_match = array_start_re.match(line)
-        if array_start_match is not None:
-            current_array = StructuredArray(
-                array_start_match.group(1), {})
-    # Append last tool, if any
+            attributes = metadata
+        elif "{" in key:
+            # Start line of an array (e.g. "TOOLS {")
+            array_start_match = array_start_re.match(key)
+            if array_start_match is not None:
+                current_array = StructuredArray(array_start_match.group(1), {})
+                attributes = current_array.attributes
+    # Append last array, if any
     if current_array is not None:
         arrays.append(current_array)
     return StructuredText(metadata, arrays)
 
+_cache = OrderedDict() # key => StructuredText
+_cache_size = 256
+_cache_lock = threading.Lock()
+
+def _copy_structured_text(stext):
+    "Copy the dicts of a StructuredText (the strings and numbers are immutable)"
+    return StructuredText(dict(stext.metadata), [
+        StructuredArray(array.name, dict(array.attributes)) for array in stext.arrays])
+
+def _memoized(key, parse):
+    """
+    Return a copy of the memoized result for key
+    or compute and store it using parse()
+    """
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return _copy_structured_text(result)
+    result = parse()
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    return _copy_structured_text(result)
+
+def clear_structured_text_cache():
+    """Forget all memoized structured text files"""
+    with _cache_lock:
+        _cache.clear()
+
+def read_structured_text(filename):
+    """
+    Run parse_structured_text() on the content of the given file or file-like object.
+    Results for filenames are memoized as long as the size and mtime of the file
+    are unchanged.
+    """
+    if not isinstance(filename, (str, os.PathLike)):
+        return parse_structured_text(iterCompressedFileLines(filename))
+    stat = os.stat(filename)
+    key = ("file", os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    return _memoized(key, lambda: parse_structured_text(iterCompressedFileLines(filename)))
+
+def read_job_structured_text(directory, path):
+    """
+    Read a structured text file (e.g. "matrix/matrix") from an ODB++ directory,
+    archive or JobSource. Like read_structured_text(), the result is memoized
+    as long as the fingerprint of the file is unchanged.
+    """
+    with job_source(directory) as source:
+        fingerprint = source.fingerprint(path)
+        if fingerprint is None:
+            raise FileNotFoundError("No such file in {}: {}".format(source.path, path))
+        key = ("job", os.path.abspath(source.path), path, fingerprint)
+        return _memoized(key, lambda: _read_job_file(source, path))
+
+def _read_job_file(source, path):
+    with source.open(path) as fin:
+        return parse_structured_text(iterCompressedFileLines(fin))
+
+def read_step_header(directory, step="pcb"):
+    """Read the stephdr file of a step from an ODB++ directory, archive or JobSource"""
+    return read_job_structured_text(directory, "steps/{}/stephdr".format(step))
+
 if __name__ == "__main__":
     #Parse commandline arguments
     import argparse
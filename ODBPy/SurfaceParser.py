@@ -9,14 +9,34 @@ from .Decoder import DecoderOption
 from .Treeifier import TreeifierRule
 from .PolygonParser import Polygon
 from .Structures import Polarity, polarity_map
-from .Attributes import parse_attributes
+from .Attributes import intern_attributes, empty_attributes
 
-__all__ = ["surface_decoder_options",
+__all__ = ["surface_decoder_options", "surface_fast_paths",
            "SurfaceBeginTag", "surface_treeify_rules",
            "surface_decoder_options",
-           "SurfaceEndTag", "Surface", "Polarity"]
+           "SurfaceEndTag", "Surface", "Polarity", "union_bbox"]
 
-Surface = namedtuple("Surface", ["polarity", "dcode", "polygons", "attributes"])
+class Surface(namedtuple("Surface", ["polarity", "dcode", "polygons", "attributes"])):
+    def bbox(self):
+        """
+        Returns the (minx, miny, maxx, maxy) bounding box of all polygons
+        or None if there are none. The result is cached.
+        """
+        if "_bbox" not in self.__dict__:
+            self.__dict__["_bbox"] = union_bbox(polygon.bbox() for polygon in self.polygons)
+        return self.__dict__["_bbox"]
+
+    def vertices(self, tolerance):
+        """Returns the tessellated vertex arrays of all polygons (see Polygon.vertices())"""
+        return [polygon.vertices(tolerance) for polygon in self.polygons]
+
+def union_bbox(bboxes):
+    """Bounding box of a number of (minx, miny, maxx, maxy) boxes. None values are ignored."""
+    bboxes = [bbox for bbox in bboxes if bbox is not None]
+    if not bboxes:
+        return None
+    minx, miny, maxx, maxy = zip(*bboxes)
+    return (min(minx), min(miny), max(maxx), max(maxy))
 
 SurfaceBeginTag = namedtuple("SurfaceBeginTag", ["polarity", "dcode", "attributes"])
 SurfaceEndTag = namedtuple("SurfaceEndTag", [])
@@ -29,8 +49,8 @@ def _parse_surface_start(match):
     "Parse a surface begin tag regex match"
     polarity, dcode, attributes = match.groups()
     # Parse attribute string
-    attributes = parse_attributes(attributes[1:]) \
-                 if attributes is not None else {}
+    attributes = intern_attributes(attributes[1:]) \
+                 if attributes is not None else empty_attributes
     return SurfaceBeginTag(polarity_map[polarity],
                            int(dcode), attributes)
 
@@ -39,11 +59,27 @@ def _parse_surface_end(match):
     return SurfaceEndTag()
 
 
+def _fast_parse_surface_start(line):
+    "Parse a surface begin record without regex. Returns None for unsupported lines."
+    record, sep, attributes = line.partition(";")
+    if sep and not attributes.strip():
+        return None
+    _, polarity, dcode = record.split()
+    if (polarity != "P" and polarity != "N") or not dcode.isdigit():
+        return None
+    return SurfaceBeginTag(polarity_map[polarity], int(dcode),
+                           intern_attributes(attributes) if sep else empty_attributes)
+
 surface_decoder_options = [
     DecoderOption(_surface_re, _parse_surface_start),
     DecoderOption(_surface_end_re, _parse_surface_end)
 ]
 
+# Regex-free parsers for CompiledDecoder
+surface_fast_paths = {
+    "S": _fast_parse_surface_start
+}
+
 def _treeifier_process_surface(elems):
     """Treeifier processor function for surfaces."""
     polygons = []
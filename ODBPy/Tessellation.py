@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Arc flattening (tessellation) of polygon contours.
+
+A polygon contour is converted to a closed ring of vertices:
+The start point of every step, followed by the points inside arc steps.
+Arcs are split into chords so that the maximum distance between each
+chord and its arc (the chord error) is at most the given tolerance.
+The last vertex is connected to the first one implicitly.
+
+All arcs of a step array (e.g. all surfaces of a layer) are
+tessellated in one vectorized pass.
+"""
+from collections import namedtuple
+import numpy as np
+from .Geometry import arc_angles, step_segment, step_arc_cw
+
+__all__ = ["arc_segment_counts", "tessellate_steps", "tessellate_table", "Tessellation"]
+
+# Maximum angle of one chord, so that coarse tolerances still produce a sensible shape
+_max_chord_angle = np.pi / 4
+
+def arc_segment_counts(radius, sweep, tolerance):
+    """
+    Number of chords required for each arc so that the chord error is
+    at most tolerance. A chord spanning the angle a has the error
+    radius * (1 - cos(a/2)).
+    """
+    if tolerance <= 0:
+        raise ValueError("Tessellation tolerance must be positive: {}".format(tolerance))
+    radius = np.asarray(radius, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        ratio = np.clip(1. - tolerance / radius, -1., 1.)
+    angle = np.minimum(2 * np.arccos(ratio), _max_chord_angle)
+    # Subtract a small epsilon so exact multiples don't get an extra chord due to rounding
+    return np.maximum(1, np.ceil(sweep / angle - 1e-9)).astype(np.int64)
+
+def tessellate_steps(xs, ys, xe, ye, xc, yc, kind, tolerance):
+    """
+    Tessellate the given contour steps (see the Geometry module).
+
+    Returns (vertices, offsets): vertices is a (m, 2) array,
+    the vertices of step i are vertices[offsets[i]:offsets[i+1]].
+    Segments have one vertex (their start point), arcs one vertex per chord.
+    """
+    xs, ys, xe, ye, xc, yc = (np.asarray(arr, dtype=np.float64) for arr in (xs, ys, xe, ye, xc, yc))
+    kind = np.asarray(kind)
+    counts = np.ones(len(xs), dtype=np.int64)
+    arcs = np.nonzero(kind != step_segment)[0]
+    radius, angle0, sweep = arc_angles(xs[arcs], ys[arcs], xe[arcs], ye[arcs],
+                                       xc[arcs], yc[arcs], kind[arcs])
+    counts[arcs] = arc_segment_counts(radius, sweep, tolerance)
+    offsets = np.zeros(len(xs) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    vertices = np.empty((offsets[-1], 2))
+    vertices[offsets[:-1], 0] = xs
+    vertices[offsets[:-1], 1] = ys
+    # Points inside the arcs: Chord k of n starts at angle start +/- sweep * k / n
+    interior = counts[arcs] - 1
+    arc = np.repeat(np.arange(len(arcs)), interior)
+    k = np.arange(interior.sum()) - np.repeat(np.cumsum(interior) - interior, interior) + 1
+    clockwise = kind[arcs] == step_arc_cw
+    # arc_angles() describes clockwise arcs starting at their end point
+    angle_start = np.where(clockwise, angle0 + sweep, angle0)
+    direction = np.where(clockwise, -1., 1.)
+    angle = angle_start[arc] + direction[arc] * sweep[arc] * k / counts[arcs][arc]
+    position = offsets[arcs][arc] + k
+    vertices[position, 0] = xc[arcs][arc] + radius[arc] * np.cos(angle)
+    vertices[position, 1] = yc[arcs][arc] + radius[arc] * np.sin(angle)
+    return vertices, offsets
+
+class Tessellation(namedtuple("Tessellation", ["vertices", "polygon_start", "polygon_end", "tolerance"])):
+    """
+    Tessellated contours of all polygons of a FeatureTable.
+    The ring of polygon i is vertices[polygon_start[i]:polygon_end[i]].
+    """
+    def ring(self, i):
+        """The (n, 2) vertex array of the given polygon"""
+        return self.vertices[self.polygon_start[i]:self.polygon_end[i]]
+
+def tessellate_table(table, tolerance):
+    """
+    Tessellate all surface polygons of a FeatureTable in one pass.
+    Prefer FeatureTable.tessellation(), which caches the result.
+    """
+    steps = table.steps
+    vertices, offsets = tessellate_steps(steps["xs"], steps["ys"], steps["xe"], steps["ye"],
+                                         steps["xc"], steps["yc"], steps["kind"], tolerance)
+    polygons = table.polygons
+    return Tessellation(vertices, offsets[polygons["step_start"]],
+                        offsets[polygons["step_end"]], tolerance)
@@ -2,13 +2,28 @@
 # -*- coding: utf-8 -*-
 """
 ODB++ unit utilities
+
+Besides scalar conversions, coordinates can be converted to
+int64 nanometers (see to_nanometers()), which the columnar decoders
+use in their nanometers mode. Integer coordinates compare exactly
+and are converted back for display using from_nanometers(),
+or to_mm(values, "NM") etc., all of which accept NumPy arrays.
 """
 import re
+import numpy as np
 
-__all__ = ["linerecords_unit", "to_mm", "to_mil", "to_micrometers", "to_inch"]
+__all__ = ["linerecords_unit", "to_mm", "to_mil", "to_micrometers", "to_inch",
+           "parse_unit_line", "lines_unit", "default_unit", "nanometer_unit",
+           "to_nanometers", "from_nanometers", "nanometer_dtype", "records_to_nanometers",
+           "symbol_scale"]
 
 _unit_line_re = re.compile(r"U\s+([A-Z]+)")
 
+# Unit of files without unit line (see ODB++ 7.0 specification)
+default_unit = "INCH"
+# Unit string of tables decoded in nanometers mode
+nanometer_unit = "NM"
+
 def linerecords_unit(linerecords):
     """
     Given a linerecord dictionary, extract the unit string
@@ -22,26 +37,108 @@ def linerecords_unit(linerecords):
         raise ValueError("Invalid unit line: {}".format(unit_lines[0]))
     return match.group(1)
 
+def parse_unit_line(line):
+    """
+    Return the unit of a "U MM" or "UNITS=MM" line
+    or None if the line is not a unit line
+    """
+    if line.startswith("UNITS="):
+        return line[len("UNITS="):].strip() or None
+    match = _unit_line_re.fullmatch(line.strip())
+    return match.group(1) if match is not None else None
+
+def lines_unit(lines, default=default_unit):
+    """Return the unit of the first unit line in lines, or default if there is none"""
+    for line in lines:
+        unit = parse_unit_line(line)
+        if unit is not None:
+            return unit
+    return default
+
 _mm_factors = {
     "MM": 1.0,
     "UM": 0.001,
+    "NM": 1e-6,
     "IN": 25.4,
     "INCH": 25.4,
     "MIL": 0.0254
 }
 
+# Exact integer factors unit => nanometers
+_nm_factors = {
+    "MM": 1000000,
+    "UM": 1000,
+    "NM": 1,
+    "IN": 25400000,
+    "INCH": 25400000,
+    "MIL": 25400
+}
+
 def to_mm(value, from_unit):
-    """Convert a value in unit <from_unit> to mm"""
+    """Convert a value (or NumPy array) in unit <from_unit> to mm"""
     return value * _mm_factors[from_unit.upper()]
 
 def to_mil(value, from_unit):
-    """Convert a value in unit <from_unit> to mil"""
+    """Convert a value (or NumPy array) in unit <from_unit> to mil"""
     return to_mm(value, from_unit) / _mm_factors["MIL"]
 
 def to_micrometers(value, from_unit):
-    """Convert a value in unit <from_unit> to mirometers"""
+    """Convert a value (or NumPy array) in unit <from_unit> to mirometers"""
     return to_mm(value, from_unit) / _mm_factors["UM"]
 
 def to_inch(value, from_unit):
-    """Convert a value in unit <from_unit> to inches"""
+    """Convert a value (or NumPy array) in unit <from_unit> to inches"""
     return to_mm(value, from_unit) / _mm_factors["IN"]
+
+def to_nanometers(values, from_unit, missing=-1):
+    """
+    Convert a value or array in unit <from_unit> to int64 nanometers,
+    rounded to the nearest nanometer. NaN values become <missing>.
+    Returns an int for scalars and an int64 array otherwise.
+    """
+    scaled = np.multiply(values, _nm_factors[from_unit.upper()], dtype=np.float64)
+    nan = np.isnan(scaled)
+    if nan.any():
+        scaled = np.where(nan, missing, scaled)
+    result = np.rint(scaled).astype(np.int64)
+    return int(result) if result.ndim == 0 else result
+
+def from_nanometers(values, to_unit="MM"):
+    """
+    Convert nanometers (e.g. a column of a table decoded in nanometers mode)
+    to unit <to_unit>. Returns a float for scalars and a float64 array otherwise.
+    """
+    result = np.divide(values, _nm_factors[to_unit.upper()], dtype=np.float64)
+    return float(result) if result.ndim == 0 else result
+
+def nanometer_dtype(dtype, fields):
+    """The structured dtype with the given fields replaced by int64 (nanometers)"""
+    return np.dtype([(name, np.int64 if name in fields else dtype[name])
+                     for name in dtype.names])
+
+def records_to_nanometers(records, fields, from_unit, missing=-1):
+    """
+    Convert the given fields of a structured array in unit <from_unit>
+    to int64 nanometers. Returns a new array of nanometer_dtype().
+    """
+    result = np.empty(len(records), dtype=nanometer_dtype(records.dtype, fields))
+    for name in records.dtype.names:
+        if name in fields:
+            result[name] = to_nanometers(records[name], from_unit, missing)
+        else:
+            result[name] = records[name]
+    return result
+
+def symbol_scale(unit, source_unit=None):
+    """
+    Factor that converts symbol sizes to coordinates in unit <unit>.
+    Symbol sizes are in mil in inch files and in micron in mm files,
+    i.e. 1/1000 of the file unit. For nanometer coordinates, the factor
+    depends on source_unit, the unit of the file (inch if None).
+
+    Example:
+        symbol_scale("NM", "MM") => 1000
+    """
+    if unit is not None and unit.upper() == nanometer_unit:
+        return to_nanometers(0.001, source_unit or default_unit)
+    return 0.001
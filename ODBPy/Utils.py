@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import gzip
+import io
 from zipfile import ZipFile
+from .Compression import open_decompressed
 
-__all__ = ["readFileLines", "readGZIPFileLines", "readZIPFileLines", "try_parse_number",
-           "not_none", "const_false"]
+__all__ = ["readFileLines", "readGZIPFileLines", "readZIPFileLines",
+           "iterFileLines", "iterGZIPFileLines", "iterZIPFileLines",
+           "iterCompressedFileLines",
+           "try_parse_number", "not_none", "const_false"]
 
 def try_parse_number(s):
     """
     Return int(s), float(s) or s if unparsable.
     Also returns s if s starts with 0 unless it is "0" or starts with "0."
     (and therefore can't be treated like a number)
+    Like int() and float(), this accepts e.g. " 12", "1_000" or "Infinity".
+    See Numeric.parse_number() for a faster, stricter alternative
+    that doesn't raise and catch exceptions.
     """
     if s.startswith("0") and len(s) != 1 and not s.startswith("0."):
         return s
@@ -20,7 +27,7 @@ def try_parse_number(s):
     except ValueError: # Try float or return s
         try:
             return float(s)
-        except:
+        except ValueError:
             return s
 
 def readFileLines(filepath, open_fn=open):
@@ -44,6 +51,46 @@ def readZIPFileLines(filepath, codec="utf-8"):
         return [l.strip() for l in
                 thezip.read(names[0]).decode(codec).split("\n")]
 
+def iterFileLines(filepath, open_fn=open):
+    """
+    Lazily yield the stripped lines of a given file.
+    Only one chunk of the file is held in memory at any time.
+    """
+    if hasattr(filepath, "read"): # File-like object
+        for line in filepath:
+            yield line.strip()
+        return
+    with open_fn(filepath, "rt") as fin:
+        for line in fin:
+            yield line.strip()
+
+def iterGZIPFileLines(filepath):
+    "Lazily yield stripped lines of a given file in gzip format"
+    return iterFileLines(filepath, open_fn=gzip.open)
+
+def iterZIPFileLines(filepath, codec="utf-8"):
+    "Lazily yield stripped lines of a given ZIP file containing only one entry"
+    with ZipFile(filepath, 'r') as thezip:
+        names = thezip.namelist()
+        if len(names) != 1:
+            raise ValueError("ZIP files does not contain exactly one file: {}".format(names))
+        with thezip.open(names[0]) as fin:
+            for line in io.TextIOWrapper(fin, encoding=codec):
+                yield line.strip()
+
+def iterCompressedFileLines(filepath, codec="utf-8"):
+    """
+    Lazily yield stripped lines of a given file or file-like object.
+    LZW (Unix compress), gzip and ZIP compression is detected
+    automatically and decompressed on the fly.
+    """
+    if isinstance(filepath, io.TextIOBase): # Already decoded
+        yield from iterFileLines(filepath)
+        return
+    with open_decompressed(filepath) as fin, io.TextIOWrapper(fin, encoding=codec) as text:
+        for line in text:
+            yield line.strip()
+
 def not_none(x):
     "Return True exactly if x is not None. Mostly used as a filter predicate."
     return x is not None
@@ -1,38 +1,76 @@
 # https://techoverflow.net/2018/01/23/converting-namedtuples-to-xlsx-in-python/
-import xlsxwriter
+import csv
 import itertools
 from collections import namedtuple
 
-def xlsx_write_rows(filename, rows):
+def xlsx_write_rows(filename, rows, constant_memory=True):
     """
     Write XLSX rows from an iterable of rows.
     Each row must be an iterable of writeable values.
+    With constant_memory, every row is flushed to disk once the next
+    row is written, so the sheet is never held in memory.
     Returns the number of rows written
     """
-    workbook = xlsxwriter.Workbook(filename)
+    import xlsxwriter # Only required for XLSX output
+    workbook = xlsxwriter.Workbook(filename, {"constant_memory": constant_memory})
     worksheet = workbook.add_worksheet()
     # Write values
     nrows = 0
     for i, row in enumerate(rows):
-        for j, val in enumerate(row):
-            worksheet.write(i, j, val)
+        worksheet.write_row(i, 0, row)
         nrows += 1
     # Cleanup
     workbook.close()
     return nrows
 
-def namedtuples_to_xlsx(filename, values):
+def csv_write_rows(filename, rows):
     """
-    Convert a list or generator of namedtuples to an XLSX file.
-    Returns the number of rows written.
+    Write CSV rows from an iterable of rows, one row at a time.
+    Returns the number of rows written
+    """
+    nrows = 0
+    with open(filename, "w", newline="", encoding="utf-8") as fout:
+        writer = csv.writer(fout)
+        for row in rows:
+            writer.writerow(row)
+            nrows += 1
+    return nrows
+
+def write_rows(filename, rows):
+    """
+    Write rows to a CSV file if filename ends with .csv, else to a XLSX file.
+    Returns the number of rows written
+    """
+    if filename.lower().endswith(".csv"):
+        return csv_write_rows(filename, rows)
+    return xlsx_write_rows(filename, rows)
+
+def namedtuples_to_rows(values):
     """
+    Lazily convert a list or generator of namedtuples to rows,
+    starting with a header row of the field names.
+    Generates no rows at all if there are no values.
+    """
+    # Ensure its a generator (next() not allowed on lists)
+    values = (v for v in values)
     try:
-        # Ensure its a generator (next() not allowed on lists)
-        values = (v for v in values)
         # Use first row to generate header
         peek = next(values)
-        header = list(peek.__class__._fields)
-        return xlsx_write_rows(filename, itertools.chain([header], [peek], values))
     except StopIteration:  # Empty generator
-        # Write empty xlsx
-        return xlsx_write_rows(filename, [])
+        return
+    yield list(peek.__class__._fields)
+    yield from itertools.chain([peek], values)
+
+def namedtuples_to_xlsx(filename, values):
+    """
+    Convert a list or generator of namedtuples to an XLSX file.
+    Returns the number of rows written.
+    """
+    return xlsx_write_rows(filename, namedtuples_to_rows(values))
+
+def namedtuples_to_csv(filename, values):
+    """
+    Convert a list or generator of namedtuples to a CSV file.
+    Returns the number of rows written.
+    """
+    return csv_write_rows(filename, namedtuples_to_rows(values))
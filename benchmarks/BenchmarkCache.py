@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Measure loading all layer features of a synthetic job with
+an empty (cold) and a filled (warm) ParseCache.
+"""
+import argparse
+import os.path
+import shutil
+import tempfile
+import time
+from ODBPy.Cache import ParseCache
+from ODBPy.Job import ODBJob
+from BenchmarkParallelLayers import write_job
+
+def load_all(directory, cache):
+    job = ODBJob(directory, memory_budget=None, cache=cache)
+    return sum(len(job.features[layer]) for layer in job.features)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-l", "--layers", type=int, default=8, help="Number of layers")
+    parser.add_argument("-n", "--lines", type=int, default=100000, help="Lines in the largest layer")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    try:
+        write_job(os.path.join(directory, "job"), args.layers, args.lines)
+        cache = ParseCache(os.path.join(directory, "cache"))
+        for name in ["cold", "warm"]:
+            start = time.perf_counter()
+            nfeatures = load_all(os.path.join(directory, "job"), cache)
+            print("{}: {:.3f} s for {} features".format(name, time.perf_counter() - start, nfeatures))
+        print("Cache size: {:.1f} MB".format(cache.size / 1e6))
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Measure loading the top and bottom components of a synthetic job:
+The original sequential, regex-only read_components(), the concurrent
+streaming read_components() and read_component_table().
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from ODBPy.Compression import lzw_compress
+from ODBPy.ComponentParser import components_decoder_options, consolidate_component_tags, \
+     component_name_to_id
+from ODBPy.ComponentTable import read_component_table, component_paths
+from ODBPy.Components import read_components
+from ODBPy.Decoder import run_decoder
+from ODBPy.JobSource import open_job
+from ODBPy.LineRecordParser import read_linerecords
+from Synthetic import component_lines
+
+def read_components_baseline(directory):
+    "read_components() before the concurrent, streaming loader"
+    job = open_job(directory)
+    result = []
+    for path in component_paths.values():
+        sections = read_linerecords(job.open(path))
+        result.append({
+            component_name_to_id(name): consolidate_component_tags(
+                list(run_decoder(lines, components_decoder_options)))
+            for name, lines in sections.items() if name is not None})
+    return result
+
+def timed(name, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print("{:<28} {:.2f} s".format(name, time.perf_counter() - start))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--components", type=int, default=10000, help="Components per side")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    try:
+        for side, path in component_paths.items():
+            lines = component_lines(args.components * 6, seed=side.value)
+            path = os.path.join(directory, *path.split("/"))
+            os.makedirs(os.path.dirname(path))
+            with open(path, "wb") as fout:
+                fout.write(lzw_compress(("\n".join(lines) + "\n").encode("ascii")))
+        timed("baseline read_components", read_components_baseline, directory)
+        timed("read_components", read_components, directory)
+        timed("read_components (1 thread)", read_components, directory, 1)
+        table = timed("read_component_table", read_component_table, directory)
+        print(table)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Measure the copper statistics of a synthetic layer using the
+vectorized exact area formulas and the raster method.
+"""
+import argparse
+import time
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.CopperStats import copper_stats
+from Synthetic import feature_lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--features", type=int, default=1000000)
+    parser.add_argument("-r", "--resolution", type=float, default=0.05)
+    args = parser.parse_args()
+    table = decode_feature_table({
+        "Layer features": feature_lines(args.features),
+        "Feature symbol names": ["${} r{}".format(i, 100 + 10 * i) for i in range(41)]})
+    print("{} features".format(len(table)))
+    for method, resolution in [("exact", None), ("raster", args.resolution)]:
+        start = time.perf_counter()
+        stats = copper_stats(table, grid=(10, 10), method=method, resolution=resolution)
+        print("{}: {:.2f} s, copper area {:.0f}, density {:.1%}".format(
+            method, time.perf_counter() - start, stats.copper_area, stats.density))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Compare the decoding throughput (lines/second) of trying every DecoderOption
+in order with the token-dispatching CompiledDecoder, with and without
+the regex-free fast paths.
+"""
+import argparse
+import time
+from ODBPy.Decoder import CompiledDecoder, run_decoder_on_line
+from ODBPy.LayerFeatureParser import _features_decoder_options, _features_fast_paths
+from ODBPy.ComponentParser import components_decoder_options
+from ODBPy.SurfaceParser import surface_decoder_options, surface_fast_paths
+from ODBPy.PolygonParser import polygon_decoder_options, polygon_fast_paths
+from ODBPy.NetlistParser import netlist_decoder_options, netlist_fast_paths
+from Synthetic import feature_lines, component_lines, profile_lines, netlist_lines
+
+def lines_per_second(fn, lines):
+    start = time.perf_counter()
+    fn(lines)
+    return len(lines) / (time.perf_counter() - start)
+
+def bench(name, lines, opts, fast_paths=None):
+    compiled = CompiledDecoder(opts)
+    fast = CompiledDecoder(opts, fast_paths)
+    linear = lines_per_second(lambda ls: [run_decoder_on_line(l, opts) for l in ls], lines)
+    dispatched = lines_per_second(lambda ls: list(compiled(ls)), lines)
+    fastpath = lines_per_second(lambda ls: list(fast(ls)), lines)
+    print("{:<12} {:>12,.0f} {:>12,.0f} {:>12,.0f} {:>8.2f}x".format(
+        name, linear, dispatched, fastpath, fastpath / linear))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--lines", type=int, default=200000, help="Lines per record type")
+    args = parser.parse_args()
+    print("{:<12} {:>12} {:>12} {:>12} {:>9}".format(
+        "File", "try-all/s", "dispatch/s", "fastpath/s", "speedup"))
+    bench("features", feature_lines(args.lines), _features_decoder_options, _features_fast_paths)
+    bench("components", component_lines(args.lines), components_decoder_options)
+    bench("profile", profile_lines(args.lines),
+          surface_decoder_options + polygon_decoder_options,
+          dict(surface_fast_paths, **polygon_fast_paths))
+    bench("netlist", netlist_lines(args.lines), netlist_decoder_options, netlist_fast_paths)
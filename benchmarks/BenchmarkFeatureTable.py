@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Compare memory usage and decoding time of decode_features() (one object per record)
+and decode_feature_table() (NumPy structured arrays).
+"""
+import argparse
+import time
+import tracemalloc
+from ODBPy.LayerFeatureParser import decode_features
+from ODBPy.FeatureTable import decode_feature_table
+from Synthetic import feature_lines
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current, peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--lines", type=int, default=200000, help="Number of feature lines")
+    args = parser.parse_args()
+    linerecords = {"Layer features": feature_lines(args.lines)}
+    print("{:<10} {:>10} {:>14} {:>14} {:>12}".format(
+        "Mode", "time/s", "retained/MB", "peak/MB", "bytes/row"))
+    for name, fn in [
+            ("objects", lambda: [f for f in decode_features(linerecords) if f is not None]),
+            ("table", lambda: decode_feature_table(linerecords))]:
+        result, elapsed, current, peak = measure(fn)
+        print("{:<10} {:>10.2f} {:>14.1f} {:>14.1f} {:>12.0f}".format(
+            name, elapsed, current / 1e6, peak / 1e6, current / len(result)))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark the built-in LZW (.Z) decompressor against the external uncompress tool.
+
+Either pass a real .Z file (e.g. a features.Z from a Valor or Altium job)
+or let the benchmark generate a synthetic features file of the given size.
+"""
+import argparse
+import shutil
+import subprocess
+import time
+from ODBPy.Compression import LZWDecompressor, lzw_compress
+from Synthetic import features_text
+
+def bench_builtin(data, use_numpy, chunk_size=1 << 16):
+    start = time.perf_counter()
+    decompressor = LZWDecompressor(use_numpy)
+    size = 0
+    for i in range(0, len(data), chunk_size):
+        size += len(decompressor.decompress(data[i:i + chunk_size]))
+    size += len(decompressor.flush())
+    return size, time.perf_counter() - start
+
+def bench_external(data):
+    tool = shutil.which("uncompress") or shutil.which("gzip")
+    if tool is None:
+        return None
+    start = time.perf_counter()
+    result = subprocess.run([tool, "-c"] if tool.endswith("uncompress") else [tool, "-dc"],
+                            input=data, stdout=subprocess.PIPE, check=True)
+    return len(result.stdout), time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file", nargs="?", help=".Z file to decompress")
+    parser.add_argument("-g", "--generate", type=float, default=20,
+                        help="Size of the synthetic features file in MB if no file is given")
+    args = parser.parse_args()
+    if args.file:
+        with open(args.file, "rb") as fin:
+            data = fin.read()
+    else:
+        data = lzw_compress(features_text(int(args.generate * 1e6)).encode("ascii"))
+    print("Compressed size: {:.1f} MB".format(len(data) / 1e6))
+    runs = [("builtin (pure Python)", lambda: bench_builtin(data, False)),
+            ("builtin (NumPy unpacking)", lambda: bench_builtin(data, True)),
+            ("external tool", lambda: bench_external(data))]
+    for name, run in runs:
+        result = run()
+        if result is None:
+            print("{}: not available".format(name))
+            continue
+        size, duration = result
+        print("{}: {:.1f} MB decompressed in {:.2f} s => {:.1f} MB/s".format(
+            name, size / 1e6, duration, size / 1e6 / duration))
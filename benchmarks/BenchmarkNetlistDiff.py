@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Measure diff_netlists() on two large netlists: The second one has
+renumbered nets, some renamed nets, some merged (shorted)
+and some split (open) nets.
+"""
+import argparse
+import time
+import numpy as np
+from ODBPy.NetlistIndex import NetlistIndex, parse_netlist_index
+from ODBPy.NetlistDiff import diff_netlists
+from Synthetic import netlist_lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--points", type=int, default=100000)
+    parser.add_argument("-c", "--changes", type=int, default=100, help="Shorts, opens and renames each")
+    args = parser.parse_args()
+    nnets = args.points // 4 + 1
+    first = parse_netlist_index({"Nets names": ["${} N{}".format(i, i) for i in range(nnets)],
+                                 "Netlist points": netlist_lines(args.points)})
+    rng = np.random.RandomState(0)
+    points = first.points.copy()
+    # Renumber all nets
+    permutation = rng.permutation(nnets)
+    points["net"] = np.where(points["net"] >= 0, permutation[np.maximum(points["net"], 0)], points["net"])
+    names = {int(permutation[num]): name for num, name in first.net_names.items()}
+    nets = rng.choice(first.nets[first.nets >= 0], 3 * args.changes, replace=False)
+    for num in nets[:args.changes]: # Rename
+        names[int(permutation[num])] += "_renamed"
+    for num1, num2 in zip(nets[args.changes:2 * args.changes:2], nets[args.changes + 1:2 * args.changes:2]):
+        # Short: Merge two nets in the first netlist = open in the second one
+        points["net"][points["net"] == permutation[num2]] = permutation[num1]
+    for num in nets[2 * args.changes:]: # Open: Split a net in the second netlist
+        members = np.nonzero(points["net"] == permutation[num])[0]
+        points["net"][members[:len(members) // 2]] = nnets + num
+    second = NetlistIndex(points, names)
+    start = time.perf_counter()
+    diff = diff_netlists(first, second)
+    print("diff_netlists ({:,} vs {:,} points): {:.2f} s".format(
+        len(first), len(second), time.perf_counter() - start))
+    print("{} matches, {} renamed, {} shorts, {} opens, {} / {} unmatched nets".format(
+        len(diff.matches), len(diff.renamed), len(diff.shorts), len(diff.opens),
+        len(diff.first_only), len(diff.second_only)))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Measure building a NetlistIndex and per-net and per-location queries
+compared to the read_netlist() dict and a linear scan.
+"""
+import argparse
+import random
+import time
+from ODBPy.Netlist import parse_netlist
+from ODBPy.NetlistIndex import parse_netlist_index
+from Synthetic import netlist_lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--points", type=int, default=200000)
+    parser.add_argument("-q", "--queries", type=int, default=1000)
+    args = parser.parse_args()
+    nnets = args.points // 4 + 1
+    linerecords = {"Nets names": ["${} N{}".format(i, i) for i in range(nnets)],
+                   "Netlist points": netlist_lines(args.points)}
+    start = time.perf_counter()
+    netlist = parse_netlist(linerecords)
+    print("parse_netlist: {:.2f} s".format(time.perf_counter() - start))
+    start = time.perf_counter()
+    index = parse_netlist_index(linerecords)
+    index.points_at(0, 0) # Build the location grid
+    print("parse_netlist_index: {:.2f} s (including the location grid)".format(
+        time.perf_counter() - start))
+    rng = random.Random(0)
+    names = ["N{}".format(rng.randrange(nnets)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for name in names:
+        index.net_points(name)
+    print("Net query: {:.1f} µs".format((time.perf_counter() - start) / args.queries * 1e6))
+    locations = [(rng.uniform(-5, 5), rng.uniform(-5, 5)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for x, y in locations:
+        index.nets_at(x, y)
+    print("Location query: {:.1f} µs".format((time.perf_counter() - start) / args.queries * 1e6))
+    points = [point for points in netlist.values() for point in points]
+    start = time.perf_counter()
+    for x, y in locations[:20]:
+        [p.netid for p in points
+         if (p.location.x - x) ** 2 + (p.location.y - y) ** 2 <= p.radius ** 2]
+    print("Linear scan: {:.1f} µs".format((time.perf_counter() - start) / 20 * 1e6))
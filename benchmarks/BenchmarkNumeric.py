@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the numeric conversion per record type:
+
+- Batch conversion: Converting every number token with float()/int()
+  before building the structured array (scalar) vs. converting
+  the token rows in one numeric_records() call (batch).
+- Scalar classification: The exception-based try_parse_number()
+  implementation vs. parse_number() on name and value tokens.
+"""
+import argparse
+import time
+from ODBPy.ComponentParser import _tokenize_cmp, _tokenize_top
+from ODBPy.ComponentTable import component_dtype, toeprint_dtype
+from ODBPy.FeatureTable import pad_dtype, line_dtype, step_dtype
+from ODBPy.LayerFeatureParser import _tokenize_pad, _tokenize_line
+from ODBPy.Numeric import parse_number, numeric_records
+from ODBPy.PolygonParser import _tokenize_contour
+from Synthetic import feature_lines, component_lines, profile_lines
+
+def previous_try_parse_number(s):
+    "The previous, exception-based implementation of try_parse_number()"
+    if s.startswith("0") and len(s) != 1 and not s.startswith("0."):
+        return s
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return float(s)
+        except:
+            return s
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def bench(name, rows, convert, dtype):
+    "rows: Token tuples. convert: Converts the number tokens of a row like the previous decoders"
+    tscalar, expected = timed(lambda: numeric_records([convert(*row) for row in rows], dtype))
+    tbatch, actual = timed(lambda: numeric_records(rows, dtype))
+    assert (expected == actual).all()
+    print("{:<12} {:>9,} {:>10.3f} {:>10.3f} {:>8.2f}x".format(
+        name, len(rows), tscalar, tbatch, tscalar / tbatch))
+
+def pad_rows(lines):
+    for i, line in enumerate(lines):
+        tokens = _tokenize_pad(line) if line.startswith("P ") else None
+        if tokens is not None:
+            x, y, sym, resize_factor, polarity, dcode, orient, angle, _ = tokens
+            yield (i, x, y, sym, resize_factor, 0, dcode, 0, angle, -1)
+
+def line_rows(lines):
+    for i, line in enumerate(lines):
+        tokens = _tokenize_line(line) if line.startswith("L ") else None
+        if tokens is not None:
+            xs, ys, xe, ye, sym, polarity, dcode, _ = tokens
+            yield (i, xs, ys, xe, ye, sym, 0, dcode, -1)
+
+def step_rows(lines):
+    point = None
+    for line in lines:
+        tokens = _tokenize_contour(line)
+        if tokens is None:
+            continue
+        if tokens[0] == "OB":
+            point = tokens[1:3]
+        elif tokens[0] == "OS":
+            yield (point[0], point[1], tokens[1], tokens[2], 0., 0., 0)
+            point = tokens[1:3]
+        else:
+            yield (point[0], point[1], tokens[1], tokens[2], tokens[3], tokens[4], 1)
+            point = tokens[1:3]
+
+def component_rows(lines):
+    for line in lines:
+        tokens = _tokenize_cmp(line) if line.startswith("CMP") else None
+        if tokens is not None:
+            pkg_ref, x, y, rot = tokens[:4]
+            yield (pkg_ref, x, y, rot, 0, 0, 0, 0)
+
+def toeprint_rows(lines):
+    for line in lines:
+        tokens = _tokenize_top(line) if line.startswith("TOP") else None
+        if tokens is not None:
+            pin_num, x, y, rot, _, net_num, subnet_num, _ = tokens
+            yield (0, pin_num, x, y, rot, 0, net_num, subnet_num, 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--lines", type=int, default=500000, help="Lines per file type")
+    args = parser.parse_args()
+    features = feature_lines(args.lines)
+    components = component_lines(args.lines)
+    print("{:<12} {:>9} {:>10} {:>10} {:>9}".format("Record", "rows", "scalar s", "batch s", "speedup"))
+    bench("pads", list(pad_rows(features)),
+          lambda i, x, y, sym, rf, pol, dcode, mirror, angle, attr: (
+              i, float(x), float(y), int(sym), float(rf), pol, int(dcode), mirror,
+              float(angle), attr), pad_dtype)
+    bench("lines", list(line_rows(features)),
+          lambda i, xs, ys, xe, ye, sym, pol, dcode, attr: (
+              i, float(xs), float(ys), float(xe), float(ye), int(sym), pol, int(dcode), attr),
+          line_dtype)
+    bench("steps", list(step_rows(profile_lines(args.lines))),
+          lambda xs, ys, xe, ye, xc, yc, kind: (
+              float(xs), float(ys), float(xe), float(ye), float(xc), float(yc), kind), step_dtype)
+    bench("components", list(component_rows(components)),
+          lambda pkg_ref, x, y, rot, mirror, side, start, end: (
+              int(pkg_ref), float(x), float(y), float(rot), mirror, side, start, end),
+          component_dtype)
+    bench("toeprints", list(toeprint_rows(components)),
+          lambda row, pin, x, y, rot, mirror, net, subnet, side: (
+              row, int(pin), float(x), float(y), float(rot), mirror, int(net), int(subnet), side),
+          toeprint_dtype)
+    # Scalar classification of names and values
+    names = [token for line in components if line.startswith(("CMP", "TOP"))
+             for token in line.split()[-2:]] + ["0.5", "1.25", "-3.5e-2", "007"] * 1000
+    tprevious, expected = timed(lambda: [previous_try_parse_number(s) for s in names])
+    tcurrent, actual = timed(lambda: [parse_number(s) for s in names])
+    assert expected == actual
+    print("{:<12} {:>9,} {:>10.3f} {:>10.3f} {:>8.2f}x".format(
+        "names", len(names), tprevious, tcurrent, tprevious / tcurrent))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measure read_all_layer_features() on a synthetic job with several
+layers of different sizes for different numbers of worker processes.
+"""
+import argparse
+import os
+import os.path
+import pickle
+import shutil
+import tempfile
+import time
+from ODBPy.Compression import lzw_compress
+from ODBPy.FeatureTable import read_all_layer_features
+from ODBPy.LayerFeatureParser import decode_features
+from Synthetic import feature_lines
+
+_layer_template = """
+LAYER {{
+    ROW={row}
+    CONTEXT=BOARD
+    TYPE=SIGNAL
+    NAME=L{row}
+    POLARITY=POSITIVE
+    START_NAME=
+    END_NAME=
+}}
+"""
+
+def write_job(directory, nlayers, nlines):
+    os.makedirs(os.path.join(directory, "matrix"))
+    with open(os.path.join(directory, "matrix", "matrix"), "w") as fout:
+        fout.write("".join(_layer_template.format(row=i + 1) for i in range(nlayers)))
+    for i in range(nlayers):
+        layerdir = os.path.join(directory, "steps", "pcb", "layers", "l{}".format(i + 1))
+        os.makedirs(layerdir)
+        # Layers get different sizes, like signal vs. plane layers
+        lines = feature_lines(nlines // (1 + i % 3), seed=i)
+        text = "#\n#Layer features\n#\n" + "\n".join(lines) + "\n"
+        with open(os.path.join(layerdir, "features.Z"), "wb") as fout:
+            fout.write(lzw_compress(text.encode("ascii")))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-l", "--layers", type=int, default=8, help="Number of layers")
+    parser.add_argument("-n", "--lines", type=int, default=100000, help="Lines in the largest layer")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    try:
+        write_job(os.path.join(directory, "job"), args.layers, args.lines)
+        print("CPUs available: {}".format(os.cpu_count()))
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            tables = read_all_layer_features(os.path.join(directory, "job"), workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print("{:>2} workers: {:6.2f} s ({:.2f}x)".format(workers, elapsed, baseline / elapsed))
+        table = next(iter(tables.values()))
+        objects = [f for f in decode_features({"Layer features": feature_lines(args.lines)})
+                   if f is not None]
+        print("IPC payload per feature: table {:.0f} bytes, objects {:.0f} bytes".format(
+            len(pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL)) / len(table),
+            len(pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL)) / len(objects)))
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Measure map_pins() on a synthetic board compared to
+a per-pin scan over all pad bounding boxes.
+"""
+import argparse
+import random
+import time
+import numpy as np
+from ODBPy.Components import Components
+from ODBPy.ComponentParser import Component, ToeprintRecord
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.PinMapping import map_pins, toeprint_table
+from ODBPy.SpatialIndex import feature_table_bboxes
+from ODBPy.Structures import Point, Mirror
+from ODBPy.Attributes import empty_attributes
+
+def synthetic_board(ncomponents, pins, seed=0):
+    """Components with a row of pins each and a pad under most pins"""
+    rng = random.Random(seed)
+    components, features = {}, []
+    for num in range(ncomponents):
+        x0, y0 = rng.uniform(0, 300), rng.uniform(0, 300)
+        toeprints = []
+        for pin in range(pins):
+            location = Point(x0 + pin * 1.27, y0)
+            toeprints.append(ToeprintRecord(pin, location, 0., Mirror.No, num, 0, str(pin)))
+            if rng.random() < 0.98:
+                features.append("P {:.4f} {:.4f} {} P 0 8 0".format(
+                    location.x, location.y, rng.randrange(2)))
+        components[num] = Component("U{}".format(num), "part", Point(x0, y0), 0., Mirror.No,
+                                    empty_attributes, {}, toeprints)
+    table = decode_feature_table({"Units": ["U MM"],
+                                  "Feature symbol names": ["$0 r600", "$1 r1000x600"],
+                                  "Layer features": features})
+    return Components(components, {}), table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--components", type=int, default=5000)
+    parser.add_argument("-p", "--pins", type=int, default=16)
+    args = parser.parse_args()
+    components, table = synthetic_board(args.components, args.pins)
+    start = time.perf_counter()
+    pin_map = map_pins(components, table)
+    elapsed = time.perf_counter() - start
+    print("map_pins ({:,} pins, {:,} pads): {:.3f} s, {} unmatched pins".format(
+        len(pin_map), len(table.pads), elapsed, len(pin_map.unmatched())))
+    _, toeprints = toeprint_table(components)
+    _, boxes = feature_table_bboxes(table)
+    sample = toeprints[:1000]
+    start = time.perf_counter()
+    for x, y in zip(sample["x"].tolist(), sample["y"].tolist()):
+        np.nonzero((boxes[:, 0] <= x) & (boxes[:, 2] >= x) & (boxes[:, 1] <= y) & (boxes[:, 3] >= y))
+    scan = (time.perf_counter() - start) / len(sample) * len(toeprints)
+    print("Per-pin scan (extrapolated): {:.3f} s".format(scan))
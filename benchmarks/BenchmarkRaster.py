@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Measure rendering a synthetic 200x200 mm layer at 10 µm tile by tile
+and report the peak memory, which is bounded by the tiles in flight.
+"""
+import argparse
+import resource
+import time
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.Raster import RasterGrid, iter_tiles
+from Synthetic import feature_lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--features", type=int, default=100000)
+    parser.add_argument("-r", "--resolution", type=float, default=0.01)
+    parser.add_argument("-t", "--tile-size", type=int, default=2048)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+    table = decode_feature_table({
+        "Layer features": feature_lines(args.features),
+        "Feature symbol names": ["${} r{}".format(i, 100 + 10 * i) for i in range(41)]})
+    grid = RasterGrid.from_bounds(table.extent(), args.resolution)
+    print("{} features, {}x{} pixels".format(len(table), grid.width, grid.height))
+    start = time.perf_counter()
+    copper = sum(int(tile.sum()) for _, _, tile in
+                 iter_tiles(table, args.resolution, tile_size=args.tile_size, workers=args.workers))
+    print("Render: {:.1f} s, copper density {:.1%}".format(
+        time.perf_counter() - start, copper / (grid.width * grid.height)))
+    print("Peak memory: {} MB".format(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024))
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Measure building a SpatialIndex and querying it compared to a linear scan.
+"""
+import argparse
+import time
+import numpy as np
+from ODBPy.SpatialIndex import SpatialIndex
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--features", type=int, default=2000000)
+    parser.add_argument("-q", "--queries", type=int, default=1000)
+    args = parser.parse_args()
+    rng = np.random.RandomState(0)
+    xy = rng.uniform(0, 500, (args.features, 2))
+    boxes = np.hstack([xy, xy + rng.uniform(0, 1, (args.features, 2))])
+    start = time.perf_counter()
+    index = SpatialIndex(boxes)
+    print("Build: {:.2f} s for {} boxes".format(time.perf_counter() - start, args.features))
+    windows = rng.uniform(0, 500, (args.queries, 2))
+    start = time.perf_counter()
+    for x, y in windows:
+        index.query(x, y, x + 2, y + 2)
+    print("Rectangle query: {:.3f} ms".format((time.perf_counter() - start) / args.queries * 1e3))
+    start = time.perf_counter()
+    for x, y in windows[:100]:
+        np.nonzero((boxes[:, 0] <= x + 2) & (boxes[:, 2] >= x) &
+                   (boxes[:, 1] <= y + 2) & (boxes[:, 3] >= y))
+    print("Linear scan: {:.3f} ms".format((time.perf_counter() - start) / 100 * 1e3))
+    start = time.perf_counter()
+    for x, y in windows:
+        index.nearest(x, y, k=10)
+    print("10-nearest query: {:.3f} ms".format((time.perf_counter() - start) / args.queries * 1e3))
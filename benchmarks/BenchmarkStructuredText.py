@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare parsing a synthetic structured text file with the previous
+exception-based parser and parse_structured_text(),
+and measure repeated read_layers() calls with the memoized matrix.
+"""
+import argparse
+import os
+import os.path
+import shutil
+import tempfile
+import time
+from ODBPy.Layers import read_layers
+from ODBPy.StructuredTextParser import *
+from ODBPy.StructuredTextParser import array_start_re
+from ODBPy.Utils import try_parse_number
+
+def matrix_lines(n):
+    "Lines of a matrix file with n layers"
+    lines = ["STEP {", "COL=1", "NAME=PCB", "}"]
+    for i in range(n):
+        lines += ["LAYER {", "ROW={}".format(i + 1), "CONTEXT=BOARD", "TYPE=SIGNAL",
+                  "NAME=L{}".format(i), "POLARITY=POSITIVE", "START_NAME=", "END_NAME=",
+                  "OLD_NAME=", "COLOR=0", "THICKNESS={}".format(0.035 + i * 1e-4), "}"]
+    return lines
+
+def previous_parse(lines):
+    "The previous implementation of parse_structured_text()"
+    metadata, arrays, current_array = {}, [], None
+    for line in lines:
+        line = line.strip()
+        if "=" in line:
+            k, _, v = line.partition("=")
+            if current_array is None:
+                metadata[k] = try_parse_number(v)
+            else:
+                current_array.attributes[k] = try_parse_number(v)
+            continue
+        elif line == "}":
+            if current_array is not None:
+                arrays.append(current_array)
+            current_array = None
+            continue
+        array_start_match = array_start_re.match(line)
+        if array_start_match is not None:
+            current_array = StructuredArray(array_start_match.group(1), {})
+    if current_array is not None:
+        arrays.append(current_array)
+    return StructuredText(metadata, arrays)
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--layers", type=int, default=20000, help="Layers in the matrix")
+    parser.add_argument("-r", "--repeat", type=int, default=100, help="Repeated read_layers() calls")
+    args = parser.parse_args()
+    lines = matrix_lines(args.layers)
+    assert previous_parse(lines) == parse_structured_text(lines)
+    previous = timed(lambda: previous_parse(lines), 3)
+    current = timed(lambda: parse_structured_text(lines), 3)
+    print("parse {} lines: previous {:.3f} s, current {:.3f} s ({:.2f}x)".format(
+        len(lines), previous, current, previous / current))
+    directory = tempfile.mkdtemp()
+    try:
+        os.makedirs(os.path.join(directory, "matrix"))
+        with open(os.path.join(directory, "matrix", "matrix"), "w") as fout:
+            fout.write("\n".join(matrix_lines(64)))
+        first = timed(lambda: read_layers(directory), 1)
+        repeated = timed(lambda: read_layers(directory), args.repeat)
+        clear_structured_text_cache()
+        print("read_layers() with 64 layers: first {:.2f} ms, repeated {:.3f} ms".format(
+            first * 1e3, repeated * 1e3))
+    finally:
+        shutil.rmtree(directory)
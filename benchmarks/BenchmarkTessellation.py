@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Measure tessellating all surfaces of a layer at once
+compared to tessellating every Polygon object on its own.
+"""
+import argparse
+import random
+import time
+from ODBPy.FeatureTable import decode_feature_table
+from Synthetic import surface_lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--surfaces", type=int, default=20000)
+    parser.add_argument("-t", "--tolerance", type=float, default=0.001)
+    args = parser.parse_args()
+    table = decode_feature_table({"Layer features": surface_lines(args.surfaces, random.Random(0))})
+    start = time.perf_counter()
+    tessellation = table.tessellation(args.tolerance)
+    print("Batched: {:.3f} s, {} vertices".format(time.perf_counter() - start,
+                                                  len(tessellation.vertices)))
+    surfaces = [table.surface(i) for i in range(len(table.surfaces))]
+    start = time.perf_counter()
+    for surface in surfaces:
+        surface.vertices(args.tolerance)
+    print("Per polygon: {:.3f} s".format(time.perf_counter() - start))
+    start = time.perf_counter()
+    table.tessellation(args.tolerance)
+    print("Cached: {:.6f} s".format(time.perf_counter() - start))
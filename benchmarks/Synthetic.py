@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Generators for synthetic, but realistically formatted ODB++ line records
+used by the benchmarks.
+"""
+import random
+
+def feature_lines(n, seed=0):
+    """Pad, line and surface records as found in a layer features file"""
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < n:
+        kind = rng.random()
+        x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        if kind < 0.6:
+            lines.append("P {:.4f} {:.4f} {} P 0 8 {};0=0,2={}".format(
+                x, y, rng.randint(0, 40), rng.choice([0, 90]), rng.randint(0, 3)))
+        elif kind < 0.95:
+            lines.append("L {:.4f} {:.4f} {:.4f} {:.4f} {} P 0".format(
+                x, y, x + rng.uniform(-5, 5), y + rng.uniform(-5, 5), rng.randint(0, 40)))
+        else:
+            lines += surface_lines(1, rng)
+    return lines[:n]
+
+def surface_lines(n, rng):
+    """Surface records, each with one rectangular island containing an arc"""
+    lines = []
+    for _ in range(n):
+        x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        lines += ["S P 0",
+                  "OB {:.4f} {:.4f} I".format(x, y),
+                  "OS {:.4f} {:.4f}".format(x, y + 2),
+                  "OC {:.4f} {:.4f} {:.4f} {:.4f} Y".format(x + 2, y + 2, x + 1, y + 2),
+                  "OS {:.4f} {:.4f}".format(x + 2, y),
+                  "OS {:.4f} {:.4f}".format(x, y),
+                  "OE",
+                  "SE"]
+    return lines
+
+def profile_lines(n, seed=0):
+    """Surface and contour records as found in a profile file"""
+    return surface_lines(max(1, n // 8), random.Random(seed))[:n]
+
+def component_lines(n, seed=0):
+    """CMP, PRP and TOP records as found in a components file"""
+    rng = random.Random(seed)
+    lines = []
+    i = 0
+    while len(lines) < n:
+        x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+        lines.append("# CMP {}".format(i))
+        lines.append("CMP {} {:.4f} {:.4f} 0 N R{} RES_0603".format(i % 50, x, y, i))
+        lines.append("PRP Name 'RC0603FR-0710KL'")
+        lines.append("PRP Value '10k'")
+        for pin in range(2):
+            lines.append("TOP {} {:.4f} {:.4f} 0 N {} 0 {}".format(
+                pin, x + 0.8 * pin, y, rng.randint(0, 500), pin + 1))
+        i += 1
+    return lines[:n]
+
+def netlist_lines(n, seed=0):
+    """Netlist point records"""
+    rng = random.Random(seed)
+    return ["{} {:.4f} {:.4f} {:.4f} {} e e staggered 0 0 0{}".format(
+                rng.randint(0, n // 4), rng.uniform(0, 0.05), rng.uniform(-5, 5),
+                rng.uniform(-5, 5), rng.choice("TDB"), rng.choice(["", " v"]))
+            for _ in range(n)]
+
+def features_text(size, seed=0):
+    """About <size> bytes of layer features file content"""
+    header = "#\n#Units\n#\nU MM\n#\n#Layer features\n#\n"
+    lines = feature_lines(max(1, size // 40), seed)
+    return header + "\n".join(lines) + "\n"
@@ -13,6 +13,7 @@ setup(name='ODBPy',
       packages=find_packages(exclude=['tests*']),
       include_package_data=True,
       requires=[],
+      install_requires=['numpy'],
       test_suite='nose.collector',
       tests_require=['nose', 'coverage', 'mock', 'rednose', 'nose-parameterized'],
       setup_requires=['nose>=1.0'],
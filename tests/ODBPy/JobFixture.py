@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Temporary ODB++ job shared by the module-level fixtures of the tests
+that read jobs from disk.
+
+Usage in a test module:
+
+    _job = JobFixture({"matrix/matrix": testMatrix}, archives=["tgz"])
+    setup_module = _job.setup
+    teardown_module = _job.teardown
+"""
+import os
+import os.path
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+__all__ = ["JobFixture"]
+
+class JobFixture(object):
+    """
+    A job directory (.dir) built from a dict of job paths => file content
+    (bytes or ASCII str), optionally also packed as .tgz (.tgz) and .zip (.zip)
+    archive. The job is created by setup() and removed by teardown().
+    """
+    def __init__(self, files, archives=()):
+        self.files = files
+        self.archives = archives
+        self.tmpdir = self.dir = self.tgz = self.zip = None
+
+    def write(self, path, content):
+        """Write a file to the job directory. Returns the filename"""
+        filename = os.path.join(self.dir, *path.split("/"))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "wb") as fout:
+            fout.write(content.encode("ascii") if isinstance(content, str) else content)
+        return filename
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dir = os.path.join(self.tmpdir, "job")
+        os.makedirs(self.dir)
+        for path, content in self.files.items():
+            self.write(path, content)
+        if "tgz" in self.archives:
+            self.tgz = os.path.join(self.tmpdir, "job.tgz")
+            with tarfile.open(self.tgz, "w:gz") as archive:
+                archive.add(self.dir, arcname="job")
+        if "zip" in self.archives:
+            self.zip = os.path.join(self.tmpdir, "job.zip")
+            with zipfile.ZipFile(self.zip, "w") as archive:
+                for path in sorted(self.files):
+                    archive.write(os.path.join(self.dir, *path.split("/")), "job/" + path)
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
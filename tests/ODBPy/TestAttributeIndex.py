@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.AttributeIndex import *
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.Features import FeatureInfo
+
+testFeatures = [
+    "P 0 0 0 P 0 8 0;0=0,2=1", "P 1 0 0 P 0 8 0", "A 1 2 3 4 5 6 7 P 0 Y",
+    "L 1 2 3 4 5 N 6;1", "P 2 0 0 P 0 8 0;0=0,2=1", "L 1 2 3 4 5 N 6;2=0"]
+
+testInfo = FeatureInfo({}, {0: ".smd", 1: ".nomenclature", 2: ".string"}, {0: "foo", 1: "bar"})
+
+class TestAttributeIndex(object):
+    def test_from_feature_table(self):
+        index = AttributeIndex.from_feature_table(
+            decode_feature_table({"Layer features": testFeatures}))
+        assert_equal(6, len(index))
+        assert_equal({0: 0, 2: 1}, index.attributes(0))
+        assert_equal({}, index.attributes(1))
+        assert_equal({}, index.attributes(2))
+        assert_equal({1: True}, index.attributes(3))
+        assert_equal({2: 0}, index.attributes(5))
+        assert_equal([0, 4, 5], index.features_with(2).tolist())
+        assert_equal([5], index.features_with(2, 0).tolist())
+        assert_equal([3], index.features_with(1, True).tolist())
+        assert_equal([], index.features_with(1, 1).tolist())
+        assert_equal([], index.features_with(7).tolist())
+
+    def test_from_mappings(self):
+        index = AttributeIndex.from_mappings([{0: 1}, {}, {0: 1, 1: True}])
+        assert_equal([0, 1, 1, 3], index.indptr.tolist())
+        assert_equal([0, 2], index.features_with(0, 1).tolist())
+
+    def test_names(self):
+        index = AttributeIndex.from_feature_table(
+            decode_feature_table({"Layer features": testFeatures}))
+        assert_equal([0, 4], index.features_with_name(testInfo, ".string", "bar").tolist())
+        assert_equal([0, 4, 5], index.features_with_name(testInfo, ".string").tolist())
+        assert_equal([], index.features_with_name(testInfo, ".string", "baz").tolist())
+        assert_equal([], index.features_with_name(testInfo, ".nonexistent").tolist())
+        assert_equal({".smd": 0, ".string": 1}, testInfo.apply(index.attributes(0)))
+        assert_true(testInfo.apply(index.attributes(0)) is testInfo.apply(index.attributes(4)))
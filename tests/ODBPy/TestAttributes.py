@@ -9,3 +9,26 @@ class TestAttributes(object):
             "P -30.9595 3.8107 0 P 0 8 0;0=0,2=0"))
         assert_equal({}, parse_attributes_from_line(
             "P -30.9595 3.8107 0 P 0 8 0"))
+
+    def test_intern_attributes(self):
+        attrs = intern_attributes("0=0,2=0")
+        assert_equal({0: 0, 2: 0}, attrs)
+        assert_true(attrs is intern_attributes("0=0,2=0"))
+        assert_equal(hash(attrs), hash(FrozenAttributes({2: 0, 0: 0})))
+        assert_equal({}, empty_attributes)
+
+    @raises(TypeError)
+    def test_frozen(self):
+        intern_attributes("0=0")[1] = 2
+
+    def test_frozen_ior(self):
+        attrs = intern_attributes("0=1")
+        try:
+            attrs |= {"x": 1}
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("|= modified FrozenAttributes")
+        assert_equal({0: 1}, intern_attributes("0=1"))
+        # | creates a new dict
+        assert_equal({0: 1, "x": 1}, attrs | {"x": 1})
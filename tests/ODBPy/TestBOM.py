@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal
+from ODBPy.BOM import *
+from ODBPy.ComponentTable import decode_component_table
+
+testComponents = {
+    "CMP 0": ["CMP 0 0 0 0 N R10 RES", "PRP Name 'RC0603'", "PRP Value '10k'"],
+    "CMP 1": ["CMP 0 0 0 0 N C1 CAP", "PRP Name 'GRM188'", "PRP Value '100n'"],
+    "CMP 2": ["CMP 0 0 0 0 N R2 RES", "PRP Name 'RC0603'", "PRP Value '10k'"],
+    "CMP 3": ["CMP 0 0 0 0 N R1 RES", "PRP Name 'RC0603'", "PRP Value '1k'"],
+    "CMP 4": ["CMP 0 0 0 0 N TP1 TESTPOINT"]
+}
+
+def _table():
+    return decode_component_table(testComponents)
+
+class TestBOM(object):
+    def test_build_bom(self):
+        bom = build_bom(_table())
+        assert_equal([("RC0603", "10k"), ("GRM188", "100n"), ("RC0603", "1k"), ("", "")],
+                     [line.key for line in bom])
+        assert_equal([2, 1, 1, 1], [line.quantity for line in bom])
+        assert_equal(["R2", "R10"], bom[0].references)
+        assert_equal("R2, R10", bom[0].designators)
+
+    def test_keys(self):
+        bom = build_bom(_table(), keys=(part_name_key,))
+        assert_equal([(("RES",), 3), (("CAP",), 1), (("TESTPOINT",), 1)],
+                     [(line.key, line.quantity) for line in bom])
+        # Components tuples give the same result
+        assert_equal(bom, build_bom(_table().to_components(), keys=(part_name_key,)))
+
+    def test_rows(self):
+        rows = list(bom_rows(build_bom(_table(), keys=("Name",)), keys=("Name",)))
+        assert_equal(["Name", "Quantity", "References"], rows[0])
+        assert_equal(["RC0603", 3, "R1, R2, R10"], rows[1])
+        assert_equal(5, len(list(bom_rows(build_bom(_table())))))
+
+    def test_natural_sort_key(self):
+        assert_equal(["C1", "R1", "R2", "R10", "R10A"],
+                     sorted(["R10", "R1", "R10A", "C1", "R2"], key=natural_sort_key))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Cache import *
+from ODBPy.Job import ODBJob
+from ODBPy.JobSource import open_job
+from ODBPy.FeatureTable import decode_feature_table
+from .TestFeatureTable import testFeatures
+from .TestJob import testJobFiles
+from .JobFixture import JobFixture
+import os
+import os.path
+import shutil
+import tempfile
+
+_job = JobFixture(testJobFiles)
+_cache = {}
+
+def setup_module():
+    _job.setup()
+    _cache["dir"] = tempfile.mkdtemp()
+
+def teardown_module():
+    _job.teardown()
+    shutil.rmtree(_cache["dir"])
+
+def _cached_keys(cache):
+    keys = []
+    for name in os.listdir(cache.directory):
+        key = os.path.splitext(name)[0]
+        try:
+            cache.load(key)
+            keys.append(key)
+        except KeyError:
+            pass
+    return keys
+
+class TestParseCache(object):
+    def setup_cache(self, **kwargs):
+        cachedir = os.path.join(_cache["dir"], str(len(os.listdir(_cache["dir"]))))
+        return ParseCache(cachedir, **kwargs)
+
+    def test_roundtrip(self):
+        cache = self.setup_cache()
+        table = decode_feature_table({"Layer features": testFeatures})
+        cache.store("features-x", table)
+        cache.store("profile-x", {"a": [1, 2]})
+        loaded = cache.load("features-x")
+        assert_equal(table.pads.tolist(), loaded.pads.tolist())
+        assert_equal(table.attributes, loaded.attributes)
+        assert_equal(list(table.features()), list(loaded.features()))
+        assert_equal({"a": [1, 2]}, cache.load("profile-x"))
+
+    @raises(KeyError)
+    def test_miss(self):
+        self.setup_cache().load("features-nonexistent")
+
+    def test_corrupt(self):
+        cache = self.setup_cache()
+        with open(os.path.join(cache.directory, "profile-x.pickle"), "wb") as fout:
+            fout.write(b"garbage")
+        assert_true("profile-x" not in _cached_keys(cache))
+        assert_equal([], os.listdir(cache.directory))
+
+    def test_key(self):
+        cache = self.setup_cache()
+        source = open_job(_job.dir)
+        key = cache.key(source, ["steps/pcb/profile"], "profile")
+        assert_equal(key, cache.key(source, ["steps/pcb/profile"], "profile"))
+        assert_false(key == cache.key(source, ["matrix/matrix"], "profile"))
+        assert_true(key.startswith("profile-"))
+        hashing = self.setup_cache(hash_content=True)
+        assert_false(key == hashing.key(source, ["steps/pcb/profile"], "profile"))
+
+    def test_evict(self):
+        cache = self.setup_cache(max_size=2500)
+        for i in range(5):
+            cache.store("profile-{}".format(i), b"x" * 1000)
+            os.utime(os.path.join(cache.directory, "profile-{}.pickle".format(i)), (i, i))
+        assert_true(cache.size <= 2500)
+        assert_equal(["profile-3.pickle", "profile-4.pickle"], sorted(os.listdir(cache.directory)))
+        cache.clear()
+        assert_equal(0, cache.size)
+
+    def test_job(self):
+        cache = self.setup_cache()
+        job = ODBJob(_job.dir, cache=cache)
+        profile = job.profile
+        top = job.features["top"]
+        assert_equal(2, len(os.listdir(cache.directory)))
+        job = ODBJob(_job.dir, cache=cache)
+        assert_equal(profile, job.profile)
+        assert_equal(top.pads.tolist(), job.features["top"].pads.tolist())
+        assert_equal(2, len(os.listdir(cache.directory)))
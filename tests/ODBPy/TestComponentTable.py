@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, raises
+from io import StringIO
+from ODBPy.ComponentTable import *
+from ODBPy.ComponentParser import parse_components
+from ODBPy.Components import read_components
+from ODBPy.LineRecordParser import iter_linerecords, read_linerecords
+from ODBPy.NetlistParser import NetSide
+from ODBPy.Compression import lzw_compress
+from ODBPy.Structures import Mirror
+from .JobFixture import JobFixture
+
+testComponents = """UNITS=MM
+#
+#Component attribute names
+#
+@0 .comp_height
+#
+# CMP 0
+CMP 0 10.5 20 90 N R1 10k ;0=2
+PRP Value '10k'
+PRP Tolerance '1%'
+TOP 0 10 20 90 N 3 0 1
+TOP 1 11 20 90 N 4 0 2
+#
+# CMP 1
+CMP 1 0 0 0 M U1 LM358
+TOP 0 -1 -1 0 M 5 1 A1
+#
+# CMP 2
+CMP 2 5 5 0 N C1 100n
+"""
+
+testBottomComponents = """#
+# CMP 0
+CMP 0 1 2 180 M R2 1k
+TOP 0 1 2.5 180 M 3 0 1
+"""
+
+_job = JobFixture({
+    component_paths[side]: lzw_compress(text.encode("ascii"))
+    for side, text in [(NetSide.Top, testComponents), (NetSide.Bottom, testBottomComponents)]
+})
+setup_module = _job.setup
+teardown_module = _job.teardown
+
+class TestComponentTable(object):
+    def test_decode(self):
+        table = decode_component_table(iter_linerecords(StringIO(testComponents)))
+        assert_equal(3, len(table))
+        assert_equal(["R1", "U1", "C1"], table.names)
+        assert_equal([0, 2, 3], table.components["toeprint_start"].tolist())
+        assert_equal([2, 3, 3], table.components["toeprint_end"].tolist())
+        assert_equal([0, 0, 1], table.toeprints["component"].tolist())
+        assert_equal([1, 2, "A1"], table.toeprint_names)
+        assert_equal({"Value": "10k", "Tolerance": "1%"}, table.properties[0])
+        assert_equal({0: 2}, table.attributes[0])
+        assert_equal(Mirror.Mirror.value, table.toeprints["mirror"][2])
+        assert_equal([10., 11.], table.component_toeprints("R1")["x"].tolist())
+
+    def test_conformance(self):
+        # The table must describe the same components as parse_components()
+        expected = parse_components(read_linerecords(StringIO(testComponents)))
+        assert_equal(["R1", "U1", "C1"], [component.name for component in expected.values()])
+        table = decode_component_table(read_linerecords(StringIO(testComponents)))
+        assert_equal(expected, {num: table.component(num) for num in range(len(table))})
+        # Section streams
+        assert_equal(expected, parse_components(iter_linerecords(StringIO(testComponents))))
+
+    def test_read_components(self):
+        components = read_components(_job.dir)
+        assert_equal(read_component_table(_job.dir).to_components(), components)
+        assert_equal(components, read_components(_job.dir, workers=1))
+
+    def test_read(self):
+        table = read_component_table(_job.dir)
+        assert_equal(["R1", "U1", "C1", "R2"], table.names)
+        assert_equal([NetSide.Top.value] * 3 + [NetSide.Bottom.value], table.components["side"].tolist())
+        assert_equal([0, 0, 1, 3], table.toeprints["component"].tolist())
+        assert_equal([0, 2, 3, 3], table.components["toeprint_start"].tolist())
+        assert_equal([2, 3, 3, 4], table.components["toeprint_end"].tolist())
+        assert_equal([2.5], table.component_toeprints("R2")["y"].tolist())
+        assert_equal([3], table.side(NetSide.Bottom).tolist())
+        sequential = read_component_table(_job.dir, workers=1)
+        assert_equal(table.names, sequential.names)
+        assert_equal(table.toeprints.tolist(), sequential.toeprints.tolist())
+
+    def test_nanometers(self):
+        table = read_component_table(_job.dir, nanometers=True)
+        assert_equal("NM", table.unit)
+        assert_equal([10500000, 0, 5000000, 25400000], table.components["x"].tolist())
+        # The bottom side has no UNITS line and therefore is in inch
+        assert_equal([63500000], table.component_toeprints("R2")["y"].tolist())
+        assert_equal([(10000000, 20000000), (11000000, 20000000), (-1000000, -1000000)],
+                     table.component_toeprints("R1")[["x", "y"]].tolist()[:2] +
+                     table.component_toeprints("U1")[["x", "y"]].tolist())
+        assert_equal("MM", decode_component_table(iter_linerecords(StringIO(testComponents))).unit)
+
+    @raises(KeyError)
+    def test_unknown_component(self):
+        decode_component_table({}).row("R1")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Compression import *
+from ODBPy.LineRecordParser import read_linerecords
+from io import BytesIO
+import gzip
+import zipfile
+
+testData = b"".join(
+    "P {0}.5 -{1}.25 {2} P 0 8 0;0=0,2={3}\n".format(i, i % 7, i % 5, i % 3).encode("ascii")
+    for i in range(3000))
+
+testLineRecords = b"#\n#Units\n#\nU MM\n\n#\n#Layer features\n#\nS P 0\n"
+
+class TestLZW(object):
+    def test_detect_compression(self):
+        assert_equal(Compression.LZW, detect_compression(b"\x1f\x9d\x90a"))
+        assert_equal(Compression.GZIP, detect_compression(b"\x1f\x8b\x08\x00"))
+        assert_equal(Compression.ZIP, detect_compression(b"PK\x03\x04"))
+        assert_equal(Compression.Plain, detect_compression(b"#\n#U"))
+
+    def test_known_stream(self):
+        # Cross-checked with gzip -d
+        assert_equal(b"abcabcabcd", lzw_decompress(
+            bytes.fromhex("1f9d9061c48c0938502019"), use_numpy=False))
+
+    def test_roundtrip(self):
+        # Small code widths exercise code widening and clear codes
+        for maxbits in [10, 12, 16]:
+            compressed = lzw_compress(testData, maxbits)
+            assert_equal(testData, lzw_decompress(compressed, use_numpy=False))
+            assert_equal(testData, lzw_decompress(compressed, use_numpy=True))
+
+    def test_incremental(self):
+        compressed = lzw_compress(testData, 10)
+        decompressor = LZWDecompressor()
+        out = b"".join(decompressor.decompress(compressed[i:i + 101])
+                       for i in range(0, len(compressed), 101))
+        assert_equal(testData, out + decompressor.flush())
+
+    def test_empty(self):
+        assert_equal(b"", lzw_decompress(lzw_compress(b"")))
+
+    @raises(ValueError)
+    def test_invalid_magic(self):
+        lzw_decompress(b"\x1f\x8b\x08\x00")
+
+    def test_open_decompressed(self):
+        assert_equal(testData, open_decompressed(BytesIO(lzw_compress(testData))).read())
+        assert_equal(testData, open_decompressed(BytesIO(gzip.compress(testData))).read())
+        assert_equal(testData, open_decompressed(BytesIO(testData)).read())
+        zipped = BytesIO()
+        with zipfile.ZipFile(zipped, "w") as thezip:
+            thezip.writestr("features", testData)
+        assert_equal(testData, open_decompressed(BytesIO(zipped.getvalue())).read())
+
+    def test_open_decompressed_borrowed(self):
+        zipped = BytesIO()
+        with zipfile.ZipFile(zipped, "w") as thezip:
+            thezip.writestr("features", testData)
+        for content in [lzw_compress(testData), gzip.compress(testData), testData, zipped.getvalue()]:
+            stream = BytesIO(content)
+            with open_decompressed(stream) as fin:
+                assert_equal(testData, fin.read())
+            # Streams passed in by the caller are not closed
+            assert_false(stream.closed)
+
+    def test_read_linerecords(self):
+        assert_equal({"Units": ["U MM"], "Layer features": ["S P 0"]},
+            read_linerecords(BytesIO(lzw_compress(testLineRecords))))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none, assert_almost_equal
+from ODBPy.CopperStats import *
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.StandardSymbols import symbol_area
+import numpy as np
+
+testLinerecords = {
+    "Feature symbol names": ["$0 r1000", "$1 s1000", "$2 r2000x1000"],
+    "Layer features": [
+        "P 0 0 0 P 0 8 0", "L 2 0 5 0 0 P 0", "L 2 3 5 3 1 P 0", "P 8 0 2 P 0 8 90",
+        # 4x4 square with a 2x2 hole
+        "S P 0", "OB 0 5 I", "OS 4 5", "OS 4 9", "OS 0 9", "OS 0 5", "OE",
+        "OB 1 6 H", "OS 3 6", "OS 3 8", "OS 1 8", "OS 1 6", "OE", "SE",
+        # Half circle with radius 1
+        "S P 0", "OB 6 5 I", "OC 8 5 7 5 Y", "OS 6 5", "OE", "SE"]
+}
+
+class TestCopperStats(object):
+    def test_symbol_area(self):
+        assert_almost_equal(np.pi * 25, symbol_area("r10"))
+        assert_equal(100., symbol_area("s10"))
+        assert_almost_equal(20 * 10 - (4 - np.pi) * 25, symbol_area("oval20x10"))
+        assert_almost_equal(np.pi * (25 - 4), symbol_area("donut_r10x4"))
+        assert_is_none(symbol_area("myuser"))
+
+    def test_feature_areas(self):
+        table = decode_feature_table(testLinerecords)
+        areas = feature_areas(table)
+        # Pads, lines, surfaces
+        assert_true(np.allclose([np.pi / 4, 2., 3 + np.pi / 4, 4., 12., np.pi / 2], areas))
+
+    def test_methods(self):
+        table = decode_feature_table(testLinerecords)
+        exact = copper_stats(table, method="exact")
+        raster = copper_stats(table, method="raster", resolution=0.01)
+        assert_equal("exact", copper_stats(table).method) # No overlaps
+        assert_almost_equal(np.pi + 2 + 3 + 4 + 12, exact.copper_area)
+        assert_true(abs(exact.copper_area - raster.copper_area) < 0.05)
+        assert_almost_equal(exact.copper_area / exact.area, exact.density)
+
+    def test_overlaps(self):
+        # Two overlapping pads and a negative pad
+        table = decode_feature_table({"Feature symbol names": ["$0 s1000"], "Layer features": [
+            "P 0 0 0 P 0 8 0", "P 0.5 0 0 P 0 8 0", "P 5 0 0 P 0 8 0", "P 5 0 0 N 0 8 0"]})
+        stats = copper_stats(table, resolution=0.01)
+        assert_equal("raster", stats.method)
+        assert_true(abs(1.5 - stats.copper_area) < 0.02)
+
+    def test_touching(self):
+        # Pads that only share an edge in x or y don't overlap
+        table = decode_feature_table({"Feature symbol names": ["$0 s1000"], "Layer features": [
+            "P 0 0 0 P 0 8 0", "P 1 0 0 P 0 8 0", "P 0 1 0 P 0 8 0"]})
+        stats = copper_stats(table)
+        assert_equal("exact", stats.method)
+        assert_almost_equal(3., stats.copper_area)
+
+    def test_grid(self):
+        table = decode_feature_table(testLinerecords)
+        for method in ["exact", "raster"]:
+            stats = copper_stats(table, grid=(2, 3), bounds=(0, -2, 12, 10), method=method,
+                                 resolution=0.02)
+            assert_equal((2, 3), stats.cell_copper_areas.shape)
+            assert_true(np.allclose(24., stats.cell_areas))
+            assert_almost_equal(stats.copper_area, stats.cell_copper_areas.sum())
+            # The square with the hole is in the top left cell
+            assert_true(abs(12. - stats.cell_copper_areas[0, 0]) < 0.1)
+            assert_equal(0., stats.cell_densities[0, 2])
+
+    def test_all(self):
+        tables = {"top": decode_feature_table(testLinerecords),
+                  "empty": decode_feature_table({"Layer features": []})}
+        for workers in [1, 2]:
+            stats = copper_stats_all(tables, workers=workers, method="exact")
+            assert_equal(["top", "empty"], list(stats.keys()))
+            assert_equal(0., stats["empty"].copper_area)
+            assert_almost_equal(copper_stats(tables["top"]).copper_area, stats["top"].copper_area)
+
+    def test_nanometers(self):
+        linerecords = dict(testLinerecords, Units=["U MM"])
+        table = decode_feature_table(linerecords)
+        nm_table = decode_feature_table(linerecords, nanometers=True)
+        assert_equal(1000, nm_table.symbol_scale)
+        assert_true(np.allclose(np.array(table.extent()) * 1e6, nm_table.extent()))
+        for method in ["exact", "raster"]:
+            expected = copper_stats(table, grid=(2, 2), method=method)
+            actual = copper_stats(nm_table, grid=(2, 2), method=method)
+            assert_almost_equal(expected.copper_area, actual.copper_area / 1e12)
+            assert_true(np.allclose(expected.cell_copper_areas * 1e12, actual.cell_copper_areas))
+
+    @raises(ValueError)
+    def test_invalid_method(self):
+        copper_stats(decode_feature_table(testLinerecords), method="foo")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Decoder import *
+from ODBPy.SurfaceParser import *
+from ODBPy.PolygonParser import *
+from ODBPy.NetlistParser import netlist_decoder_options
+
+testLines = ["S P 0", "OB -38.104 -0.6351 I", "OS -38.104 19.3649",
+             "OC 0 1 2 3 Y", "OE", "SE", "OE 1", "SB P 1 2", "", "X 1 2",
+             "S\tN 1;3=5", "OS 22.5", "10 0.0236 0.45 -1.2916 B e e staggered 0 0 0"]
+
+class TestCompiledDecoder(object):
+    def test_dispatch_tokens(self):
+        decoder = CompiledDecoder(surface_decoder_options + polygon_decoder_options)
+        assert_equal({"S", "SE", "OB", "OS", "OC", "OE"}, set(decoder._dispatch.keys()))
+        assert_equal([], decoder._fallback)
+        # The netlist point regex has no leading token
+        decoder = CompiledDecoder(netlist_decoder_options)
+        assert_equal(netlist_decoder_options, decoder._fallback)
+
+    def test_equivalence(self):
+        opts = surface_decoder_options + polygon_decoder_options + netlist_decoder_options
+        decoder = CompiledDecoder(opts)
+        for line in testLines:
+            assert_equal(run_decoder_on_line(line, opts), run_decoder_on_line(line, decoder))
+        assert_equal([run_decoder_on_line(line, opts) for line in testLines],
+                     list(run_decoder(testLines, opts)))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.FeatureTable import *
+from ODBPy.LayerFeatureParser import *
+from ODBPy.Structures import *
+from ODBPy.SurfaceParser import Surface
+from ODBPy.PolygonParser import *
+from ODBPy.Compression import lzw_compress
+from .TestJobSource import testMatrix
+from .JobFixture import JobFixture
+import numpy as np
+import pickle
+
+testFeatures = [
+    "P -30.9595 3.8107 0 P 0 8 0;0=0,2=0", "P 1.0 2.0 0 N 4 1",
+    "L 4.8298 -44.2445 4.8298 -45.2654 14 P 0", "S P 0", "OB 1 2 I", "OS 1 3", "OE", "SE",
+    "P 1.0 2.0 -1 0 0.02 P 4 9 30.0;0=0,2=0", "A 1 2 3 4 5 6 7 P 0 Y",
+    "L 1 2 3 4 5 N 6;1=2", "P +1.0 2.0 0 P 4 8 0"]
+
+testLayerFeatures = {
+    "top": "#\n#Layer features\n#\n" + "".join(
+        "P {0} 1.5 0 P 0 8 0;0=0\n".format(i) for i in range(20)),
+    "bottom": "#\n#Layer features\n#\n" + "".join(
+        "L {0} 1.5 2 3 1 P 0\n".format(i) for i in range(50))
+}
+
+_jobFiles = {
+    "matrix/matrix": testMatrix + testMatrix.replace("ROW=1", "ROW=2").replace("TOP", "BOTTOM")
+                     + testMatrix.replace("ROW=1", "ROW=3").replace("TOP", "DRILL")
+}
+_jobFiles.update(
+    ("steps/pcb/layers/{}/features.Z".format(layer), lzw_compress(content.encode("ascii")))
+    for layer, content in testLayerFeatures.items())
+
+_job = JobFixture(_jobFiles)
+setup_module = _job.setup
+teardown_module = _job.teardown
+
+class TestFeatureTable(object):
+    def test_decode(self):
+        table = decode_feature_table({"Layer features": testFeatures})
+        assert_equal(3, len(table.pads))
+        assert_equal(2, len(table.lines))
+        assert_equal([0, 1, 4], table.pads["index"].tolist())
+        assert_equal([2, 6], table.lines["index"].tolist())
+        # Identical attribute strings are stored once
+        assert_equal(["0=0,2=0", "1=2"], table.attributes)
+        assert_equal([0, -1, 0], table.pads["attributes"].tolist())
+
+    def test_objects(self):
+        table = decode_feature_table({"Layer features": testFeatures})
+        expected = [f for f in decode_features({"Layer features": testFeatures}) if f is not None]
+        assert_equal(expected, [f for f in table.features() if not isinstance(f, Surface)])
+        assert_equal(expected[3], table.pad(2))
+        assert_equal(Line(Point(1., 2.), Point(3., 4.), SymbolReference(5, 1.0),
+                          Polarity.Negative, 6, {1: 2}), table.line(1))
+
+    def test_surfaces(self):
+        table = decode_feature_table({"Layer features": testFeatures + [
+            "S N 1;0=0,2=0", "OB 0 0 I", "OS 2 0", "OC 0 0 1 0 N", "OE",
+            "OB 0.5 0 H", "OS 1 0", "OE", "SE"]})
+        assert_equal([3, 8], table.surfaces["index"].tolist())
+        assert_equal([(0, 1), (1, 3)], table.surfaces[["polygon_start", "polygon_end"]].tolist())
+        surface = table.surface(1)
+        assert_equal(Surface(Polarity.Negative, 1, [
+            Polygon(PolygonType.Island, [
+                PolygonSegment(Point(0., 0.), Point(2., 0.)),
+                PolygonCircle(Point(2., 0.), Point(0., 0.), Point(1., 0.), CircleDirection.CounterClockwise)]),
+            Polygon(PolygonType.Hole, [PolygonSegment(Point(.5, 0.), Point(1., 0.))])
+        ], {0: 0, 2: 0}), surface)
+        # Half circle above the segment
+        assert_equal((0., 0., 2., 1.), tuple(table.surfaces[1][["minx", "miny", "maxx", "maxy"]].tolist()))
+        assert_equal(surface.bbox(), tuple(table.surfaces[1][["minx", "miny", "maxx", "maxy"]].tolist()))
+        assert_equal(surface, list(table.features())[-1])
+        # Arrays round trip
+        restored = FeatureTable.from_arrays(table.to_arrays())
+        assert_equal(surface, restored.surface(1))
+
+    def test_extent(self):
+        table = decode_feature_table({"Layer features": [
+            "L 0 0 10 5 0 P 0", "S P 0", "OB 0 0 I", "OS 0 -3", "OS 1 -3", "OE", "SE"],
+            "Feature symbol names": ["$0 r1000"]})
+        assert_equal((-0.5, -3., 10.5, 5.5), table.extent())
+        assert_true(table.extent() is table.extent()) # Cached
+        assert_true(table.tessellation(0.01) is table.tessellation(0.01))
+        # The caches survive pickling (process pools) and start empty for restored tables
+        assert_equal(table.extent(), pickle.loads(pickle.dumps(table)).extent())
+        restored = FeatureTable.from_arrays(table.to_arrays())
+        assert_equal({}, restored._extents)
+        assert_equal(table.extent(), restored.extent())
+        assert_is_none(decode_feature_table({"Layer features": []}).extent())
+
+    def test_chunks(self):
+        lines = ["P {} 0 0 P 0 8 0".format(i) for i in range(10)]
+        table = decode_feature_table({"Layer features": lines}, chunksize=3)
+        assert_equal(list(range(10)), table.pads["x"].tolist())
+
+    def test_empty(self):
+        table = decode_feature_table({"Layer features": []})
+        assert_equal(0, len(table))
+        assert_equal([], list(table.features()))
+
+    def test_nanometers(self):
+        table = decode_feature_table({"Units": ["U MM"], "Layer features": [
+            "P -30.9595 3.8107 0 P 0 8 0", "L 0.1 0.2 0.3 0.7 1 P 0", "S P 0", "OB 0 0 I",
+            "OS 0.001 0", "OC 0 0 0.0005 0 Y", "OE", "SE"]}, nanometers=True)
+        assert_equal("NM", table.unit)
+        assert_equal(np.int64, table.pads["x"].dtype)
+        assert_equal([(-30959500, 3810700)], table.pads[["x", "y"]].tolist())
+        assert_equal([(100000, 200000, 300000, 700000)],
+                     table.lines[["xs", "ys", "xe", "ye"]].tolist())
+        # Exact, unlike 0.1 + 0.2 == 0.3
+        assert_equal(table.lines["xe"][0], table.lines["xs"][0] + table.lines["ys"][0])
+        assert_equal([(0, 0, 1000, 0, 0, 0), (1000, 0, 0, 0, 500, 0)],
+                     table.steps[["xs", "ys", "xe", "ye", "xc", "yc"]].tolist())
+        # The bounding boxes stay float (in nanometers)
+        assert_equal((0., -500., 1000., 0.),
+                     tuple(table.surfaces[0][["minx", "miny", "maxx", "maxy"]].tolist()))
+        # Files without unit line are in inch
+        table = decode_feature_table({"Layer features": ["P 1 0.5 0 P 0 8 0"]}, nanometers=True)
+        assert_equal([(25400000, 12700000)], table.pads[["x", "y"]].tolist())
+        assert_equal(np.int64, decode_feature_table({"Layer features": []}, nanometers=True).lines["xs"].dtype)
+
+    def test_nanometer_symbols(self):
+        # Symbol sizes stay in micron (mm files) or mil (inch files)
+        linerecords = {"Units": ["U MM"], "Feature symbol names": ["$0 r1000"],
+                       "Layer features": ["P 0 0 0 P 0 8 0", "P 10 0 0 P 0 8 0"]}
+        table = decode_feature_table(linerecords, nanometers=True)
+        assert_equal(("NM", "MM", 1000), (table.unit, table.source_unit, table.symbol_scale))
+        assert_equal((-500000., -500000., 10500000., 500000.), table.extent())
+        assert_equal((-0.5, -0.5, 10.5, 0.5), decode_feature_table(linerecords).extent())
+        restored = FeatureTable.from_arrays(table.to_arrays())
+        assert_equal("MM", restored.source_unit)
+        del linerecords["Units"]
+        assert_equal(25400, decode_feature_table(linerecords, nanometers=True).symbol_scale)
+
+    def test_read_all_layer_features(self):
+        for workers in [1, 2]:
+            tables = read_all_layer_features(_job.dir, workers=workers)
+            assert_equal(["top", "bottom"], list(tables.keys())) # "drill" has no features
+            assert_equal(20, len(tables["top"].pads))
+            assert_equal(50, len(tables["bottom"].lines))
+        tables = read_all_layer_features(_job.dir, ["bottom"], workers=2)
+        assert_equal(["bottom"], list(tables.keys()))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Geometry import *
+from ODBPy.PolygonParser import *
+from ODBPy.SurfaceParser import *
+from ODBPy.Profile import Profile
+from ODBPy.Structures import *
+import numpy as np
+
+def _bbox(*step):
+    return tuple(np.round([arr[0] for arr in steps_bbox(*([v] for v in step))], 9).tolist())
+
+class TestGeometry(object):
+    def test_segment_bbox(self):
+        assert_equal((1., -2., 3., 4.), _bbox(3, -2, 1, 4, 0, 0, step_segment))
+
+    def test_arc_bbox(self):
+        # Counterclockwise half circle from (1, 0) to (-1, 0) passes (0, 1)
+        assert_equal((-1., 0., 1., 1.), _bbox(1, 0, -1, 0, 0, 0, step_arc_ccw))
+        # Clockwise half circle from (1, 0) to (-1, 0) passes (0, -1)
+        assert_equal((-1., -1., 1., 0.), _bbox(1, 0, -1, 0, 0, 0, step_arc_cw))
+        # Quarter circle
+        assert_equal((0., 0., 1., 1.), _bbox(1, 0, 0, 1, 0, 0, step_arc_ccw))
+        # Full circle
+        assert_equal((1., 1., 5., 5.), _bbox(5, 3, 5, 3, 3, 3, step_arc_cw))
+
+    def test_arc_angles(self):
+        radius, angle0, sweep = arc_angles(np.array([0.]), np.array([2.]), np.array([2.]),
+                                           np.array([0.]), np.array([0.]), np.array([0.]),
+                                           np.array([step_arc_cw]))
+        assert_equal([2.], radius.tolist())
+        assert_equal([0.], angle0.tolist())
+        assert_equal([np.pi / 2], sweep.tolist())
+
+    def test_polygon_bbox(self):
+        polygon = Polygon(PolygonType.Island, [
+            PolygonSegment(Point(0, 0), Point(2, 0)),
+            PolygonCircle(Point(2, 0), Point(0, 0), Point(1, 0), CircleDirection.CounterClockwise)])
+        assert_equal((0., 0., 2., 1.), polygon.bbox())
+        assert_equal(Point(0., 0.), polygon.min())
+        assert_equal(Point(2., 1.), polygon.max())
+        assert_true(polygon.bbox() is polygon.bbox()) # Cached
+        assert_is_none(Polygon(PolygonType.Island, []).bbox())
+        surface = Surface(Polarity.Positive, 0, [polygon, Polygon(PolygonType.Island, [
+            PolygonSegment(Point(-1, 3), Point(0, 3))])], {})
+        assert_equal((-1., 0., 2., 3.), surface.bbox())
+        assert_equal((-1., 0., 2., 3.), Profile("MM", [surface]).bbox())
+        assert_is_none(Profile("MM", []).bbox())
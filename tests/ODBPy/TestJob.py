@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Job import *
+from ODBPy.JobSource import open_job
+from .TestFeatureTable import testLayerFeatures
+from .TestJobSource import testMatrix
+from .TestProfile import testProfile
+from ODBPy.Compression import lzw_compress
+from .JobFixture import JobFixture
+import os
+import os.path
+
+testJobFiles = {
+    "matrix/matrix": testMatrix + testMatrix.replace("ROW=1", "ROW=2").replace("TOP", "BOTTOM"),
+    "steps/pcb/profile": testProfile
+}
+testJobFiles.update(
+    ("steps/pcb/layers/{}/features.Z".format(layer), lzw_compress(content.encode("ascii")))
+    for layer, content in testLayerFeatures.items())
+
+_job = JobFixture(testJobFiles, archives=["tgz", "zip"])
+setup_module = _job.setup
+teardown_module = _job.teardown
+
+class TestODBJob(object):
+    def test_lazy(self):
+        job = ODBJob(_job.dir)
+        assert_equal([], job.loaded)
+        layers = job.layers
+        assert_equal(["top", "bottom"], [layer.name for layer in layers])
+        assert_true(job.layers is layers)
+        assert_equal(["layers", "matrix"], job.loaded)
+        assert_equal(["top", "bottom"], list(job.features))
+        assert_equal(20, len(job.features["top"].pads))
+        assert_true(job.features["top"] is job.features["top"])
+        job.invalidate("matrix")
+        assert_equal([], job.loaded)
+        assert_false(job.layers is layers)
+
+    def test_archive(self):
+        with ODBJob(_job.tgz) as job:
+            assert_equal(50, len(job.features["bottom"].lines))
+            assert_equal(1, len(job.profile.surfaces))
+
+    def test_memory_budget(self):
+        job = ODBJob(_job.dir, memory_budget=2000)
+        job.features["top"]
+        job.features["bottom"]
+        assert_equal(["bottom"], job.features.cached)
+        job.memory_budget = None
+        job.features["top"]
+        assert_equal(["bottom", "top"], job.features.cached)
+
+    def test_refresh(self):
+        job = ODBJob(_job.dir)
+        job.profile
+        job.features["top"]
+        job.features["bottom"]
+        job.refresh()
+        assert_equal(["profile"], job.loaded)
+        path = os.path.join(_job.dir, "steps", "pcb", "layers", "top", "features.Z")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        job.refresh()
+        assert_equal(["bottom"], job.features.cached)
+        assert_equal(["profile"], job.loaded)
+
+    def test_borrowed_source(self):
+        with open_job(_job.zip) as source:
+            with ODBJob(source) as job:
+                assert_equal(1, len(job.profile.surfaces))
+            # Still usable after the job was closed
+            assert_true(source.exists("matrix/matrix"))
+            assert_equal(50, len(ODBJob(source).features["bottom"].lines))
+
+    @raises(KeyError)
+    def test_missing_layer(self):
+        ODBJob(_job.dir).features["nonexistent"]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.JobSource import *
+from ODBPy.Layers import read_layers, read_layer_features
+from ODBPy.Profile import read_profile
+from ODBPy.Compression import lzw_compress
+from .TestProfile import testProfile
+from .JobFixture import JobFixture
+import os.path
+from concurrent.futures import ThreadPoolExecutor
+
+testMatrix = """
+STEP {
+    COL=1
+    NAME=PCB
+}
+
+LAYER {
+    ROW=1
+    CONTEXT=BOARD
+    TYPE=SIGNAL
+    NAME=TOP
+    POLARITY=POSITIVE
+    START_NAME=
+    END_NAME=
+}
+"""
+
+testFeatures = "#\n#Units\n#\nU MM\n#\n#Layer features\n#\n" + \
+    "".join("P {0} 1.5 0 P 0 8 0;0=0\n".format(i) for i in range(2000))
+
+testJobFiles = {
+    "matrix/matrix": testMatrix.encode("ascii"),
+    "steps/pcb/profile": testProfile.encode("ascii"),
+    "steps/pcb/layers/top/features.Z": lzw_compress(testFeatures.encode("ascii"))
+}
+
+_job = JobFixture(testJobFiles, archives=["tgz", "zip"])
+setup_module = _job.setup
+teardown_module = _job.teardown
+
+class TestJobSource(object):
+    def test_open_job(self):
+        assert_true(isinstance(open_job(_job.dir), DirectoryJobSource))
+        assert_true(isinstance(open_job(_job.tgz), TarJobSource))
+        assert_true(isinstance(open_job(_job.zip), ZipJobSource))
+        job = open_job(_job.zip)
+        assert_true(open_job(job) is job)
+
+    def test_members(self):
+        for path in [_job.dir, _job.tgz, _job.zip]:
+            job = open_job(path)
+            assert_equal(sorted(testJobFiles.keys()), sorted(job.names()))
+            assert_equal(["layers", "profile"], job.listdir("steps/pcb"))
+            assert_true(job.exists("matrix/matrix"))
+            assert_false(job.exists("matrix"))
+            # Random access in arbitrary order
+            for name in ["steps/pcb/profile", "matrix/matrix", "steps/pcb/profile"]:
+                with job.open(name) as fin:
+                    assert_equal(testJobFiles[name], fin.read())
+
+    def test_index_cache(self):
+        TarJobSource(_job.tgz)
+        assert_true(os.path.isfile(_job.tgz + ".odbindex"))
+        job = TarJobSource(_job.tgz)
+        assert_equal(testJobFiles["matrix/matrix"], job.open("matrix/matrix").read())
+
+    def test_concurrent_gzip(self):
+        job = TarJobSource(_job.tgz)
+        job._gzip_index.spacing = 512 # Many checkpoints
+        names = sorted(testJobFiles.keys()) * 8
+        def read(name):
+            with job.open(name) as fin:
+                return fin.read()
+        with ThreadPoolExecutor(4) as executor:
+            contents = list(executor.map(read, names))
+        assert_equal([testJobFiles[name] for name in names], contents)
+        index = job._gzip_index
+        assert_equal(sorted(index._upos), index._upos)
+        assert_equal(index._upos, [checkpoint.upos for checkpoint in index.checkpoints])
+
+    def test_readers(self):
+        expected_layers = read_layers(_job.dir)
+        expected_profile = read_profile(_job.dir)
+        expected_features = read_layer_features(_job.dir, "top")
+        assert_equal(1, len(expected_layers))
+        assert_equal(2000, len(expected_features["Layer features"]))
+        for path in [_job.tgz, _job.zip]:
+            assert_equal(expected_layers, read_layers(path))
+            assert_equal(expected_profile, read_profile(path))
+            assert_equal(expected_features, read_layer_features(path, "top"))
+
+    def test_job_source(self):
+        with job_source(_job.zip) as job:
+            assert_true(job.exists("matrix/matrix"))
+        assert_is_none(job._zip.fp) # Closed
+        with ZipJobSource(_job.zip) as owned:
+            with job_source(owned) as job:
+                assert_true(job is owned)
+            # Sources passed in by the caller stay open
+            assert_equal(testJobFiles["matrix/matrix"], owned.open("matrix/matrix").read())
+
+    @raises(FileNotFoundError)
+    def test_missing_member(self):
+        open_job(_job.tgz).open("steps/pcb/netlists/cadnet/netlist")
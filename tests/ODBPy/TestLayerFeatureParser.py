@@ -4,6 +4,7 @@ from nose.tools import assert_equal, assert_true, assert_false, raises, assert_i
 from ODBPy.LayerFeatureParser import *
 from ODBPy.Structures import *
 from ODBPy.Decoder import *
+from ODBPy.LayerFeatureParser import _tokenize_pad, _tokenize_line
 
 class TestPadParsing(object):
     def _parse_pad(self, s):
@@ -53,3 +54,30 @@ class TestLineParsing(object):
             SymbolReference(14, 1.0), Polarity.Positive, 0, {0:0, 2:0})
         assert_equal(expected, self._parse_line("L 4.8298 -44.2445 4.8298 -45.2654 14 P 0;0=0,2=0"))
 
+
+# Valid, unusual and malformed records for comparing the regex and the fast path
+conformanceLines = [
+    "P -30.9595 3.8107 0 P 0 8 0;0=0,2=0", "P 1.0 2.0 0 P 4 1", "P 1.0 2.0 0 N 4 7",
+    "P 1.0 2.0 -1 0 0.02 P 4 8 30.0", "P 1.0 2.0 -1 0 0.02 P 4 9 -30;1,2=3",
+    "P 1.0 2.0 0 P 4 0", "P 1.0 2.0 0 X 4 8 0", "P 1.0 2.0 0 P 4 8", "P 1.0 2.0 0 P 4 8 0 1",
+    "P 1.0 2.0 0 P 4 8 0 ;1", "P 1.0 2.0 0 P 4 8 0;", "P 1.0 2.0 0 P 4 8 0 ", "P 1e3 2.0 0 P 4 8 0",
+    "P +1.0 2.0 0 P 4 8 0", "P 1.0 2.0 -2 P 4 8 0", "P 1.0 2.0 0 P -4 8 0", "P\t1.0\t2.0 0 P 4 8 0",
+    "P 1.0 2.0 0 P 4 8 0; 1", "P", "P 1.0", "P 1.0 2.0 -1 0 0.02 P 4 3", "P 1.0 2.0 -2 0 0.02 P 4 3",
+    "P 1.0 2.0 -2 0 0.02 P 4 8 1",
+    "L 4.8298 -44.2445 4.8298 -45.2654 14 P 0", "L 4.8298 -44.2445 4.8298 -45.2654 14 P 0;0=0,2=0",
+    "L 1 2 3 4 5 N 6", "L 1 2 3 4 5 Q 6", "L 1 2 3 4 5 P 6 7", "L 1 2 3 4 5 P", "L 1 2 3 4 +5 P 6",
+    "L 1 2 3 4 5 P 6 ;1", "L 1 2 3 4 5 P 6;", "L 1 2 3 -.5 5 P 6;3=4",
+    "S P 0", "S N 12;1=2", "S P 0 ;1", "S P 0;", "S P x", "S", "A 1 2 3 4 5 6 7 P 0 Y", "SE"]
+
+class TestFastPath(object):
+    def test_conformance(self):
+        for line in conformanceLines:
+            regex = list(decode_features({"Layer features": [line]}, fast=False))
+            fast = list(decode_features({"Layer features": [line]}, fast=True))
+            assert_equal(regex, fast, line)
+
+    def test_fast_path_used(self):
+        assert_equal(("1.0", "2.0", "0", "0.02", "P", "4", 8, "30.0", None),
+                     _tokenize_pad("P 1.0 2.0 -1 0 0.02 P 4 8 30.0"))
+        assert_equal(("1", "2", "3", "4", "5", "N", "6", "1=2"), _tokenize_line("L 1 2 3 4 5 N 6;1=2"))
+        assert_is_none(_tokenize_line("L 1 2 3 4 +5 P 6"))
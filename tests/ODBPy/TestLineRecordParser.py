@@ -2,7 +2,8 @@
 # -*- coding: utf-8 -*-
 from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
 from ODBPy.LineRecordParser import *
-from io import StringIO
+from ODBPy.Compression import lzw_compress
+from io import StringIO, BytesIO
 
 testLineRecords = """
 #
@@ -21,3 +22,64 @@ class TestLineRecordParser(object):
             read_linerecords(StringIO(testLineRecords)))
         
 
+
+    def test_iter_raw_linerecords(self):
+        assert_equal(["#Units", "U MM", "#Layer features", "S P 0"],
+            list(iter_raw_linerecords(StringIO(testLineRecords))))
+
+    def test_iter_sections(self):
+        sections = [(name, list(lines)) for name, lines in
+                    iter_linerecords(StringIO(testLineRecords))]
+        assert_equal([("Units", ["U MM"]), ("Layer features", ["S P 0"])], sections)
+
+    def test_materialize_sections(self):
+        linerecords = materialize_sections(
+            iter_linerecords(StringIO(testLineRecords)), "Units")
+        assert_equal(["Units"], list(linerecords.keys()))
+        assert_equal(["U MM"], list(linerecords["Units"]))
+        # Dicts are passed through
+        linerecords = read_linerecords(StringIO(testLineRecords))
+        assert_true(materialize_sections(linerecords, "Units") is linerecords)
+
+testNetlist = """H optimize n staggered n
+#
+#Nets names
+#
+$0 GND
+$1 VCC
+#
+#Netlist points
+#
+0 0.0236 0.45 -1.2916 B e e staggered 0 0 0
+#
+1 0.0069 0.287 -1.312 B e e staggered 0 0 0 v
+"""
+
+class TestLazyLineRecords(object):
+    def test_equivalence(self):
+        for text in [testLineRecords, testNetlist]:
+            lazy = LazyLineRecords(StringIO(text))
+            assert_equal(read_linerecords(StringIO(text)), dict(lazy))
+
+    def test_header_section(self):
+        lazy = LazyLineRecords(StringIO(testNetlist))
+        assert_equal(["H optimize n staggered n"], lazy[None])
+        assert_false(None in LazyLineRecords(StringIO(testLineRecords)))
+
+    def test_cache(self):
+        lazy = LazyLineRecords(StringIO(testLineRecords))
+        assert_true(lazy["Units"] is lazy["Units"])
+        lazy.evict("Units")
+        assert_equal(["U MM"], lazy["Units"])
+        uncached = LazyLineRecords(StringIO(testLineRecords), cache=False)
+        assert_false(uncached["Units"] is uncached["Units"])
+
+    def test_stream_stays_open(self):
+        for content in [testLineRecords.encode("ascii"), lzw_compress(testLineRecords.encode("ascii"))]:
+            stream = BytesIO(content)
+            assert_equal(["U MM"], LazyLineRecords(stream)["Units"])
+            assert_false(stream.closed)
+
+    @raises(KeyError)
+    def test_missing_section(self):
+        LazyLineRecords(StringIO(testLineRecords))["Feature symbol names"]
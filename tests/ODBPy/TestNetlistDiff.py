@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises
+from io import StringIO
+from ODBPy.NetlistDiff import *
+from ODBPy.NetlistIndex import parse_netlist_index
+from ODBPy.Netlist import parse_netlist
+from ODBPy.LineRecordParser import iter_linerecords
+
+cadNetlist = """#
+#Nets names
+#
+$0 GND
+$1 VCC
+$2 A
+$3 B
+$4 C
+#
+#Netlist points
+#
+0 0.01 0 0 T e e
+0 0.01 1 0 T e e
+1 0.01 0 1 T e e
+1 0.01 1 1 T e e
+2 0.01 0 2 T e e
+2 0.01 1 2 T e e
+2 0.01 2 2 T e e
+3 0.01 0 3 T e e
+3 0.01 1 3 T e e
+4 0.01 2 3 T e e
+$NONE$ 0.01 5 5 D e e
+"""
+
+referenceNetlist = """#
+#Nets names
+#
+$0 VCC
+$1 POWER
+$2 A1
+$3 A2
+$4 B
+$5 X
+#
+#Netlist points
+#
+0 0.01 0 0 T e e
+0 0.01 1 0.00004 T e e
+1 0.01 1 1 T e e
+1 0.01 0 1 T e e
+2 0.01 0 2 T e e
+3 0.01 1 2 T e e
+3 0.01 2 2 T e e
+4 0.01 0 3 T e e
+4 0.01 1 3 T e e
+4 0.01 2 3 T e e
+5 0.01 9 9 T e e
+"""
+
+def _diff():
+    return diff_netlists(parse_netlist_index(iter_linerecords(StringIO(cadNetlist))),
+                         parse_netlist_index(iter_linerecords(StringIO(referenceNetlist))))
+
+class TestNetlistDiff(object):
+    def test_diff(self):
+        diff = _diff()
+        # GND and VCC are identical (within the tolerance), but renamed
+        assert_equal([("GND", "VCC"), ("VCC", "POWER")], sorted(diff.renamed))
+        # A is split into A1 and A2 in the reference => A shorts A1 and A2
+        assert_equal({"A": ["A1", "A2"]}, diff.shorts)
+        # B is split into B and C in the CAD netlist
+        assert_equal({"B": ["B", "C"]}, diff.opens)
+        assert_equal([], diff.first_only)
+        assert_equal(["X"], diff.second_only)
+        assert_false(diff.equivalent)
+
+    def test_matches(self):
+        diff = _diff()
+        matches = sorted(zip(diff.matches["first"].tolist(), diff.matches["second"].tolist(),
+                             diff.matches["identical"].tolist()))
+        assert_equal([(0, 0, True), (1, 1, True)], matches)
+
+    def test_equivalent(self):
+        index = parse_netlist_index(iter_linerecords(StringIO(cadNetlist)))
+        diff = diff_netlists(index, index)
+        assert_true(diff.equivalent)
+        assert_equal([], diff.renamed)
+        assert_true(diff.matches["identical"].all())
+        assert_equal(5, len(diff.matches))
+
+    def test_netlist_dict(self):
+        netlist = parse_netlist(iter_linerecords(StringIO(cadNetlist)))
+        index = parse_netlist_index(iter_linerecords(StringIO(cadNetlist)))
+        assert_true(diff_netlists(netlist, index).equivalent)
+
+    def test_net_hashes(self):
+        hashes1 = net_hashes(parse_netlist_index(iter_linerecords(StringIO(cadNetlist))))
+        hashes2 = net_hashes(parse_netlist_index(iter_linerecords(StringIO(referenceNetlist))))
+        assert_equal(hashes1[1], hashes2[1]) # Same points in a different order
+        assert_equal(5, len(hashes1))
+
+    @raises(ValueError)
+    def test_tolerance(self):
+        index = parse_netlist_index(iter_linerecords(StringIO(cadNetlist)))
+        diff_netlists(index, index, tolerance=0)
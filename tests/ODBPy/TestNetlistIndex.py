@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from io import StringIO
+from ODBPy.NetlistIndex import *
+from ODBPy.Netlist import parse_netlist
+from ODBPy.NetlistParser import NetSide, NetPointExposure
+from ODBPy import NetlistParser
+from ODBPy.LineRecordParser import iter_linerecords
+import numpy as np
+
+testNetlist = """H optimize n staggered n
+#
+#Nets names
+#
+$0 GND
+$1 VCC
+$2 SIG
+#
+#Netlist points
+#
+0 0.0236 0.45 -1.2916 B e e staggered 0 0 0
+1 0.0069 0.287 -1.312 B e e staggered 0 0 0 v n
+0 0.01 1 1 T e c n
+2 0 2 2 D 0.1 0.2 m e t b
+$NONE$ 0.01 3 3 D e e n
+-1 0.05 4 4 B e e n
+0 0.02 5 5 T e p n
+"""
+
+def _index():
+    return parse_netlist_index(iter_linerecords(StringIO(testNetlist)))
+
+class TestNetlistIndex(object):
+    def test_arrays(self):
+        index = _index()
+        assert_equal(7, len(index))
+        assert_equal([no_net, -1, 0, 1, 2], index.nets.tolist())
+        assert_equal([0, 1, 2, 5, 6, 7], index.offsets.tolist())
+        # Stable: File order within a net
+        assert_equal([0.45, 1., 5.], index.net_points("GND")["x"].tolist())
+        assert_equal([0.287], index.net_points(1)["x"].tolist())
+        assert_equal(0, len(index.net_points(5)))
+        assert_equal({no_net: 1, -1: 1, 0: 3, 1: 1, 2: 1}, index.net_sizes())
+        assert_equal("SIG", index.net_name(2))
+        assert_equal(-1, index.net_name(-1))
+
+    def test_flags(self):
+        index = _index()
+        assert_equal([1], index.points["net"][index.has_flag(flag_via)].tolist())
+        assert_equal([2], index.points["net"][index.has_flag(flag_testpoint)].tolist())
+        assert_equal([2], index.points["net"][index.has_flag(flag_midpoint)].tolist())
+        sig = index.net_points("SIG")[0]
+        assert_equal((0.1, 0.2), (sig["width"], sig["height"]))
+        assert_equal(NetSide.Bottom.value, sig["side"])
+        gnd = index.offsets[2]
+        assert_equal([NetPointExposure.SolderMaskExposed.value, NetPointExposure.SolderMaskCovered.value,
+                      NetPointExposure.SolderMaskCoveredPrimaryTop.value],
+                     index.exposure()[gnd:gnd + 3].tolist())
+        assert_equal(NetlistParser.TestpointTestSide.BothSides.value, index.testside()[index.offsets[4]])
+
+    def test_location(self):
+        index = _index()
+        assert_equal([0], index.nets_at(0.45, -1.28).tolist())
+        assert_equal([], index.nets_at(1.02, 1).tolist())
+        assert_equal([0], index.nets_at(1.02, 1, tolerance=0.02).tolist())
+        assert_equal([-1], index.points["net"][index.nearest(3.9, 4.2)].tolist())
+
+    def test_from_netlist(self):
+        netlist = parse_netlist(iter_linerecords(StringIO(testNetlist)))
+        index = NetlistIndex.from_netlist(netlist)
+        assert_equal(len(_index()), len(index))
+        for name in ["GND", "VCC", "SIG"]:
+            assert_true(np.array_equal(_index().net_points(name)[["x", "y"]],
+                                       index.net_points(name)[["x", "y"]]))
+
+    def test_arrays_roundtrip(self):
+        index = _index()
+        restored = NetlistIndex.from_arrays(index.to_arrays())
+        assert_true(np.array_equal(index.points[["net", "x", "y", "flags"]],
+                                   restored.points[["net", "x", "y", "flags"]]))
+        assert_equal(index.net_names, restored.net_names)
+        assert_equal([2], restored.nets_at(2, 2).tolist())
+
+    def test_nanometers(self):
+        # The netlist has no unit line and therefore is in inch
+        index = parse_netlist_index(iter_linerecords(StringIO(testNetlist)), nanometers=True)
+        assert_equal("NM", index.unit)
+        assert_equal(np.int64, index.points["x"].dtype)
+        assert_equal([(599440, 11430000, -32806640), (254000, 25400000, 25400000), (508000, 127000000, 127000000)],
+                     index.net_points("GND")[["radius", "x", "y"]].tolist())
+        # Points without size
+        assert_equal([(2540000, 5080000), (-1, -1)],
+                     [tuple(point[["width", "height"]]) for point in (index.net_points("SIG")[0], index.points[0])])
+        assert_equal([0], index.nets_at(11430000, -32806640).tolist())
+        assert_equal("NM", NetlistIndex.from_arrays(index.to_arrays()).unit)
+        assert_is_none(_index().unit)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_is_none
+from io import StringIO
+from ODBPy import NetlistParser
+from ODBPy.NetlistParser import _netlist_point_re, _parse_netlist_point, \
+     _fast_parse_netlist_point, assign_net_name, netlist_decoder
+from ODBPy.Netlist import parse_netlist
+from ODBPy.LineRecordParser import iter_linerecords
+
+# Netlist point lines from the test fixtures and the specification examples
+testLines = [
+    "10 0.0236 0.45 -1.2916 B e e staggered 0 0 0",
+    "9 0.0069 0.287 -1.312 B e e staggered 0 0 0 v",
+    "9 0 0.24 -1.18 T 0.0354 0.0276 e e staggered 0 0 0",
+    "0 0.0236 0.45 -1.2916 B e e staggered 0 0 0",
+    "1 0.0069 0.287 -1.312 B e e staggered 0 0 0 v n",
+    "0 0.01 1 1 T e c n",
+    "2 0 2 2 D 0.1 0.2 m e t b",
+    "$NONE$ 0.01 3 3 D e e n",
+    "-1 0.05 4 4 B e e n",
+    "0 0.02 5 5 T e p n",
+    "3 0.02 5 5 T e s",
+    "3 0.02 5 5 T e e V F T M",
+    "3 0.02 5 5 T e e v f t m eXtended foo c",
+    "3 0.02 5 5 T e e staggered 1.5 -2 0.1 f a",
+    "007 0.02 5 5 T e e",
+    "3 0.02 -.5 5. B m e",
+]
+
+# Lines the fast parser leaves to the regex
+irregularLines = [
+    "",
+    "H optimize n staggered n",
+    "3 0.02 5 5 X e e",
+    "3 0.02 5 5 T e x",
+    "3 0.02 5 5 T e e v foo",
+    "3 0.02 5 5 T e e n v",
+    "3 0.02 5 5 T e",
+    "a 0.02 5 5 T e e",
+]
+
+class TestNetlistParser(object):
+    def test_conformance(self):
+        for line in testLines:
+            assert_equal(_parse_netlist_point(_netlist_point_re.search(line)),
+                         _fast_parse_netlist_point(line), line)
+
+    def test_irregular(self):
+        for line in irregularLines:
+            assert_is_none(_fast_parse_netlist_point(line), line)
+
+    def test_flags(self):
+        # Flags at the end of the (stripped) line
+        point = _fast_parse_netlist_point("9 0.0069 0.287 -1.312 B e e staggered 0 0 0 v")
+        assert_equal(True, point.point_type.is_via)
+        point = _fast_parse_netlist_point("3 0.02 5 5 T e e v f t m eXtended foo c")
+        assert_equal((True, True, True, True, "foo", NetlistParser.TestpointTestSide.ComponentSide),
+                     tuple(point.point_type))
+        assert_equal("007", _fast_parse_netlist_point("007 0.02 5 5 T e e").netid)
+
+    def test_net_names(self):
+        netnames = {0: "GND", 1: "VCC"}
+        for line in testLines:
+            expected = assign_net_name(netnames, _parse_netlist_point(_netlist_point_re.search(line)))
+            assert_equal(expected, _fast_parse_netlist_point(line, netnames))
+
+    def test_netlist_decoder(self):
+        netnames = {3: "SIG"}
+        decoder = netlist_decoder(netnames)
+        # Fast path and regex fallback ("v foo" is left to the regex)
+        for line in ["3 0.02 5 5 T e e", "3 0.02 5 5 T e e v foo"]:
+            assert_equal("SIG", decoder.decode_line(line).netid, line)
+        assert_equal(3, netlist_decoder().decode_line("3 0.02 5 5 T e e v foo").netid)
+        assert_is_none(decoder.decode_line("a 0.02 5 5 T e e"))
+
+    def test_parse_netlist(self):
+        text = "#\n#Nets names\n#\n$0 GND\n$1 VCC\n#\n#Netlist points\n#\n" + "\n".join(testLines) + "\n"
+        netlist = parse_netlist(iter_linerecords(StringIO(text)))
+        assert_equal([0.45, 1., 5.], [point.location.x for point in netlist["GND"]])
+        assert_equal([0.287], [point.location.x for point in netlist["VCC"]])
+        assert_equal(["$NONE$"], [point.netid for point in netlist["$NONE$"]])
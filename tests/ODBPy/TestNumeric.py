@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises
+from ODBPy.Numeric import *
+import numpy as np
+
+def _reference_parse_number(s):
+    "The exception-based implementation parse_number() replaces"
+    if s.startswith("0") and len(s) != 1 and not s.startswith("0."):
+        return s
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return float(s)
+        except ValueError:
+            return s
+
+class TestNumeric(object):
+    def test_parse_number(self):
+        for value in ["0", "12", "-3", "+4", "0.5", "-0.5", "1.", ".5", "1e3", "2.5E-2",
+                      "007", "0e5", "", "-", ".", "VIA", "1x2", "12 mm", "-.e5", "R10", "-007"]:
+            expected = _reference_parse_number(value)
+            assert_equal((value, expected), (value, parse_number(value)))
+            assert_equal(type(expected), type(parse_number(value)))
+        # Not treated as numbers, unlike float()
+        assert_equal("inf", parse_number("inf"))
+        assert_equal("nan", parse_number("nan"))
+        assert_equal("1_000", parse_number("1_000"))
+
+    def test_is_number(self):
+        assert_true(is_number("-1.5"))
+        assert_true(is_number("007"))
+        assert_false(is_number("1.2.3"))
+        assert_false(is_number("P"))
+
+    def test_numeric_column(self):
+        assert_equal([1.5, -2., 0.25], numeric_column(["1.5", "-2", ".25"]).tolist())
+        assert_equal([3, -4], numeric_column(["3", "-4"], np.int32).tolist())
+        assert_equal(np.float64, numeric_column([]).dtype)
+
+    def test_numeric_records(self):
+        dtype = np.dtype([("a", np.int32), ("x", np.float64), ("kind", np.int8)])
+        records = numeric_records([("1", "-0.5", 2), (3, 1.5, "4")], dtype)
+        assert_equal([(1, -0.5, 2), (3, 1.5, 4)], records.tolist())
+        assert_equal(0, len(numeric_records([], dtype)))
+
+    @raises(ValueError)
+    def test_numeric_records_invalid(self):
+        numeric_records([("1", "1.2.3", 0)], np.dtype([("a", np.int32), ("x", np.float64), ("k", np.int8)]))
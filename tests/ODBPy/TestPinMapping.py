@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, raises
+from ODBPy.PinMapping import *
+from ODBPy.Components import Components
+from ODBPy.ComponentParser import Component, ToeprintRecord
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.NetlistParser import NetSide
+from ODBPy.Structures import Point, Mirror
+from ODBPy.Attributes import empty_attributes
+from ODBPy.JobSource import open_job
+from ODBPy.ComponentTable import component_paths
+from ODBPy.Compression import lzw_compress
+from .TestComponentTable import testComponents, testBottomComponents
+from .TestJob import testJobFiles
+from .JobFixture import JobFixture
+import numpy as np
+
+_job = JobFixture(dict(testJobFiles, **{
+    component_paths[side]: lzw_compress(text.encode("ascii"))
+    for side, text in [(NetSide.Top, testComponents), (NetSide.Bottom, testBottomComponents)]
+}), archives=["tgz"])
+setup_module = _job.setup
+teardown_module = _job.teardown
+
+topLinerecords = {
+    "Units": ["U MM"],
+    "Feature symbol names": ["$0 r1000", "$1 r2000x1000"],
+    "Layer features": [
+        "P 0 0 0 P 0 8 0", "P 5 0 1 P 0 8 0", "L 0 0 5 0 0 P 0",
+        "P 5.4 0 0 P 0 8 0", "P 10 10 0 P 0 8 0"]
+}
+
+bottomLinerecords = {
+    "Units": ["U MM"],
+    "Feature symbol names": ["$0 r1000"],
+    "Layer features": ["P 20 20 0 P 0 8 0"]
+}
+
+def _component(name, *pins):
+    toeprints = [ToeprintRecord(num, Point(x, y), 0., Mirror.No, 7, 0, str(num))
+                 for num, (x, y) in enumerate(pins)]
+    return Component(name, "part", Point(0, 0), 0., Mirror.No, empty_attributes, {}, toeprints)
+
+def _components():
+    return Components({0: _component("R1", (0, 0), (5, 0)), 1: _component("U1", (3, 3))},
+                      {0: _component("C1", (20, 20.2), (0, 0))})
+
+def _pin_map(**kwargs):
+    return map_pins(_components(), decode_feature_table(topLinerecords),
+                    decode_feature_table(bottomLinerecords), **kwargs)
+
+class TestPinMapping(object):
+    def test_toeprint_table(self):
+        names, toeprints = toeprint_table(_components())
+        assert_equal(["R1", "U1", "C1"], names)
+        assert_equal([0, 0, 1, 2, 2], toeprints["component"].tolist())
+        assert_equal([NetSide.Top.value] * 3 + [NetSide.Bottom.value] * 2, toeprints["side"].tolist())
+
+    def test_map_pins(self):
+        pin_map = _pin_map()
+        assert_equal(5, len(pin_map))
+        # R1 pin 1 sits on the rect pad (index 1) and the round pad at 5.4 (index 3)
+        assert_equal([(0, 0), (1, 1), (1, 3)], pin_map.component_pads("R1").tolist())
+        assert_equal(0, len(pin_map.component_pads("U1")))
+        # The bottom pin at (0, 0) doesn't see the top layer pads
+        assert_equal([(3, 0)], pin_map.component_pads("C1").tolist())
+        assert_equal([1, 2, 0, 1, 0], pin_map.pad_counts().tolist())
+        assert_equal(["U1", "C1"], pin_map.unmatched_components())
+        assert_equal((3., 3.), pin_map.component_toeprints("U1")[["x", "y"]].tolist()[0])
+
+    def test_tolerance(self):
+        pin_map = _pin_map(tolerance=3.)
+        assert_equal([(2, 0), (2, 1), (2, 3)], pin_map.component_pads("U1").tolist())
+
+    def test_no_layer(self):
+        pin_map = map_pins(_components())
+        assert_equal(0, len(pin_map.pin_pads))
+        assert_equal(5, len(pin_map.unmatched()))
+
+    def test_read_pin_map(self):
+        expected = read_pin_map(_job.dir)
+        assert_equal({NetSide.Top: "top", NetSide.Bottom: "bottom"}, expected.layers)
+        assert_equal(["R1", "U1", "C1", "R2"], expected.component_names)
+        # All files are read from one opened job, which stays open
+        with open_job(_job.tgz) as job:
+            pin_map = read_pin_map(job)
+            assert_equal(expected.pin_pads.tolist(), pin_map.pin_pads.tolist())
+            assert_equal(4, len(read_pin_map(job).component_names))
+
+    @raises(KeyError)
+    def test_unknown_component(self):
+        _pin_map().component_pads("X1")
@@ -46,3 +46,11 @@ class TestPolygonParser(object):
         assert_equal(PolygonEndTag(), run_decoder_on_line("OE", polygon_decoder_options))
         assert_is_none(run_decoder_on_line("OE 1", polygon_decoder_options))
 
+
+    def test_fast_path(self):
+        fast = CompiledDecoder(polygon_decoder_options, polygon_fast_paths)
+        for line in ["OB 0 0 I", "OB 3.1 -2.4 H", "OB H", "OB 1 2 X", "OB 1 2 Ix", "OS 22.5 15",
+                     "OS 22.5", "OS 1 2 3", "OS 1-2 3", "OC 0.1 1.2 2.3 3.4 N", "OC 0 0 0 0 X",
+                     "OC 0 0 0", "OE", "OS\t-1\t.5"]:
+            assert_equal(run_decoder_on_line(line, polygon_decoder_options),
+                         run_decoder_on_line(line, fast), line)
@@ -42,3 +42,8 @@ class TestProfile(object):
         actual = parse_profile(read_linerecords(StringIO(testProfile)))
         print(actual)
         assert_equal(expected, actual)
+
+    def test_parse_profile_stream(self):
+        expected = parse_profile(read_linerecords(StringIO(testProfile)))
+        actual = parse_profile(iter_linerecords(StringIO(testProfile)))
+        assert_equal(expected, actual)
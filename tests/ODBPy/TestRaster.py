@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Raster import *
+from ODBPy.FeatureTable import decode_feature_table
+import numpy as np
+
+testLinerecords = {
+    "Feature symbol names": ["$0 r1000", "$1 s1000", "$2 r2000x1000", "$3 myuser"],
+    "Layer features": [
+        "P 0 0 0 P 0 8 0", "L 2 0 5 0 0 P 0", "L 2 3 5 3 1 P 0", "P 8 0 2 P 0 8 90",
+        # Square with a square hole
+        "S P 0", "OB 0 5 I", "OS 4 5", "OS 4 9", "OS 0 9", "OS 0 5", "OE",
+        "OB 1 6 H", "OS 3 6", "OS 3 8", "OS 1 8", "OS 1 6", "OE", "SE",
+        # Full circle
+        "S P 0", "OB 6 5 I", "OC 6 5 7 5 Y", "OE", "SE",
+        "P 3.5 3 0 N 0 8 0", "P 10 10 3 P 0 8 0"]
+}
+
+def _pixel(image, x, y, minx, maxy, resolution):
+    return image[int((maxy - y) / resolution), int((x - minx) / resolution)]
+
+class TestRaster(object):
+    def test_grid(self):
+        grid = RasterGrid.from_bounds((0, 0, 10, 5), 2)
+        assert_equal((5, 3), (grid.width, grid.height))
+        assert_equal([(0, 0, 2, 2), (0, 2, 2, 2), (0, 4, 2, 1), (2, 0, 1, 2), (2, 2, 1, 2), (2, 4, 1, 1)],
+                     grid.tiles(2))
+
+    def test_render(self):
+        table = decode_feature_table(testLinerecords)
+        bounds = (-1, -2, 9, 10)
+        image = render_layer(table, 0.05, bounds, workers=1)
+        assert_equal((240, 200), image.shape)
+        pixel = lambda x, y: _pixel(image, x, y, -1, 10, 0.05)
+        # Round pad
+        assert_true(pixel(0.3, 0.3))
+        assert_false(pixel(0.45, 0.45))
+        # Round line has round caps, square line has square caps
+        assert_true(pixel(5.3, 0))
+        assert_false(pixel(5.45, 0.45))
+        assert_true(pixel(5.45, 3.45))
+        # Negative pad clears the square line
+        assert_false(pixel(3.5, 3))
+        assert_true(pixel(2.5, 3))
+        # Rectangle pad rotated by 90°
+        assert_true(pixel(8.4, 0.9))
+        assert_false(pixel(8.6, 0.))
+        # Surface with hole
+        assert_true(pixel(0.5, 5.5))
+        assert_false(pixel(2, 7))
+        # Circle surface
+        assert_true(pixel(7, 5.9))
+        assert_false(pixel(6.2, 5.8))
+        # Area of the round pad: pi * 0.5^2
+        pad = image[int(9.5 / 0.05):int(10.5 / 0.05), 10:30]
+        assert_true(abs(pad.sum() * 0.05 ** 2 - np.pi * 0.25) < 0.01)
+
+    def test_tiles(self):
+        table = decode_feature_table(testLinerecords)
+        single = render_layer(table, 0.1, workers=1)
+        assert_equal(RasterGrid.from_bounds(table.extent(), 0.1)[3:], single.shape[::-1])
+        for workers in [1, 2]:
+            tiled = render_layer(table, 0.1, tile_size=13, workers=workers, dtype=np.uint8)
+            assert_true(np.array_equal(single, tiled == 255))
+        tiles = list(iter_tiles(table, 0.1, tile_size=40, workers=1))
+        assert_equal(single.sum(), sum(tile.sum() for _, _, tile in tiles))
+        # Parallel tiles arrive as they are finished, each exactly once
+        parallel = list(iter_tiles(table, 0.1, tile_size=13, workers=2))
+        grid = RasterGrid.from_bounds(table.extent(), 0.1)
+        assert_equal(sorted(tile[:2] for tile in grid.tiles(13)),
+                     sorted((row0, col0) for row0, col0, _ in parallel))
+        # Stopping early cancels the remaining tiles
+        tiles = iter_tiles(table, 0.1, tile_size=13, workers=2)
+        next(tiles)
+        tiles.close()
+
+    def test_empty(self):
+        table = decode_feature_table({"Layer features": []})
+        assert_equal((0, 0), render_layer(table, 0.1).shape)
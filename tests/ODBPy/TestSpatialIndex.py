@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.SpatialIndex import *
+from ODBPy.FeatureTable import decode_feature_table
+from ODBPy.StandardSymbols import symbol_size
+import io
+import numpy as np
+
+testLinerecords = {
+    "Units": ["U MM"],
+    "Feature symbol names": ["$0 r1000", "$1 rect2000x1000", "$2 r2000x1000", "$3 myuser"],
+    "Layer features": [
+        "P 0 0 0 P 0 8 0", "P 10 0 2 P 0 8 90", "L 0 5 10 5 0 P 0",
+        "S P 0", "OB 0 0 I", "OE", "SE", "P 20 20 3 P 0 8 0"]
+}
+
+def _brute_force(boxes, minx, miny, maxx, maxy):
+    hit = (boxes[:, 0] <= maxx) & (boxes[:, 2] >= minx) & (boxes[:, 1] <= maxy) & (boxes[:, 3] >= miny)
+    return np.nonzero(hit)[0].tolist()
+
+class TestSpatialIndex(object):
+    def test_symbol_size(self):
+        assert_equal((1000., 1000.), symbol_size("r1000"))
+        assert_equal((2000., 1000.), symbol_size("r2000x1000"))
+        assert_equal((10., 10.), symbol_size("donut_r10x5"))
+        assert_equal((10., 10.), symbol_size("donut_s10x5"))
+        assert_equal((20., 10.), symbol_size("donut_rc20x10x2"))
+        assert_equal((20., 10.), symbol_size("donut_rc20x10x2xr1"))
+        assert_equal((20., 10.), symbol_size("donut_o20x10x2"))
+        assert_equal((20., 20.), symbol_size("thr20x10x45x4x1"))
+        assert_equal((20., 20.), symbol_size("s_ths20x10x45x4x1"))
+        assert_equal((20., 10.), symbol_size("rc_ths20x10x45x4x1x1"))
+        assert_equal((20., 10.), symbol_size("rc_tho20x10x45x4x1x1xr1"))
+        assert_equal((20., 10.), symbol_size("o_ths20x10x45x4x1x1"))
+        assert_equal((20., 10.), symbol_size("oct20x10x2"))
+        assert_equal((20., 10.), symbol_size("tri20x10"))
+        assert_is_none(symbol_size("myuser"))
+
+    def test_bboxes(self):
+        ids, boxes = feature_table_bboxes(decode_feature_table(testLinerecords))
+        assert_equal([0, 1, 4, 2], ids.tolist())
+        assert_equal([-.5, -.5, .5, .5], boxes[0].tolist())
+        assert_equal([9.5, -1., 10.5, 1.], np.round(boxes[1], 9).tolist()) # Rotated by 90°
+        assert_equal([20., 20., 20., 20.], boxes[2].tolist()) # User symbol
+        assert_equal([-.5, 4.5, 10.5, 5.5], boxes[3].tolist())
+
+    def test_queries(self):
+        index = SpatialIndex.from_feature_table(decode_feature_table(testLinerecords))
+        assert_equal([0, 2], index.query(-1, 0, 0, 6).tolist())
+        assert_equal([1], index.query_point(10.2, 0.9).tolist())
+        assert_equal([], index.query_point(5, 2).tolist())
+        assert_equal([4, 2], index.nearest(19, 19, k=2).tolist())
+
+    def test_random(self):
+        rng = np.random.RandomState(0)
+        xy = rng.uniform(0, 100, (5000, 2))
+        size = rng.uniform(0, 2, (5000, 2))
+        boxes = np.hstack([xy, xy + size])
+        index = SpatialIndex(boxes, node_size=8)
+        for minx, miny in rng.uniform(0, 100, (20, 2)):
+            assert_equal(_brute_force(boxes, minx, miny, minx + 5, miny + 3),
+                         index.query(minx, miny, minx + 5, miny + 3).tolist())
+        x, y = 50., 50.
+        dists = np.hypot(np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 2]), 0),
+                         np.maximum(np.maximum(boxes[:, 1] - y, y - boxes[:, 3]), 0))
+        assert_equal(np.sort(dists)[:5].tolist(), dists[index.nearest(x, y, k=5)].tolist())
+
+    def test_save(self):
+        index = SpatialIndex.from_feature_table(decode_feature_table(testLinerecords))
+        fileobj = io.BytesIO()
+        index.save(fileobj)
+        fileobj.seek(0)
+        loaded = SpatialIndex.load(fileobj)
+        assert_equal(index.query(-1, -1, 11, 6).tolist(), loaded.query(-1, -1, 11, 6).tolist())
+
+    def test_empty(self):
+        index = SpatialIndex(np.empty((0, 4)))
+        assert_equal([], index.query(0, 0, 1, 1).tolist())
+        assert_equal([], index.nearest(0, 0).tolist())
+        assert_is_none(index.bounds)
+
+    def test_box_grid(self):
+        rng = np.random.RandomState(1)
+        mins = rng.uniform(0, 100, (500, 2))
+        boxes = np.concatenate([mins, mins + rng.uniform(0, 5, (500, 2))], axis=1)
+        x, y = rng.uniform(-5, 105, 300), rng.uniform(-5, 105, 300)
+        point, box = BoxGrid(boxes).join_points(x, y)
+        expected = [(i, j) for i in range(300) for j in _brute_force(boxes, x[i], y[i], x[i], y[i])]
+        assert_equal(expected, sorted(zip(point.tolist(), box.tolist())))
+        candidates = set(BoxGrid(boxes).candidates(40, 40, 60, 60).tolist())
+        assert_true(candidates.issuperset(_brute_force(boxes, 40, 40, 60, 60)))
+
+    def test_box_grid_empty(self):
+        point, box = BoxGrid(np.empty((0, 4))).join_points([1.], [2.])
+        assert_equal(([], []), (point.tolist(), box.tolist()))
@@ -3,6 +3,10 @@
 from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
 from ODBPy.StructuredTextParser import *
 from io import StringIO
+import os
+import os.path
+import shutil
+import tempfile
 
 testDrillTools = """
 THICKNESS=0
@@ -56,4 +60,40 @@ class TestStructuredTextParser(object):
         actual = parse_structured_text(StringIO(testDrillTools))
         assert_equal(expected, actual)
 
+    def test_padded_values(self):
+        actual = parse_structured_text(["UNITS= MM", "X_DATUM= 12", "Y_DATUM=  1.5", "NUM= 007"])
+        assert_equal({"UNITS": " MM", "X_DATUM": 12, "Y_DATUM": 1.5, "NUM": 7}, actual.metadata)
 
+    def test_read_memoized(self):
+        directory = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(directory, "steps", "pcb"))
+            filename = os.path.join(directory, "steps", "pcb", "stephdr")
+            with open(filename, "w") as fout:
+                fout.write("UNITS=MM\nX_DATUM=0\n")
+            first = read_structured_text(filename)
+            assert_equal(StructuredText({"UNITS": "MM", "X_DATUM": 0}, []), first)
+            header = read_step_header(directory)
+            assert_equal(first, header)
+            # Every caller gets its own copy
+            first.metadata["UNITS"] = "INCH"
+            header.metadata.clear()
+            assert_equal({"UNITS": "MM", "X_DATUM": 0}, read_structured_text(filename).metadata)
+            assert_equal({"UNITS": "MM", "X_DATUM": 0}, read_step_header(directory).metadata)
+            # Unchanged size and mtime: The memoized result is used
+            mtime = os.stat(filename).st_mtime_ns
+            with open(filename, "w") as fout:
+                fout.write("UNITS=MM\nX_DATUM=9\n")
+            os.utime(filename, ns=(mtime, mtime))
+            assert_equal(0, read_structured_text(filename).metadata["X_DATUM"])
+            assert_equal(0, read_step_header(directory).metadata["X_DATUM"])
+            # Changed files are parsed again
+            with open(filename, "w") as fout:
+                fout.write("UNITS=INCH\nX_DATUM=1.5\n")
+            os.utime(filename, ns=(0, 1))
+            assert_equal({"UNITS": "INCH", "X_DATUM": 1.5}, read_step_header(directory).metadata)
+            assert_equal({"UNITS": "INCH", "X_DATUM": 1.5}, read_structured_text(filename).metadata)
+            clear_structured_text_cache()
+            assert_equal(1.5, read_structured_text(filename).metadata["X_DATUM"])
+        finally:
+            shutil.rmtree(directory)
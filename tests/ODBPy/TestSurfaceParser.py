@@ -20,3 +20,10 @@ class TestSurfaceParser(object):
             run_decoder_on_line("S P 1 ; 3=5", surface_decoder_options))
 
         assert_is_none(run_decoder_on_line("SB P 1 2", surface_decoder_options))
+
+    def test_fast_path(self):
+        fast = CompiledDecoder(surface_decoder_options, surface_fast_paths)
+        for line in ["S P 0", "S N 12;1=2", "S P 1 ; 3=5", "S P 0 ", "S P 0;", "S P x",
+                     "S Q 0", "S P 0 1", "S", "SE", "SB P 1 2", "S\tP\t1;3"]:
+            assert_equal(run_decoder_on_line(line, surface_decoder_options),
+                         run_decoder_on_line(line, fast), line)
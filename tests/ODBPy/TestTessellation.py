@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
+from ODBPy.Tessellation import *
+from ODBPy.Geometry import *
+from ODBPy.FeatureTable import decode_feature_table
+import numpy as np
+
+testSurface = ["S P 0", "OB 0 0 I", "OS 2 0", "OC 0 0 1 0 N", "OE",
+               "OB 5 0 H", "OC 5 0 4 0 Y", "OE", "SE"]
+
+def _chord_error(points, cx, cy, r):
+    "Maximum distance between the midpoints of consecutive chords and the circle"
+    midpoints = (points[1:] + points[:-1]) / 2
+    return np.max(r - np.hypot(midpoints[:, 0] - cx, midpoints[:, 1] - cy))
+
+class TestTessellation(object):
+    def test_segment_counts(self):
+        # 45° chords have an error of r * (1 - cos(22.5°))
+        tolerance = 1 - np.cos(np.pi / 8) + 1e-12
+        assert_equal([8, 4], arc_segment_counts([1., 1.], [2 * np.pi, np.pi],
+                                                tolerance).tolist())
+        # Very coarse tolerances are limited by the maximum chord angle
+        assert_equal([8], arc_segment_counts([1.], [2 * np.pi], 100.).tolist())
+        assert_equal([2, 36], arc_segment_counts([0.01, 1.], [np.pi / 2, np.pi], 0.001).tolist())
+
+    @raises(ValueError)
+    def test_invalid_tolerance(self):
+        arc_segment_counts([1.], [np.pi], 0)
+
+    def test_steps(self):
+        vertices, offsets = tessellate_steps(
+            [0, 2], [0, 0], [2, 0], [0, 0], [0, 1], [0, 0],
+            [step_segment, step_arc_ccw], 1 - np.cos(np.pi / 8) + 1e-12)
+        assert_equal([0, 1, 5], offsets.tolist())
+        expected = [[0, 0], [2, 0], [1 + np.cos(np.pi / 4), np.sin(np.pi / 4)],
+                    [1, 1], [1 - np.cos(np.pi / 4), np.sin(np.pi / 4)]]
+        assert_true(np.allclose(expected, vertices))
+
+    def test_table(self):
+        table = decode_feature_table({"Layer features": testSurface})
+        for tolerance in [0.1, 0.01, 0.001]:
+            tessellation = table.tessellation(tolerance)
+            half = tessellation.ring(0)
+            assert_equal([0., 0.], half[0].tolist())
+            assert_true(_chord_error(np.vstack([half[1:], half[:1]]), 1, 0, 1) <= tolerance)
+            circle = tessellation.ring(1)
+            assert_true(np.allclose(1, np.hypot(circle[:, 0] - 4, circle[:, 1])))
+            assert_true(_chord_error(np.vstack([circle, circle[:1]]), 4, 0, 1) <= tolerance)
+            # Clockwise: The second vertex is below the center
+            assert_true(circle[1, 1] < 0)
+        # Cached per tolerance, same result as the per-polygon tessellation
+        assert_true(table.tessellation(0.01) is table.tessellation(0.01))
+        polygon = table.surface(0).polygons[1]
+        assert_true(np.allclose(polygon.vertices(0.01), table.tessellation(0.01).ring(1)))
+        assert_true(polygon.vertices(0.01) is polygon.vertices(0.01))
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 from nose.tools import assert_equal, assert_true, assert_almost_equal, assert_false, raises, assert_is_none
 from ODBPy.Units import *
+import numpy as np
 
 class TestUnits(object):
     def test_to_mm(self):
@@ -41,3 +42,34 @@ class TestUnits(object):
     @raises(ValueError)
     def test_linerecords_unit_wrongformat(self):
         assert_equal("MM", linerecords_unit({"Units": ["UBAR"]}))
+
+    def test_parse_unit_line(self):
+        assert_equal("MM", parse_unit_line("U MM"))
+        assert_equal("INCH", parse_unit_line("UNITS=INCH"))
+        assert_equal("MM", lines_unit(["#", "UNITS=MM", "CMP 0 1 2 0 N R1 R"]))
+        assert_equal("INCH", lines_unit(["CMP 0 1 2 0 N R1 R"]))
+
+    def test_to_nanometers(self):
+        assert_equal(25400000, to_nanometers(1, "inch"))
+        assert_equal(1, to_nanometers(0.000001, "mm"))
+        assert_equal(int, type(to_nanometers(0.1, "mm")))
+        values = to_nanometers(np.array([0.1, -30.9595, np.nan]), "MM")
+        assert_equal(np.int64, values.dtype)
+        assert_equal([100000, -30959500, -1], values.tolist())
+        assert_almost_equal(25.4, to_mm(25400000, "NM"))
+        assert_equal([0.1, 25.4], from_nanometers(np.array([100000, 25400000])).tolist())
+        assert_almost_equal(1., from_nanometers(25400000, "INCH"))
+
+    def test_symbol_scale(self):
+        assert_equal(0.001, symbol_scale("MM"))
+        assert_equal(0.001, symbol_scale(None))
+        assert_equal(1000, symbol_scale("NM", "MM"))
+        assert_equal(25400, symbol_scale("NM", "INCH"))
+        assert_equal(25400, symbol_scale("NM"))
+
+    def test_records_to_nanometers(self):
+        records = np.array([(1, 0.5, 0.25)], dtype=[("n", np.int32), ("x", np.float64), ("y", np.float64)])
+        assert_equal([("n", np.int32), ("x", np.int64), ("y", np.float64)],
+                     [(name, nanometer_dtype(records.dtype, ("x",))[name]) for name in ("n", "x", "y")])
+        converted = records_to_nanometers(records, ("x", "y"), "MIL")
+        assert_equal([(1, 12700, 6350)], converted.tolist())
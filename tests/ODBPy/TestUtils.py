@@ -2,12 +2,24 @@
 # -*- coding: utf-8 -*-
 from nose.tools import assert_equal, assert_true, assert_false, raises, assert_is_none
 from ODBPy.Utils import *
+from io import BytesIO
 
 class TestUtils(object):
     def test_try_parse_number(self):
         assert_equal("01", try_parse_number("01"))
         assert_equal(0, try_parse_number("0"))
         assert_equal(0.1, try_parse_number("0.1"))
+        assert_equal("A1", try_parse_number("A1"))
+        # Same as int() and float()
+        assert_equal(12, try_parse_number(" 12"))
+        assert_equal(12, try_parse_number("12 "))
+        assert_equal(1.5, try_parse_number(" 1.5 "))
+        assert_equal(1000, try_parse_number("1_000"))
+
+    def test_iter_compressed_file_lines(self):
+        stream = BytesIO(b"a \nb\n")
+        assert_equal(["a", "b"], list(iterCompressedFileLines(stream)))
+        assert_false(stream.closed)
 
     def test_const_false(self):
         assert_false(const_false())